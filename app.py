@@ -2,10 +2,22 @@
 Flask 웹 애플리케이션 - 사회복무요원 근무표 생성기
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask, render_template, request, jsonify
-import calendar
+import select
+import socket
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from schedule_solver import WorkScheduleConfig, WorkScheduleSolver, ShiftType
+
+# 솔버(OR-Tools)는 solver_service가 처음 필요할 때 불러온다
+import solver_service
+import work_calendar
+
+solver_service.set_origin(_IMPORT_STARTED)
+solver_service.STARTUP.mark('flask_imported')
 
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False  # 한글 출력을 위해
@@ -21,51 +33,25 @@ def index():
                          current_month=now.month)
 
 
-@app.route('/api/calendar_info', methods=['POST'])
+# 달력 응답 브라우저 캐시 시간 (초) - 공휴일 표가 바뀌면 ETag로 다시 받음
+CALENDAR_MAX_AGE = 86400
+
+
+@app.route('/api/calendar_info', methods=['GET', 'POST'])
 def calendar_info():
-    """달력 정보 API"""
+    """달력 정보 API (GET ?year=&month= 는 ETag/Cache-Control로 브라우저 캐시)"""
     try:
-        data = request.json
-        year = int(data['year'])
-        month = int(data['month'])
-
-        # 해당 월의 일수
-        num_days = calendar.monthrange(year, month)[1]
-
-        # 1일의 요일
-        first_day_weekday = calendar.monthrange(year, month)[0]
-        first_day_name = calendar.day_name[first_day_weekday]
-
-        # 말일의 요일
-        last_day = datetime(year, month, num_days)
-        last_day_weekday = last_day.weekday()
-        last_day_name = calendar.day_name[last_day_weekday]
-
-        # 달력 생성 (날짜별 요일)
-        days = []
-        for day in range(1, num_days + 1):
-            date = datetime(year, month, day)
-            weekday = date.weekday()
-            days.append({
-                'day': day,
-                'weekday': weekday,
-                'weekday_name': calendar.day_abbr[weekday],
-                'is_weekend': weekday in [5, 6]  # 토요일, 일요일
-            })
+        data = request.args if request.method == 'GET' else request.json
+        info = work_calendar.month_info(int(data['year']), int(data['month']))
 
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'data': {
-                'year': year,
-                'month': month,
-                'num_days': num_days,
-                'first_day_weekday': first_day_weekday,
-                'first_day_name': first_day_name,
-                'last_day_weekday': last_day_weekday,
-                'last_day_name': last_day_name,
-                'days': days
-            }
+            'data': info.to_dict()
         })
+        response.set_etag(info.etag())
+        response.cache_control.public = True
+        response.cache_control.max_age = CALENDAR_MAX_AGE
+        return response.make_conditional(request)
 
     except Exception as e:
         return jsonify({
@@ -74,6 +60,91 @@ def calendar_info():
         }), 400
 
 
+# 한 번에 요청할 수 있는 근무표 수 (최적해 + 대안)
+MAX_ALTERNATIVES = 5
+
+# 솔버 결과 대기 중 클라이언트 연결 확인 주기 (초)
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+def client_disconnected() -> bool:
+    """
+    요청 소켓이 닫혔는지 확인
+
+    waitress는 확인 함수(channel_request_lookahead 설정 시)를, 개발 서버와 gunicorn은
+    소켓을 environ에 노출한다. 둘 다 없는 서버에서는 세션 기반 취소만 동작한다.
+    """
+    check = request.environ.get('waitress.client_disconnected')
+    if check is not None:
+        return check()
+    sock = request.environ.get('werkzeug.socket') or request.environ.get('gunicorn.socket')
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        # 읽을 데이터 없이 readable이면 상대가 연결을 닫은 것
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
+
+def wait_for_job(job):
+    """작업 완료까지 대기하며 클라이언트 연결이 끊기거나 마감을 넘기면 취소"""
+    while True:
+        try:
+            return job.future.result(timeout=DISCONNECT_POLL_SECONDS)
+        except FutureTimeoutError:
+            if job.cancel_event.is_set():
+                continue
+            if client_disconnected():
+                job.cancel('disconnected')
+            elif job.remaining_seconds() < -solver_service.REQUEST_GRACE_SECONDS:
+                job.cancel('timeout')
+
+
+def parse_schedule_params(data: dict) -> dict:
+    """요청 본문에서 근무표 설정(WorkScheduleConfig 인자) 추출"""
+    return {
+        'year': int(data['year']),
+        'month': int(data['month']),
+        'employees': data['employees'],  # 리스트
+        'work_days': int(data.get('work_days', 20)),
+        'fixed_shifts': data.get('fixed_shifts', []),  # {employee_idx, day, shift_type}
+        'leave': data.get('leave', []),  # {employee_idx, days} - 근무일로 인정되는 휴가
+        'unavailable': data.get('unavailable', []),  # {employee_idx, days, shift_types}
+        'objective_mode': data.get('objective_mode', 'weighted'),  # weighted / lexicographic
+        'fairness_mode': data.get('fairness_mode', 'average'),  # average / spread
+        # 같은 날 같은 근무 불가 인원 (이름 또는 번호) - 없으면 맨 밑 두 명
+        'separation_pairs': data.get('separate_pairs'),  # [[a, b], ...]
+        'separation_groups': data.get('separate_groups'),  # [[a, b, c], ...]
+        # 공휴일 (내장 공휴일 표에 더할 날짜, 공휴일 최소 인원, 공휴일 근무 균등 분배)
+        'holidays': data.get('holidays'),  # [0-based 날짜, ...]
+        'holiday_coverage': data.get('holiday_coverage'),  # {'day': n, 'night': n}
+        'holiday_fairness': bool(data.get('holiday_fairness', False)),
+        # 근무 선호 {employee_idx, type(prefer/avoid/day_off), shift_types, days, weekdays, weight}
+        'preferences': data.get('preferences', []),
+        'preference_cap': data.get('preference_cap'),  # 인원별 만족도 상한 (기본 100)
+        'num_alternatives': int(data.get('num_alternatives', 1))  # 최적해 포함 근무표 수
+    }
+
+
+def schedule_params_error(params: dict):
+    """입력 검증 - 문제가 있으면 오류 메시지, 없으면 None"""
+    if not params['employees'] or len(params['employees']) < 2:
+        return '최소 2명 이상의 인원이 필요합니다.'
+
+    if not 1 <= params['num_alternatives'] <= MAX_ALTERNATIVES:
+        return f'근무표 수는 1~{MAX_ALTERNATIVES}개 사이여야 합니다.'
+
+    num_days = work_calendar.month_info(params['year'], params['month']).num_days
+    if params['work_days'] > num_days:
+        return (f"근무일수({params['work_days']}일)가 해당 월의 총 일수({num_days}일)를 "
+                f"초과할 수 없습니다.")
+    return None
+
+
 @app.route('/api/generate_schedule', methods=['POST'])
 def generate_schedule():
     """근무표 생성 API"""
@@ -81,45 +152,58 @@ def generate_schedule():
         data = request.json
 
         # 입력 데이터 파싱
-        year = int(data['year'])
-        month = int(data['month'])
-        employees = data['employees']  # 리스트
-        work_days = int(data.get('work_days', 20))
-        fixed_shifts = data.get('fixed_shifts', [])  # {employee_idx, day, shift_type}
+        params = parse_schedule_params(data)
+        deadline_seconds = data.get('deadline_seconds')  # 서버 상한으로 제한
+        job_id = data.get('job_id')
+        session_id = data.get('session_id')  # 같은 세션의 이전 요청은 취소
 
         # 입력 검증
-        if not employees or len(employees) < 2:
+        error = schedule_params_error(params)
+        if error:
             return jsonify({
                 'success': False,
-                'error': '최소 2명 이상의 인원이 필요합니다.'
+                'error': error
             }), 400
 
-        num_days = calendar.monthrange(year, month)[1]
-        if work_days > num_days:
+        # 솔버 실행 (워커 풀)
+        started = time.perf_counter()
+        job = solver_service.submit_job(
+            params, deadline_seconds=deadline_seconds, job_id=job_id, session_id=session_id,
+            adaptive=True
+        )
+        status_name, result = wait_for_job(job)
+        solver_service.STARTUP.record_request(
+            'generate_schedule', time.perf_counter() - started
+        )
+
+        if status_name == 'CANCELLED':
             return jsonify({
                 'success': False,
-                'error': f'근무일수({work_days}일)가 해당 월의 총 일수({num_days}일)를 초과할 수 없습니다.'
-            }), 400
-
-        # 설정 생성
-        config = WorkScheduleConfig(
-            year=year,
-            month=month,
-            employees=employees,
-            work_days=work_days,
-            fixed_shifts=fixed_shifts
-        )
+                'status': status_name,
+                'job_id': job.job_id,
+                'reason': job.cancel_reason,
+                'error': '근무표 생성이 취소되었습니다.'
+            }), 409
 
-        # 솔버 실행
-        solver = WorkScheduleSolver(config)
-        status_name, result = solver.solve(max_time_seconds=120)
+        if status_name == 'MEMORY_LIMIT':
+            # 격리 모드에서 탐색 스레드를 줄이고 필수 규칙만 풀어도 메모리 제한을 넘은 경우
+            return jsonify({
+                'success': False,
+                'status': status_name,
+                'error': '근무표 생성에 필요한 메모리가 서버 제한을 넘었습니다. '
+                         '인원이나 옵션을 줄여 다시 시도해 주세요.',
+                'estimate': job.estimate
+            }), 503
 
         if result:
-            # 해답을 찾은 경우
+            # 해답을 찾은 경우 (compact면 칸 목록 대신 인원별 근무 기호 문자열)
+            if data.get('compact'):
+                result = solver_service.compact_result(result)
             return jsonify({
                 'success': True,
                 'status': status_name,
-                'result': result
+                'result': result,
+                'estimate': job.estimate
             })
         else:
             # 해답을 찾지 못한 경우
@@ -133,7 +217,8 @@ def generate_schedule():
             return jsonify({
                 'success': False,
                 'status': status_name,
-                'error': error_message
+                'error': error_message,
+                'estimate': job.estimate
             }), 422  # Unprocessable Entity
 
 
@@ -144,22 +229,230 @@ def generate_schedule():
         }), 500
 
 
+@app.route('/api/estimate', methods=['POST'])
+def estimate_schedule():
+    """예상 소요 시간 API - 비슷한 문제의 실행 이력으로 시간 제한과 ETA 예측 (솔버 실행 없음)"""
+    try:
+        data = request.json
+        params = parse_schedule_params(data)
+        error = schedule_params_error(params)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'data': solver_service.estimate_solve(params, data.get('deadline_seconds'))
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/validate', methods=['POST'])
+def validate_schedule():
+    """근무표 검증 API - 솔버 없이 필수 규칙 위반과 목표 점수 계산"""
+    try:
+        data = request.json
+        params = parse_schedule_params(data)
+        grid = data['grid']  # [인원][날짜] = 0~3 또는 'D'/'N'/'B'/'R'
+
+        error = schedule_params_error(params)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+
+        started = time.perf_counter()
+        report = solver_service.validate_schedule(params, grid)
+        report['elapsed_ms'] = (time.perf_counter() - started) * 1000
+
+        return jsonify({
+            'success': True,
+            'data': report
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+# 근무 교환 제안 최대 반환 수
+MAX_SWAP_SUGGESTIONS = 100
+
+
+@app.route('/api/swap_suggestions', methods=['POST'])
+def swap_suggestions():
+    """근무 교환 제안 API - 지정한 인원/날짜의 근무를 넘겨받을 수 있는 교환을 목표값 변화 순으로 반환"""
+    try:
+        data = request.json
+        params = parse_schedule_params(data)
+        grid = data['grid']  # [인원][날짜] = 0~3 또는 'D'/'N'/'B'/'R'
+
+        error = schedule_params_error(params)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+
+        limit = min(max(int(data.get('limit', 20)), 1), MAX_SWAP_SUGGESTIONS)
+        report = solver_service.suggest_swaps(
+            params, grid, data['employee'], int(data['day']),  # 인원: 번호 또는 이름, 날짜: 0-based
+            partner=data.get('partner'), limit=limit
+        )
+
+        return jsonify({
+            'success': True,
+            'data': report
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+# 가능 영역 탐색 제한 (탐침 하나의 시간, 동시 탐침 수, 격자 크기)
+MAX_PROBE_SECONDS = 30
+MAX_SWEEP_PARALLEL = 8
+MAX_SWEEP_HEADCOUNT = 50
+
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep():
+    """최소 인원 / 근무일수 범위 탐색 API - (인원수 × 근무일수) 격자의 가능 영역 경계"""
+    try:
+        data = request.json
+        params = parse_schedule_params(data)
+        error = schedule_params_error(params)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+
+        num_days = work_calendar.month_info(params['year'], params['month']).num_days
+        base_headcount = len(params['employees'])
+        low_n, high_n = data.get('headcount_range', [2, base_headcount + 3])
+        low_w, high_w = data.get('work_days_range', [
+            max(1, params['work_days'] - 6), min(num_days, params['work_days'] + 6)
+        ])
+        low_n, high_n, low_w, high_w = int(low_n), int(high_n), int(low_w), int(high_w)
+        if not 2 <= low_n <= high_n <= MAX_SWEEP_HEADCOUNT:
+            return jsonify({
+                'success': False,
+                'error': f'인원 범위는 2~{MAX_SWEEP_HEADCOUNT}명 사이여야 합니다.'
+            }), 400
+        if not 1 <= low_w <= high_w <= num_days:
+            return jsonify({
+                'success': False,
+                'error': f'근무일수 범위는 1~{num_days}일 사이여야 합니다.'
+            }), 400
+
+        probe_seconds = min(max(float(data.get('probe_seconds', 5)), 0.5), MAX_PROBE_SECONDS)
+        parallel = min(max(int(data.get('parallel', 4)), 1), MAX_SWEEP_PARALLEL)
+
+        # 탐색 전체가 솔버 풀 슬롯 하나를 쓰고, 근무표 생성처럼 취소할 수 있음
+        started = time.perf_counter()
+        job = solver_service.submit_sweep(
+            params, range(low_n, high_n + 1), range(low_w, high_w + 1),
+            probe_seconds=probe_seconds, parallel=parallel,
+            deadline_seconds=data.get('deadline_seconds'),
+            job_id=data.get('job_id'), session_id=data.get('session_id')
+        )
+        status_name, report = wait_for_job(job)
+        solver_service.STARTUP.record_request('sweep', time.perf_counter() - started)
+
+        if status_name == 'CANCELLED':
+            return jsonify({
+                'success': False,
+                'status': status_name,
+                'job_id': job.job_id,
+                'reason': job.cancel_reason,
+                'error': '범위 탐색이 취소되었습니다.'
+            }), 409
+
+        return jsonify({
+            'success': True,
+            'data': report
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/cancel', methods=['POST'])
+def cancel_schedule():
+    """근무표 생성 취소 API (job_id 또는 session_id)"""
+    # sendBeacon은 text/plain으로 보내므로 Content-Type과 무관하게 파싱
+    data = request.get_json(force=True, silent=True) or {}
+    job_id = data.get('job_id')
+    session_id = data.get('session_id')
+
+    if job_id:
+        cancelled = solver_service.cancel_job(job_id)
+    elif session_id:
+        cancelled = solver_service.cancel_session(session_id)
+    else:
+        return jsonify({
+            'success': False,
+            'error': 'job_id 또는 session_id가 필요합니다.'
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'cancelled': cancelled
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """성능 지표 API"""
+    return jsonify({
+        'success': True,
+        'data': solver_service.metrics()
+    })
+
+
 @app.route('/result')
 def result():
     """결과 페이지 (선택적)"""
     return render_template('result.html')
 
 
+solver_service.STARTUP.mark('app_ready')
+
+
 if __name__ == '__main__':
+    import multiprocessing
     import webbrowser
     import threading
     import time
 
+    # 격리 모드의 솔버 자식 프로세스 (실행 파일로 묶었을 때 필요)
+    multiprocessing.freeze_support()
+
     def open_browser():
         """3초 후 브라우저 자동 실행"""
         time.sleep(3)
         webbrowser.open('http://127.0.0.1:5000')
 
+    # 백그라운드에서 솔버 예열 (OR-Tools import + 작은 문제 1회 풀이)
+    solver_service.start_prewarm()
+
     # 백그라운드에서 브라우저 열기
     threading.Thread(target=open_browser, daemon=True).start()
 
@@ -167,6 +460,7 @@ if __name__ == '__main__':
     print("  Work Schedule Generator is running!")
     print("  URL: http://127.0.0.1:5000")
     print("  Browser will open automatically...")
+    print(f"  Startup: {solver_service.STARTUP.marks['app_ready']:.0f} ms")
     print("="*50 + "\n")
 
     app.run(debug=False, host='0.0.0.0', port=5000)
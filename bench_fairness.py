@@ -0,0 +1,70 @@
+"""
+근무 균등 분배 목표 벤치마크
+
+평균 대비 차이(average) 방식과 최대-최소 차이(spread) 방식을 같은 문제에 대해
+비교한다. 균등 분배 목표만 남긴 모델에서 최적 증명까지 걸린 시간과,
+전체 가중합 모델의 시간 제한 내 목표값/하한 간격을 출력한다.
+
+사용법:
+    python bench_fairness.py [시간제한(초)]
+"""
+
+import sys
+import time
+
+from schedule_solver import FairnessMode, WorkScheduleConfig, WorkScheduleSolver
+
+# (연도, 월, 인원수, 근무일수)
+INSTANCES = [
+    (2025, 2, 5, 20),
+    (2025, 1, 5, 20),
+    (2025, 3, 6, 20),
+    (2025, 4, 8, 19),
+]
+
+
+def run(year: int, month: int, num_employees: int, work_days: int,
+        fairness_mode: str, fairness_only: bool, time_limit: float) -> dict:
+    config = WorkScheduleConfig(
+        year, month, [f'e{i}' for i in range(num_employees)],
+        work_days=work_days, fairness_mode=fairness_mode
+    )
+    solver = WorkScheduleSolver(config)
+    solver.build_model()
+    if fairness_only:
+        solver.model.Minimize(sum(solver.imbalance_terms))
+    solver.solver.parameters.max_time_in_seconds = time_limit
+
+    started = time.perf_counter()
+    status = solver.solver.Solve(solver.model)
+    elapsed = time.perf_counter() - started
+
+    name = solver.solver.StatusName(status)
+    found = name in ('OPTIMAL', 'FEASIBLE')
+    return {
+        'status': name,
+        'seconds': elapsed,
+        'objective': solver.solver.ObjectiveValue() if found else None,
+        'bound': solver.solver.BestObjectiveBound() if found else None
+    }
+
+
+def main():
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+
+    print(f"{'문제':<20} {'목표':<9} {'방식':<8} {'상태':<10} {'시간(초)':>8} "
+          f"{'목표값':>9} {'하한':>9}")
+    print("-" * 80)
+    for year, month, num_employees, work_days in INSTANCES:
+        label = f'{year}-{month:02d} {num_employees}명 {work_days}일'
+        for fairness_only in (True, False):
+            for mode in FairnessMode.ALL:
+                r = run(year, month, num_employees, work_days, mode, fairness_only, time_limit)
+                print(f"{label:<20} {'균등분배' if fairness_only else '전체':<9} {mode:<8} "
+                      f"{r['status']:<10} {r['seconds']:>8.2f} "
+                      f"{r['objective'] if r['objective'] is not None else '-':>9} "
+                      f"{r['bound'] if r['bound'] is not None else '-':>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,19 @@ a = Analysis(
         'ortools.sat',
         'ortools.sat.python',
         'ortools.sat.python.cp_model',
+        # app.py에서 지연 import되는 솔버 모듈
+        'solver_service',
+        'schedule_solver',
+        'model_cache',
+        'schedule_validator',
+        'conflict_graph',
+        'shared_store',
+        'feasibility_sweep',
+        'solve_history',
+        'solve_capture',
+        'solve_isolation',
+        'swap_suggest',
+        'work_calendar',
     ] + hiddenimports_ortools,
     hookspath=[],
     hooksconfig={},
@@ -43,7 +56,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # UPX 압축 해제 비용이 기동 시간에 더해지므로 사용하지 않음
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -59,7 +72,7 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     name='WorkScheduleGenerator',
 )
@@ -0,0 +1,72 @@
+"""
+근무 분리 규칙(같은 날 같은 근무 불가) 충돌 그래프
+
+분리할 인원 쌍과 그룹을 하나의 그래프로 합친 뒤 극대 클릭(maximal clique)으로
+나눈다. 클릭 하나는 날짜·근무마다 AddAtMostOne 제약 하나가 되므로, 쌍마다
+`a + b <= 1`을 두는 것보다 제약 수가 적고 LP 완화도 강하다.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Set, Tuple, Union
+
+EmployeeRef = Union[int, str]
+
+
+def resolve_employee(ref: EmployeeRef, employees: Sequence[str]) -> int:
+    """인원 번호(0-based) 또는 이름을 번호로 변환"""
+    if isinstance(ref, bool):
+        raise ValueError(f'잘못된 인원 지정입니다: {ref}')
+    if isinstance(ref, int):
+        if not 0 <= ref < len(employees):
+            raise ValueError(f'인원 번호가 범위를 벗어났습니다: {ref}')
+        return ref
+    if ref in employees:
+        return list(employees).index(ref)
+    raise ValueError(f'명단에 없는 인원입니다: {ref}')
+
+
+def build_edges(employees: Sequence[str],
+                pairs: Iterable[Sequence[EmployeeRef]] = (),
+                groups: Iterable[Sequence[EmployeeRef]] = ()) -> Set[Tuple[int, int]]:
+    """분리 쌍과 그룹을 간선 집합 {(작은 번호, 큰 번호)}으로 변환"""
+    # 제너레이터도 받을 수 있도록 한 번만 읽음 (길이 검사와 간선 생성에서 두 번 사용)
+    pairs, groups = list(pairs), list(groups)
+    edges = set()
+    for pair in pairs:
+        if len(pair) != 2:
+            raise ValueError(f'분리 쌍은 두 명이어야 합니다: {pair}')
+    for members in pairs + groups:
+        indices = sorted({resolve_employee(ref, employees) for ref in members})
+        if len(indices) < 2:
+            raise ValueError(f'서로 다른 인원이 두 명 이상 필요합니다: {members}')
+        for a_pos, a in enumerate(indices):
+            for b in indices[a_pos + 1:]:
+                edges.add((a, b))
+    return edges
+
+
+def maximal_cliques(edges: Iterable[Tuple[int, int]]) -> List[Tuple[int, ...]]:
+    """
+    간선 집합의 극대 클릭 목록 (Bron–Kerbosch, 피벗 사용)
+
+    모든 간선은 적어도 하나의 클릭에 포함된다. 결과는 정렬되어 있어
+    같은 입력이면 항상 같은 순서가 나온다.
+    """
+    neighbors: Dict[int, Set[int]] = {}
+    for a, b in edges:
+        neighbors.setdefault(a, set()).add(b)
+        neighbors.setdefault(b, set()).add(a)
+
+    cliques = []
+
+    def expand(clique: Set[int], candidates: Set[int], excluded: Set[int]):
+        if not candidates and not excluded:
+            cliques.append(tuple(sorted(clique)))
+            return
+        pivot = max(candidates | excluded, key=lambda v: len(neighbors[v] & candidates))
+        for v in list(candidates - neighbors[pivot]):
+            expand(clique | {v}, candidates & neighbors[v], excluded & neighbors[v])
+            candidates.remove(v)
+            excluded.add(v)
+
+    expand(set(), set(neighbors), set())
+    return sorted(cliques)
@@ -0,0 +1,360 @@
+"""
+솔버 차분 검사 (differential check)
+
+무작위 설정(인원수, 연월, 고정 근무 밀도, 분리 인원 규칙, 휴가, 지정 휴일, 근무 선호)을 만들어 솔버의 모든
+실행 방식과 목표 구성으로 같은 문제를 풀고, 결과를 서로 비교한다. 모델 성능
+개선이 필수 규칙이나 목표값을 몰래 바꾸지 않았는지 확인하는 용도다.
+
+- 모든 근무표는 솔버와 독립된 NumPy 검증기(schedule_validator)로 필수 규칙 검사
+- 해 존재 여부가 방식마다 다르면 오류 (한쪽이 해를 찾았는데 다른 쪽이 INFEASIBLE)
+- 가중합 목표는 솔버 목표값 ≥ 검증기 목표값 (최적이면 같음)
+- 최적(OPTIMAL)으로 끝난 방식의 목표값은 다른 방식이 찾은 어떤 근무표보다 나쁘지 않음
+- 방식별 소요 시간 기록
+
+프로필: quick(테스트 기본, 작은 문제 몇 개)과 nightly(큰 인원, 긴 시간, 격리 실행 포함).
+pytest에서는 SCHEDULE_TEST_PROFILE=nightly로 확장 프로필을 실행한다.
+
+사용법:
+    python differential_check.py [--profile quick|nightly] [--seed N] [--output report.json]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from model_cache import ModelTemplateCache
+from schedule_solver import (
+    FairnessMode, ObjectiveMode, PreferenceType, ShiftType, WorkScheduleConfig, WorkScheduleSolver
+)
+from schedule_validator import grid_from_result, score_soft_goals, validate_schedule
+from work_calendar import month_info
+
+# 프로필: 설정 수, 인원수 범위, 고정 근무 밀도 후보, 방식별 시간 제한(초), 격리 실행 포함 여부
+# seed가 None이면 실행마다 새 시드 (보고서에 기록) - quick 시드는 휴가/휴일/선호와
+# 날짜·요일이 겹치지 않는 선호만 가진 인원이 모두 나오는 값
+PROFILES = {
+    'quick': {
+        'scenarios': 2, 'employees': (5, 7), 'fixed_densities': (0.02, 0.05),
+        'time_limit': 2.0, 'isolated': False, 'seed': 11
+    },
+    'nightly': {
+        'scenarios': 20, 'employees': (5, 30), 'fixed_densities': (0.0, 0.02, 0.05, 0.1),
+        'time_limit': 20.0, 'isolated': True, 'seed': None
+    },
+}
+
+# (이름, 설정 변경, 실행 방식)
+# - solve: 프로세스 안에서 새 모델 / cached: 모델 템플릿 캐시에서 복원한 모델
+# - feasibility: 목표 없이 필수 제약만 / isolated: 자식 프로세스(solver_service.solve_attempt)
+FORMULATIONS = [
+    ('weighted', {}, 'solve'),
+    ('weighted_cached', {}, 'cached'),
+    ('spread', {'fairness_mode': FairnessMode.SPREAD}, 'solve'),
+    ('lexicographic', {'objective_mode': ObjectiveMode.LEXICOGRAPHIC}, 'solve'),
+    ('feasibility', {}, 'feasibility'),
+    ('isolated', {}, 'isolated'),
+]
+
+FOUND = ('OPTIMAL', 'FEASIBLE')
+
+# 고정 근무를 뽑을 기준 근무표를 찾는 시간 제한 (초)
+REFERENCE_TIME_LIMIT = 5.0
+
+# 휴가 / 지정 휴일 / 근무 선호를 설정에 넣을 확률 (각각 따로 뽑음)
+FEATURE_PROBABILITY = 0.6
+
+
+def random_scenario(rng: random.Random, index: int, employee_range=(5, 7),
+                    fixed_densities=(0.0,)) -> Dict:
+    """
+    무작위 설정 하나 (WorkScheduleConfig 인자)
+
+    근무일수는 휴일이 8~11일이 되도록 고른다. 고정 근무는 전체 칸 중 밀도만큼 지정하는데,
+    대부분은 필수 제약만으로 푼 기준 근무표에서 뽑아 해가 있는 설정을 만들고, 4개 중
+    1개꼴로 DAY/NIGHT/OFF_R을 무작위로 골라 충돌로 해가 없는 설정도 섞는다
+    (방식 간 INFEASIBLE 판정이 일치하는지 확인).
+    """
+    year = rng.randint(2024, 2027)
+    month = rng.randint(1, 12)
+    num_days = month_info(year, month).num_days
+    num_employees = rng.randint(*employee_range)
+    employees = [f'인원{i + 1}' for i in range(num_employees)]
+    work_days = num_days - rng.randint(8, 11)
+
+    # 분리 인원: 기본(맨 밑 두 명), 없음, 무작위 쌍, 세 명 그룹
+    rule = rng.choice(['default', 'none', 'pairs', 'group'])
+    separation = {}
+    if rule == 'none':
+        separation = {'separation_pairs': []}
+    elif rule == 'pairs':
+        separation = {'separation_pairs': [
+            rng.sample(range(num_employees), 2) for _ in range(rng.randint(1, 2))
+        ]}
+    elif rule == 'group':
+        separation = {'separation_groups': [rng.sample(range(num_employees), 3)]}
+    params = dict(year=year, month=month, employees=employees, work_days=work_days, **separation)
+    features = random_features(rng, num_employees, num_days)
+    params.update(features)
+
+    density = rng.choice(fixed_densities)
+    cells = sorted(rng.sample(
+        [(i, d) for i in range(num_employees) for d in range(num_days)],
+        round(density * num_employees * num_days)
+    ))
+    source = 'random' if cells else 'none'
+    reference = None
+    if cells and rng.random() < 0.75:
+        # 탐색 스레드 1개면 CP-SAT 결과가 결정적이라 시드로 재현 가능
+        solver = WorkScheduleSolver(WorkScheduleConfig(**params))
+        if solver.solve_feasibility(REFERENCE_TIME_LIMIT, num_workers=1) == 'FEASIBLE':
+            reference = solver.solution_grid()
+            source = 'roster'
+    fixed_shifts = [
+        {'employee_idx': i, 'day': d,
+         'shift_type': (reference[i][d] if reference is not None
+                        else rng.choice([ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_R]))}
+        for i, d in cells
+    ]
+
+    return {
+        'name': (f'{index:02d}-{year}-{month:02d}-{num_employees}명-고정{len(fixed_shifts)}({source})-{rule}'
+                 + ''.join(f'+{FEATURE_LABELS[key]}' for key in features if key in FEATURE_LABELS)),
+        'params': dict(params, fixed_shifts=fixed_shifts)
+    }
+
+
+# 보고서 이름에 표시할 추가 설정
+FEATURE_LABELS = {'leave': '휴가', 'holidays': '휴일', 'preferences': '선호'}
+
+
+def random_features(rng: random.Random, num_employees: int, num_days: int) -> Dict:
+    """
+    휴가, 지정 휴일(공휴일 인원/균등 분배), 근무 선호 중 무작위로 고른 설정
+
+    선호에는 날짜와 요일을 함께 줘서 교집합이 비는 항목도 섞는다.
+    """
+    features = {}
+    if rng.random() < FEATURE_PROBABILITY:
+        features['leave'] = [
+            {'employee_idx': i, 'days': list(range(start, start + rng.randint(2, 4)))}
+            for i in rng.sample(range(num_employees), rng.randint(1, 2))
+            for start in [rng.randrange(num_days - 4)]
+        ]
+    if rng.random() < FEATURE_PROBABILITY:
+        features['holidays'] = sorted(rng.sample(range(num_days), rng.randint(1, 3)))
+        coverage = rng.choice([None, {'day': 2}, {'night': 2}])
+        if coverage is not None:
+            features['holiday_coverage'] = coverage
+        features['holiday_fairness'] = rng.random() < 0.5
+    if rng.random() < FEATURE_PROBABILITY:
+        preferences = []
+        for _ in range(rng.randint(1, 4)):
+            entry = {'employee_idx': rng.randrange(num_employees),
+                     'type': rng.choice(PreferenceType.ALL),
+                     'weight': rng.randint(1, 50)}
+            if entry['type'] != PreferenceType.DAY_OFF:
+                entry['shift_types'] = [rng.choice([ShiftType.DAY, ShiftType.NIGHT])]
+            scope = rng.choice(['month', 'days', 'weekdays', 'both'])
+            if scope in ('days', 'both'):
+                entry['days'] = rng.sample(range(num_days), rng.randint(1, 3))
+            if scope in ('weekdays', 'both'):
+                entry['weekdays'] = rng.sample(range(7), rng.randint(1, 2))
+            preferences.append(entry)
+        features['preferences'] = preferences
+        features['preference_cap'] = rng.choice([None, 30])
+    return features
+
+
+def _run_isolated(params: Dict, time_limit: float, num_workers: Optional[int]) -> Dict:
+    """자식 프로세스에서 서비스와 같은 경로(solve_attempt)로 실행"""
+    import solve_isolation
+    import solver_service
+
+    outcome = solve_isolation.run_isolated(
+        solver_service.solve_attempt, args=(params, time_limit),
+        kwargs={'num_workers': num_workers, 'use_model_cache': False},
+        timeout=time_limit + solve_isolation.STOP_GRACE_SECONDS * 2
+    )
+    if outcome['kind'] != 'ok':
+        return {'status': f"ISOLATION_{outcome['kind'].upper()}", 'result': None,
+                'peak_rss_mb': outcome['peak_rss_mb']}
+    status, result, _ = outcome['value']
+    return {'status': status, 'result': result, 'peak_rss_mb': outcome['peak_rss_mb']}
+
+
+def run_formulation(params: Dict, formulation, time_limit: float,
+                    num_workers: Optional[int] = None) -> Dict:
+    """
+    한 방식으로 실행
+
+    Returns:
+        {'formulation', 'status', 'seconds', 'grid', 'solver_objective', 'cache_hit', ...}
+    """
+    name, overrides, engine = formulation
+    run = {'formulation': name, 'grid': None, 'solver_objective': None}
+    started = time.perf_counter()
+    try:
+        if engine == 'isolated':
+            outcome = _run_isolated(dict(params, **overrides), time_limit, num_workers)
+            run['status'] = outcome['status']
+            run['peak_rss_mb'] = outcome['peak_rss_mb']
+            if outcome['result'] is not None:
+                run['grid'] = grid_from_result(outcome['result'])
+        else:
+            config = WorkScheduleConfig(**dict(params, **overrides))
+            cache = None
+            if engine == 'cached':
+                # 같은 형태의 골격을 먼저 캐시에 넣어 두고 복원된 모델로 풂
+                cache = ModelTemplateCache()
+                WorkScheduleSolver(config, model_cache=cache).build_model()
+            solver = WorkScheduleSolver(config, model_cache=cache)
+            if engine == 'feasibility':
+                run['status'] = solver.solve_feasibility(time_limit, num_workers=num_workers)
+                if run['status'] == 'FEASIBLE':
+                    run['grid'] = grid_from_result(solver.extract_solution(solver.solution_grid()))
+            else:
+                run['status'], result = solver.solve(time_limit, num_workers=num_workers)
+                run['cache_hit'] = solver.cache_hit
+                if result is not None:
+                    run['grid'] = grid_from_result(result)
+                    if config.objective_mode == ObjectiveMode.WEIGHTED:
+                        run['solver_objective'] = int(solver.solver.ObjectiveValue())
+    except ValueError as e:
+        run['status'] = 'INVALID'
+        run['error'] = str(e)
+    run['seconds'] = time.perf_counter() - started
+    return run
+
+
+def objective_key(grid, config: WorkScheduleConfig):
+    """설정의 목표로 본 근무표 점수 (작을수록 좋음) - 단계별 모드는 단계 순서의 튜플"""
+    scores = score_soft_goals(grid, config)
+    if config.objective_mode == ObjectiveMode.LEXICOGRAPHIC:
+        return (scores['consecutive_5plus'], -scores['offb_to_offr'], scores['imbalance'],
+                -scores.get('preference_satisfaction', 0))
+    return scores['objective']
+
+
+def check_scenario(params: Dict, runs: List[Dict]) -> List[str]:
+    """한 설정의 방식별 실행 결과 비교 - 문제 설명 목록 (없으면 통과)"""
+    problems = []
+    overrides = {name: changes for name, changes, _ in FORMULATIONS}
+    configs = {
+        run['formulation']: WorkScheduleConfig(**dict(params, **overrides[run['formulation']]))
+        for run in runs if run['status'] != 'INVALID'
+    }
+    statuses = {run['formulation']: run['status'] for run in runs}
+    if len(set(status == 'INVALID' for status in statuses.values())) > 1:
+        problems.append(f'설정 오류 판정 불일치: {statuses}')
+        return problems
+
+    # 1. 필수 규칙 (독립 검증기)
+    for run in runs:
+        if run['grid'] is None:
+            continue
+        report = validate_schedule(run['grid'], configs[run['formulation']])
+        if not report['valid']:
+            problems.append(f"{run['formulation']}: 필수 규칙 위반 {report['violations'][:3]}")
+        if run['status'] not in FOUND:
+            problems.append(f"{run['formulation']}: 상태 {run['status']}인데 근무표 반환")
+
+    # 2. 해 존재 여부
+    found = [run['formulation'] for run in runs if run['grid'] is not None]
+    infeasible = [run['formulation'] for run in runs if run['status'] == 'INFEASIBLE']
+    if found and infeasible:
+        problems.append(f'해 존재 판정 불일치: 해 있음 {found}, INFEASIBLE {infeasible}')
+
+    # 3. 캐시 복원 모델 사용 여부
+    for run in runs:
+        if run['formulation'] == 'weighted_cached' and run['status'] in FOUND and not run['cache_hit']:
+            problems.append('weighted_cached: 템플릿 캐시를 쓰지 않음')
+
+    # 4. 솔버 목표값 ≥ 검증기 목표값 (차이 변수가 느슨할 수 있음), 최적이면 같음
+    for run in runs:
+        if run['solver_objective'] is None:
+            continue
+        validated = score_soft_goals(run['grid'], configs[run['formulation']])['objective']
+        if validated > run['solver_objective'] or (
+                run['status'] == 'OPTIMAL' and validated != run['solver_objective']):
+            problems.append(f"{run['formulation']}: 솔버 목표값 {run['solver_objective']}, "
+                            f"검증기 목표값 {validated} ({run['status']})")
+
+    # 5. 최적으로 끝난 방식은 다른 방식이 찾은 모든 근무표 이상으로 좋아야 함
+    grids = [(run['formulation'], run['grid']) for run in runs if run['grid'] is not None]
+    for run in runs:
+        if run['status'] != 'OPTIMAL' or run['formulation'] == 'feasibility':
+            continue
+        config = configs[run['formulation']]
+        best = objective_key(run['grid'], config)
+        for other, grid in grids:
+            value = objective_key(grid, config)
+            if value < best:
+                problems.append(f"{run['formulation']}: 최적 {best}보다 {other}의 근무표가 더 좋음 {value}")
+    return problems
+
+
+def run_profile(profile: str = 'quick', seed: Optional[int] = None,
+                num_workers: Optional[int] = None, log=print) -> Dict:
+    """
+    프로필 실행
+
+    Returns:
+        {'profile', 'seed', 'scenarios': [{name, params, runs, problems}], 'problems', 'timings'}
+    """
+    settings = PROFILES[profile]
+    if seed is None:
+        seed = settings['seed'] if settings['seed'] is not None else random.randrange(2 ** 31)
+    rng = random.Random(seed)
+    formulations = [f for f in FORMULATIONS if settings['isolated'] or f[2] != 'isolated']
+
+    report = {'profile': profile, 'seed': seed, 'scenarios': [], 'problems': []}
+    for index in range(settings['scenarios']):
+        scenario = random_scenario(rng, index, settings['employees'], settings['fixed_densities'])
+        runs = [run_formulation(scenario['params'], f, settings['time_limit'], num_workers)
+                for f in formulations]
+        problems = check_scenario(scenario['params'], runs)
+        report['problems'].extend(f"{scenario['name']}: {p}" for p in problems)
+        report['scenarios'].append({
+            'name': scenario['name'],
+            'params': scenario['params'],
+            'runs': [{k: v for k, v in run.items() if k != 'grid'} for run in runs],
+            'problems': problems
+        })
+        log(f"{scenario['name']:<36} " + ' '.join(
+            f"{run['formulation']}={run['status']}({run['seconds']:.1f}s)" for run in runs
+        ) + (f"  ✗ {len(problems)}" if problems else ''))
+
+    # 방식별 소요 시간 (평균/최대)
+    report['timings'] = {}
+    for name, _, _ in formulations:
+        seconds = [run['seconds'] for s in report['scenarios'] for run in s['runs']
+                   if run['formulation'] == name]
+        report['timings'][name] = {'mean_seconds': sum(seconds) / len(seconds),
+                                   'max_seconds': max(seconds)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='솔버 방식별 차분 검사')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help='CP-SAT 탐색 스레드 수')
+    parser.add_argument('--output', default=None, help='보고서 JSON 저장 경로')
+    args = parser.parse_args()
+
+    report = run_profile(args.profile, args.seed, args.workers)
+    print(f"\n시드: {report['seed']}")
+    for name, timing in report['timings'].items():
+        print(f"{name:<16} 평균 {timing['mean_seconds']:>6.2f}s  최대 {timing['max_seconds']:>6.2f}s")
+    for problem in report['problems']:
+        print(f"✗ {problem}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    raise SystemExit(1 if report['problems'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+최소 인원 / 근무일수 범위 탐색 (feasibility sweep)
+
+(인원수 × 근무일수) 격자에서 근무표가 존재하는 영역의 경계를 찾는다. 칸마다
+목표 함수 없이 필수 제약만으로 짧게 푸는 탐침(probe)을 병렬로 실행하고, 다음
+단조성으로 아직 풀지 않은 칸을 결정해 탐침 수를 줄인다.
+
+- 인원: (n명, w일)이 가능하면 (n+1명, w일)도 가능, 불가능하면 (n-1명, w일)도 불가능
+  (분리 인원을 명시한 경우만 - 기본값 '맨 밑 두 명'은 인원이 늘면 다른 두 명으로 바뀌므로 쓰지 않음)
+- 근무일수: 같은 인원에서 가능한 근무일수는 하나의 구간
+  (적으면 매일 최소 인원을 못 채우고, 많으면 7일 연속 근무 금지에 걸림)
+
+시간 안에 결론이 나지 않은 칸(UNKNOWN)은 추론에 쓰지 않는다.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from schedule_solver import WorkScheduleConfig, WorkScheduleSolver
+
+FEASIBLE = 'FEASIBLE'
+INFEASIBLE = 'INFEASIBLE'
+
+Cell = Tuple[int, int]  # (인원수, 근무일수)
+
+
+def sweep_employees(employees: List[str], count: int) -> List[str]:
+    """앞에서부터 count명 (부족하면 '인원N' 이름을 붙여 채움)"""
+    names = list(employees[:count])
+    while len(names) < count:
+        names.append(f'인원{len(names) + 1}')
+    return names
+
+
+def probe(params: Dict, cell: Cell, time_limit: float, num_workers: int,
+          cancel_event: Optional[threading.Event] = None) -> Dict:
+    """한 칸의 해 존재 여부 확인 - 설정 오류(범위를 벗어난 고정 근무 등)는 INVALID"""
+    num_employees, work_days = cell
+    started = time.perf_counter()
+    try:
+        config = WorkScheduleConfig(**dict(
+            params,
+            employees=sweep_employees(params['employees'], num_employees),
+            work_days=work_days,
+            num_alternatives=1
+        ))
+        status = WorkScheduleSolver(config).solve_feasibility(
+            time_limit, num_workers=num_workers, cancel_event=cancel_event
+        )
+    except (ValueError, IndexError, KeyError):
+        status = 'INVALID'
+    return {
+        'num_employees': num_employees,
+        'work_days': work_days,
+        'status': status,
+        'seconds': time.perf_counter() - started
+    }
+
+
+class FeasibilityMap:
+    """격자 칸별 결론 (탐침 결과와 단조성으로 유도한 결과)"""
+
+    def __init__(self, headcounts: List[int], work_days: List[int],
+                 headcount_monotone: bool = True):
+        self.headcounts = headcounts
+        self.work_days = work_days
+        self.headcount_monotone = headcount_monotone  # False면 인원 방향 추론 없이 칸마다 탐침
+        self.known: Dict[Cell, bool] = {}
+        self.probed: Dict[Cell, str] = {}
+
+    def record(self, cell: Cell, status: str):
+        self.probed[cell] = status
+        if status in (FEASIBLE, INFEASIBLE):
+            self.known[cell] = status == FEASIBLE
+            self.propagate()
+
+    def _set(self, cell: Cell, feasible: bool) -> bool:
+        if cell in self.known:
+            return False
+        self.known[cell] = feasible
+        return True
+
+    def propagate(self):
+        """변화가 없을 때까지 단조성 규칙 적용"""
+        changed = True
+        while changed:
+            changed = False
+            for (n, w), feasible in list(self.known.items()):
+                if not self.headcount_monotone:
+                    break
+                for other in self.headcounts:
+                    if (feasible and other > n) or (not feasible and other < n):
+                        changed |= self._set((other, w), feasible)
+
+            for n in self.headcounts:
+                row = [w for w in self.work_days if self.known.get((n, w))]
+                if not row:
+                    continue
+                low, high = min(row), max(row)
+                for w in self.work_days:
+                    if low <= w <= high:
+                        changed |= self._set((n, w), True)
+                    elif self.known.get((n, w)) is False:
+                        # 가능 구간 밖의 불가능 칸보다 더 바깥은 모두 불가능
+                        for outer in self.work_days:
+                            if (w > high and outer > w) or (w < low and outer < w):
+                                changed |= self._set((n, outer), False)
+
+    def undecided(self, n: int) -> List[int]:
+        """아직 결론이 없고 탐침하지 않은 근무일수"""
+        return [w for w in self.work_days if (n, w) not in self.known and (n, w) not in self.probed]
+
+    def next_probes(self, count: int) -> List[Cell]:
+        """
+        다음에 풀 칸 선택
+
+        인원은 가운데부터(이분 탐색 순서), 각 인원에서는 가능 구간 양쪽의
+        미결정 구간마다 가운데 칸을 고른다.
+        """
+        picks = []
+        for n in bisection_order(self.headcounts):
+            undecided = self.undecided(n)
+            if not undecided:
+                continue
+            feasible = [w for w in self.work_days if self.known.get((n, w))]
+            if feasible:
+                segments = [
+                    [w for w in undecided if w < min(feasible)],
+                    [w for w in undecided if w > max(feasible)],
+                ]
+            else:
+                segments = [undecided]
+            for segment in segments:
+                if segment:
+                    picks.append((n, segment[len(segment) // 2]))
+        return picks[:count]
+
+    def frontier(self) -> List[Dict]:
+        """인원별 가능한 근무일수 범위 (None: 가능한 칸을 찾지 못함)"""
+        rows = []
+        for n in self.headcounts:
+            feasible = [w for w in self.work_days if self.known.get((n, w))]
+            unresolved = [w for w in self.work_days if (n, w) not in self.known]
+            rows.append({
+                'num_employees': n,
+                'min_work_days': min(feasible) if feasible else None,
+                'max_work_days': max(feasible) if feasible else None,
+                'unresolved_work_days': unresolved
+            })
+        return rows
+
+
+def bisection_order(values: List[int]) -> List[int]:
+    """가운데, 사분점, ... 순서 (앞쪽 탐침이 단조성으로 가장 많은 칸을 결정)"""
+    order, queue = [], [(0, len(values))]
+    while queue:
+        low, high = queue.pop(0)
+        if low >= high:
+            continue
+        middle = (low + high) // 2
+        order.append(values[middle])
+        queue += [(low, middle), (middle + 1, high)]
+    return order
+
+
+def sweep_feasibility(params: Dict, headcounts: List[int], work_days: List[int],
+                      probe_seconds: float = 5, parallel: int = 4,
+                      max_seconds: float = 120, num_workers: int = 1,
+                      cancel_event: Optional[threading.Event] = None) -> Dict:
+    """
+    (인원수 × 근무일수) 격자의 가능 영역 경계 탐색
+
+    Args:
+        params: WorkScheduleConfig 인자 (employees, work_days는 칸마다 바뀜)
+        headcounts, work_days: 탐색할 값 목록 (오름차순)
+        probe_seconds: 탐침 하나의 시간 제한
+        parallel: 동시에 실행할 탐침 수
+        max_seconds: 전체 시간 제한 (넘으면 남은 칸은 미결정으로 반환)
+        num_workers: 탐침 하나의 CP-SAT 탐색 스레드 수
+        cancel_event: set되면 실행 중인 탐침을 중단하고 그때까지의 결과를 반환
+    """
+    started = time.perf_counter()
+    # 기본 분리 인원(맨 밑 두 명)은 인원수마다 다른 사람이라 인원 방향 단조성이 보장되지 않음
+    explicit_separation = (params.get('separation_pairs') is not None
+                           or params.get('separation_groups') is not None)
+    grid = FeasibilityMap(sorted(headcounts), sorted(work_days), headcount_monotone=explicit_separation)
+    probes = []
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='sweep') as pool:
+        while time.perf_counter() - started + probe_seconds <= max_seconds and not cancelled():
+            cells = grid.next_probes(parallel)
+            if not cells:
+                break
+            for outcome in pool.map(
+                lambda cell: probe(params, cell, probe_seconds, num_workers, cancel_event), cells
+            ):
+                probes.append(outcome)
+                grid.record((outcome['num_employees'], outcome['work_days']), outcome['status'])
+
+    base_work_days = params.get('work_days')
+    base_headcount = len(params['employees'])
+    min_headcount = next(
+        (n for n in grid.headcounts if grid.known.get((n, base_work_days))), None
+    )
+    base_row = [w for w in grid.work_days if grid.known.get((base_headcount, w))]
+
+    total_cells = len(grid.headcounts) * len(grid.work_days)
+    return {
+        'frontier': grid.frontier(),
+        'min_headcount': min_headcount,  # 요청 근무일수에서 가능한 최소 인원
+        'max_work_days': max(base_row) if base_row else None,  # 요청 인원에서 가능한 최대 근무일수
+        'probes': probes,
+        'cells': total_cells,
+        'decided_cells': len(grid.known),
+        'pruned_cells': len(grid.known) - sum(1 for s in grid.probed.values()
+                                              if s in (FEASIBLE, INFEASIBLE)),
+        'cancelled': cancelled(),
+        'elapsed_seconds': time.perf_counter() - started
+    }
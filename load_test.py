@@ -0,0 +1,118 @@
+"""
+부하 테스트 - 동시 요청 처리량 측정
+
+실행 중인 서버(python app.py 또는 python serve.py)에 /api/calendar_info와
+/api/generate_schedule 요청을 동시에 보내고 초당 처리량과 지연시간 분포를 출력한다.
+표준 라이브러리만 사용한다.
+
+사용법:
+    python load_test.py --url http://127.0.0.1:8000 --concurrency 8 --requests 200
+    python load_test.py --endpoint generate --concurrency 4 --requests 8 --deadline 10
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+EMPLOYEES = ['김철수', '이영희', '박민수', '정지훈', '최수진']
+
+
+def calendar_payload(index: int) -> Dict:
+    return {'year': 2025, 'month': index % 12 + 1}
+
+
+def generate_payload(index: int, deadline: float, distinct: bool) -> Dict:
+    """distinct면 요청마다 이름을 바꿔 결과 캐시를 피함"""
+    employees = [f'{name}{index}' for name in EMPLOYEES] if distinct else EMPLOYEES
+    return {
+        'year': 2025, 'month': 2, 'employees': employees, 'work_days': 20,
+        'deadline_seconds': deadline
+    }
+
+
+def post(url: str, payload: Dict, timeout: float) -> Tuple[int, float]:
+    """(HTTP 상태, 소요 시간) - 연결 실패는 상태 0"""
+    body = json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def run(url: str, payloads: List[Dict], concurrency: int, timeout: float) -> Dict:
+    """payloads를 concurrency개씩 동시에 보내고 통계 반환"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda p: post(url, p, timeout), payloads))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for _, seconds in outcomes]
+    statuses: Dict[int, int] = {}
+    for status, _ in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'requests': len(outcomes),
+        'seconds': elapsed,
+        'throughput': len(outcomes) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'max_ms': max(latencies) * 1000,
+        'statuses': statuses
+    }
+
+
+def print_report(name: str, stats: Dict):
+    statuses = ', '.join(f'{code}×{count}' for code, count in sorted(stats['statuses'].items()))
+    print(f"{name:<20} {stats['requests']:>6} {stats['throughput']:>9.1f} "
+          f"{stats['p50_ms']:>9.0f} {stats['p95_ms']:>9.0f} {stats['max_ms']:>9.0f}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='근무표 생성기 부하 테스트')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--endpoint', choices=['calendar', 'generate', 'both'], default='both')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100,
+                        help='달력 요청 수 (근무표 요청은 concurrency × 2개)')
+    parser.add_argument('--deadline', type=float, default=10,
+                        help='근무표 요청 마감 시간 (초)')
+    parser.add_argument('--same-config', action='store_true',
+                        help='모든 근무표 요청을 같은 설정으로 보냄 (결과 캐시 효과 측정)')
+    args = parser.parse_args()
+
+    base = args.url.rstrip('/')
+    print(f"{'endpoint':<20} {'reqs':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}  status")
+    print("-" * 80)
+
+    if args.endpoint in ('calendar', 'both'):
+        payloads = [calendar_payload(i) for i in range(args.requests)]
+        print_report('calendar_info', run(f'{base}/api/calendar_info', payloads,
+                                          args.concurrency, timeout=30))
+
+    if args.endpoint in ('generate', 'both'):
+        payloads = [
+            generate_payload(i, args.deadline, distinct=not args.same_config)
+            for i in range(args.concurrency * 2)
+        ]
+        print_report('generate_schedule', run(f'{base}/api/generate_schedule', payloads,
+                                              args.concurrency, timeout=args.deadline + 60))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+CP-SAT 모델 템플릿 캐시
+
+같은 형태(일수, 인원수, 근무일수, 규칙 집합)의 근무표는 고정 근무와 이름을
+제외하면 완전히 같은 모델이 만들어진다. 형태별로 한 번 만든 모델을 보관해 두고
+요청마다 복제(Clone)해서 고정 근무만 추가로 적용한다.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+
+
+def var_from_index(model: cp_model.CpModel, index: int):
+    """proto 인덱스로 변수 객체 복원 (도메인이 [0, 1]이면 BoolVar)"""
+    domain = list(model.Proto().variables[index].domain)
+    if domain == [0, 1]:
+        return model.GetBoolVarFromProtoIndex(index)
+    return model.GetIntVarFromProtoIndex(index)
+
+
+class ModelTemplate:
+    """고정 근무 적용 전의 모델 골격과 변수 인덱스"""
+
+    def __init__(self, model: cp_model.CpModel,
+                 shift_indices: Dict[Tuple[int, int, int], int],
+                 var_groups: Dict[str, List[int]]):
+        self.model = model
+        self.shift_indices = shift_indices
+        self.var_groups = var_groups
+
+    @classmethod
+    def capture(cls, solver, group_names: List[str]) -> 'ModelTemplate':
+        """골격 생성이 끝난 솔버에서 템플릿 추출 (모델은 복제해서 보관)"""
+        return cls(
+            model=solver.model.Clone(),
+            shift_indices={key: var.Index() for key, var in solver.shifts.items()},
+            var_groups={
+                name: [var.Index() for var in getattr(solver, name)]
+                for name in group_names
+            }
+        )
+
+    def restore_into(self, solver):
+        """템플릿을 복제해 솔버의 모델과 변수 참조를 교체"""
+        model = self.model.Clone()
+        solver.model = model
+        solver.shifts = {
+            key: model.GetBoolVarFromProtoIndex(index)
+            for key, index in self.shift_indices.items()
+        }
+        for name, indices in self.var_groups.items():
+            setattr(solver, name, [var_from_index(model, index) for index in indices])
+
+
+class ModelTemplateCache:
+    """형태별 모델 템플릿 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._templates: 'OrderedDict[Hashable, ModelTemplate]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[ModelTemplate]:
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                self.misses += 1
+                return None
+            self._templates.move_to_end(key)
+            self.hits += 1
+            return template
+
+    def put(self, key: Hashable, template: ModelTemplate):
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        """캐시 적중률 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._templates),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -1,425 +1,126 @@
 """
-Dynamic 2025년 사회복무요원 근무표 자동 생성기 (OR-Tools CP-SAT 기반)
+사회복무요원 근무표 자동 생성기 (OR-Tools CP-SAT 기반) - 명령줄 버전
 
 사용자가 지정한 연월의 달력 구조와 근무 규칙을 기반으로,
 제약 조건을 모두 만족하는 근무표를 생성합니다.
+모델은 웹 버전과 같은 schedule_solver.WorkScheduleSolver를 사용합니다.
+
+사용법:
+    python schedule_generator.py                      # 대화형 입력
+    python schedule_generator.py --batch a.json b.csv --workers 4 --output-dir results
+
+배치 입력:
+    JSON - 설정 객체 하나 또는 목록. 키는 WorkScheduleConfig 인자와 같고
+           (year, month, employees, work_days, fixed_shifts, ...) 선택적으로
+           name(결과 파일 이름), time_limit(초)를 추가할 수 있다.
+    CSV  - 헤더 name,year,month,employees,work_days,time_limit
+           employees는 세미콜론(;)으로 구분한다.
 """
 
-from ortools.sat.python import cp_model
+import argparse
 import calendar
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
-
-
-class ShiftType:
-    """근무 유형 정의"""
-    DAY = 0      # 주간
-    NIGHT = 1    # 야간
-    OFF_B = 2    # 비번/익일휴무
-    OFF_R = 3    # 휴무
-
-    NAMES = ['DAY', 'NIGHT', 'OFF_B', 'OFF_R']
-
-    @staticmethod
-    def get_name(shift_type: int) -> str:
-        return ShiftType.NAMES[shift_type]
-
-
-class WorkScheduleConfig:
-    """근무표 설정"""
-    def __init__(self, year: int, month: int, employees: List[str]):
-        self.year = year
-        self.month = month
-        self.employees = employees
-        self.num_employees = len(employees)
-
-        # 해당 월의 일수 자동 계산
-        self.num_days = calendar.monthrange(year, month)[1]
-
-        # 1일의 요일 (0=월요일, 6=일요일)
-        self.first_day_weekday = calendar.monthrange(year, month)[0]
-
-        # 말일의 요일
-        last_day = datetime(year, month, self.num_days)
-        self.last_day_weekday = last_day.weekday()
-
-        # 근무-휴일 비율 (향후 변경 가능하도록 변수로 정의)
-        self.work_days = 20  # 실질 근무일수 (DAY + NIGHT + OFF_B)
-        self.rest_days = self.num_days - self.work_days  # 순수 휴일 (OFF_R)
-
-        # 고정 근무 (특정 인원/날짜/근무 지정)
-        self.fixed_shifts: List[Tuple[int, int, int]] = []  # (employee_idx, day, shift_type)
-
-    def add_fixed_shift(self, employee_idx: int, day: int, shift_type: int):
-        """특정 인원/날짜/근무를 고정"""
-        self.fixed_shifts.append((employee_idx, day, shift_type))
-
-    def print_info(self):
-        """설정 정보 출력"""
-        print(f"\n{'='*60}")
-        print(f"📅 근무표 생성 설정 정보")
-        print(f"{'='*60}")
-        print(f"대상 연월: {self.year}년 {self.month}월")
-        print(f"총 일수: {self.num_days}일")
-        print(f"1일 요일: {calendar.day_name[self.first_day_weekday]}")
-        print(f"말일 요일: {calendar.day_name[self.last_day_weekday]}")
-        print(f"인원 수: {self.num_employees}명")
-        print(f"인원 명단: {', '.join(self.employees)}")
-        print(f"실질 근무일수: {self.work_days}일 (DAY + NIGHT + OFF_B)")
-        print(f"순수 휴일: {self.rest_days}일 (OFF_R)")
-        if self.fixed_shifts:
-            print(f"\n고정 근무:")
-            for emp_idx, day, shift in self.fixed_shifts:
-                print(f"  - {self.employees[emp_idx]}: {day+1}일 {ShiftType.get_name(shift)}")
-        print(f"{'='*60}\n")
-
-
-class WorkScheduleGenerator:
-    """근무표 생성기"""
-
-    def __init__(self, config: WorkScheduleConfig):
-        self.config = config
-        self.model = cp_model.CpModel()
-        self.shifts = {}
-        self.solver = cp_model.CpSolver()
-
-        # Soft constraint 위반 카운트 변수들
-        self.consecutive_5plus_violations = []
-        self.offb_to_offr_bonuses = []
-        self.day_imbalance_vars = []
-        self.night_imbalance_vars = []
-
-    def create_variables(self):
-        """의사결정 변수 생성"""
-        print("🔧 의사결정 변수 생성 중...")
-
-        # shifts[i, d, s]: 직원 i가 날짜 d에 근무 유형 s를 하는지 여부 (0 또는 1)
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days):
-                for s in range(4):  # 4가지 근무 유형
-                    self.shifts[(i, d, s)] = self.model.NewBoolVar(
-                        f'shift_e{i}_d{d}_s{ShiftType.get_name(s)}'
-                    )
-
-        print(f"  ✓ 총 {self.config.num_employees * self.config.num_days * 4}개의 변수 생성 완료")
-
-    def add_hard_constraints(self):
-        """필수 제약 조건 추가 (Hard Constraints)"""
-        print("\n🛡️ 필수 제약 조건 추가 중...")
-
-        # 1. 각 직원은 매일 정확히 하나의 근무 유형만 가짐
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days):
-                self.model.Add(
-                    sum(self.shifts[(i, d, s)] for s in range(4)) == 1
-                )
-        print("  ✓ 제약 1: 매일 하나의 근무 유형만 할당")
-
-        # 2. 근무일수 계산 및 총 일수 준수
-        for i in range(self.config.num_employees):
-            # 실질 근무일수 (DAY + NIGHT + OFF_B) = work_days
-            work_shifts = sum(
-                self.shifts[(i, d, s)]
-                for d in range(self.config.num_days)
-                for s in [ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B]
-            )
-            self.model.Add(work_shifts == self.config.work_days)
-
-            # 순수 휴일 (OFF_R) = rest_days
-            rest_shifts = sum(
-                self.shifts[(i, d, ShiftType.OFF_R)]
-                for d in range(self.config.num_days)
-            )
-            self.model.Add(rest_shifts == self.config.rest_days)
-        print(f"  ✓ 제약 2: 실질 근무 {self.config.work_days}일, 순수 휴일 {self.config.rest_days}일")
-
-        # 3. NIGHT 근무 다음 날은 반드시 OFF_B (양방향 제약)
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days - 1):
-                # NIGHT(d) → OFF_B(d+1)
-                self.model.Add(
-                    self.shifts[(i, d+1, ShiftType.OFF_B)] >= self.shifts[(i, d, ShiftType.NIGHT)]
-                )
-
-            # OFF_B는 전날 NIGHT가 있었을 때만 가능
-            for d in range(self.config.num_days):
-                if d == 0:
-                    # 1일에 OFF_B가 있다면, 전월 말일에 NIGHT가 있었다고 가정
-                    # (실제로는 전월 데이터가 없으므로, 1일 OFF_B를 허용하지 않거나 별도 처리)
-                    # 여기서는 1일 OFF_B를 허용하지 않음
-                    self.model.Add(self.shifts[(i, d, ShiftType.OFF_B)] == 0)
-                else:
-                    # OFF_B(d) → NIGHT(d-1)
-                    self.model.Add(
-                        self.shifts[(i, d, ShiftType.OFF_B)] <= self.shifts[(i, d-1, ShiftType.NIGHT)]
-                    )
-        print("  ✓ 제약 3: NIGHT 근무 다음 날은 반드시 OFF_B (양방향)")
-
-        # 4. 최대 연속 근무 6일 (7일 이상 금지)
-        # 실질 근무 = DAY, NIGHT, OFF_B (OFF_R만 휴무)
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days - 6):
-                # 7일 연속 실질 근무 금지
-                work_in_7days = sum(
-                    self.shifts[(i, d+k, s)]
-                    for k in range(7)
-                    for s in [ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B]
-                )
-                # 7일 중 최소 1일은 OFF_R이어야 함
-                self.model.Add(work_in_7days <= 6)
-        print("  ✓ 제약 4: 최대 연속 근무 6일 (7일 이상 금지)")
-
-        # 5. 모든 날짜에 최소 인원 필수 (DAY ≥ 1, NIGHT ≥ 1)
-        for d in range(self.config.num_days):
-            # 주간 최소 1명
-            self.model.Add(
-                sum(self.shifts[(i, d, ShiftType.DAY)] for i in range(self.config.num_employees)) >= 1
-            )
-            # 야간 최소 1명
-            self.model.Add(
-                sum(self.shifts[(i, d, ShiftType.NIGHT)] for i in range(self.config.num_employees)) >= 1
-            )
-        print("  ✓ 제약 5: 모든 날짜에 DAY ≥ 1, NIGHT ≥ 1")
-
-        # 6. 맨 밑 두 명은 같은 날 같은 근무(DAY/NIGHT) 불가
-        if self.config.num_employees >= 2:
-            last_two = [self.config.num_employees - 2, self.config.num_employees - 1]
-            for d in range(self.config.num_days):
-                for s in [ShiftType.DAY, ShiftType.NIGHT]:
-                    # 두 명이 모두 같은 날 같은 근무를 할 수 없음
-                    self.model.Add(
-                        self.shifts[(last_two[0], d, s)] + self.shifts[(last_two[1], d, s)] <= 1
-                    )
-        print("  ✓ 제약 6: 맨 밑 두 명은 같은 날 같은 근무 불가")
-
-        # 7. 월말/월초 연동: 말일 NIGHT 근무자는 다음 달 1일 OFF_B
-        # 실제로는 다음 달 데이터가 없으므로, 말일 NIGHT를 제한하거나
-        # 말일 NIGHT 시 OFF_B를 이번 달 카운트에서 -1 처리
-        # 여기서는 단순히 말일 NIGHT 근무자가 있다면,
-        # 그 직원의 OFF_B 카운트를 하나 줄여주는 방식으로 처리
-        # (실제로는 다음 달 1일이 OFF_B여야 하므로, 이번 달 OFF_B를 하나 줄임)
-
-        # 이 제약은 복잡하므로, 말일 NIGHT 근무자의 OFF_R을 하나 늘리는 방식으로 처리
-        # (OFF_B가 다음 달로 넘어가므로 이번 달 OFF_R +1)
-        for i in range(self.config.num_employees):
-            last_day = self.config.num_days - 1
-            # 말일에 NIGHT 근무를 하면, 이번 달 OFF_R을 하나 줄여야 함
-            # (다음 달 1일이 OFF_B이므로)
-            # 하지만 이미 OFF_R = rest_days로 고정되어 있으므로,
-            # 말일 NIGHT 근무 시 이번 달 실질 근무를 19일로 조정해야 함
-
-            # 실제로는 다음과 같이 처리:
-            # 말일 NIGHT 시, 이번 달 DAY+NIGHT+OFF_B = 20일이지만
-            # 다음 달 1일 OFF_B가 추가되므로, 실질 근무 21일이 됨
-            # 따라서 말일 NIGHT를 제한하거나, 별도 조정 필요
-
-            # 여기서는 단순히 경고 출력으로 대체 (복잡도 문제)
-            # 또는 말일 NIGHT 시 이번 달 OFF_B를 하나 줄이는 방식
-            pass  # 일단 보류 (요구사항이 애매함)
-
-        print("  ✓ 제약 7: 월말/월초 연동 (보류 - 다음 달 데이터 없음)")
-
-        # 8. 고정 근무 (지정 날짜 근무)
-        for emp_idx, day, shift_type in self.config.fixed_shifts:
-            self.model.Add(self.shifts[(emp_idx, day, shift_type)] == 1)
-        if self.config.fixed_shifts:
-            print(f"  ✓ 제약 8: {len(self.config.fixed_shifts)}개의 고정 근무 적용")
-
-    def add_soft_constraints(self):
-        """형평성 및 최적화 목표 추가 (Soft Constraints)"""
-        print("\n⭐ 형평성 및 최적화 목표 추가 중...")
-
-        # 1. 연속 근무 5일 이상 최소화
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days - 4):
-                # 5일 연속 실질 근무 여부
-                consecutive_5 = self.model.NewBoolVar(f'consecutive_5_e{i}_d{d}')
-                work_in_5days = sum(
-                    self.shifts[(i, d+k, s)]
-                    for k in range(5)
-                    for s in [ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B]
-                )
-                # work_in_5days == 5이면 consecutive_5 = 1
-                self.model.Add(work_in_5days == 5).OnlyEnforceIf(consecutive_5)
-                self.model.Add(work_in_5days < 5).OnlyEnforceIf(consecutive_5.Not())
-
-                self.consecutive_5plus_violations.append(consecutive_5)
-        print(f"  ✓ 목표 1: 연속 근무 5일 이상 최소화 ({len(self.consecutive_5plus_violations)}개 검사)")
-
-        # 2. OFF_B 다음 날 OFF_R 권장
-        for i in range(self.config.num_employees):
-            for d in range(self.config.num_days - 1):
-                # OFF_B(d) 다음 날 OFF_R(d+1) 여부
-                offb_to_offr = self.model.NewBoolVar(f'offb_to_offr_e{i}_d{d}')
-                self.model.AddMultiplicationEquality(
-                    offb_to_offr,
-                    [self.shifts[(i, d, ShiftType.OFF_B)], self.shifts[(i, d+1, ShiftType.OFF_R)]]
-                )
-                self.offb_to_offr_bonuses.append(offb_to_offr)
-        print(f"  ✓ 목표 2: OFF_B 다음 날 OFF_R 권장 ({len(self.offb_to_offr_bonuses)}개 검사)")
-
-        # 3. DAY, NIGHT, 2인 이상 근무 횟수 균등 분배
-        day_counts = []
-        night_counts = []
-
-        for i in range(self.config.num_employees):
-            day_count = sum(self.shifts[(i, d, ShiftType.DAY)] for d in range(self.config.num_days))
-            night_count = sum(self.shifts[(i, d, ShiftType.NIGHT)] for d in range(self.config.num_days))
-
-            day_counts.append(day_count)
-            night_counts.append(night_count)
-
-        # 평균과의 차이를 최소화 (절대값)
-        # 각 직원의 DAY/NIGHT 횟수가 평균에 가까워지도록
-        avg_day = self.config.num_days // self.config.num_employees
-        avg_night = self.config.num_days // self.config.num_employees
-
-        for i in range(self.config.num_employees):
-            day_diff_pos = self.model.NewIntVar(0, self.config.num_days, f'day_diff_pos_e{i}')
-            day_diff_neg = self.model.NewIntVar(0, self.config.num_days, f'day_diff_neg_e{i}')
-
-            self.model.Add(day_counts[i] - avg_day == day_diff_pos - day_diff_neg)
-            self.day_imbalance_vars.extend([day_diff_pos, day_diff_neg])
-
-            night_diff_pos = self.model.NewIntVar(0, self.config.num_days, f'night_diff_pos_e{i}')
-            night_diff_neg = self.model.NewIntVar(0, self.config.num_days, f'night_diff_neg_e{i}')
-
-            self.model.Add(night_counts[i] - avg_night == night_diff_pos - night_diff_neg)
-            self.night_imbalance_vars.extend([night_diff_pos, night_diff_neg])
-
-        print(f"  ✓ 목표 3: DAY/NIGHT 근무 균등 분배 최적화")
-
-    def set_objective(self):
-        """목표 함수 설정"""
-        print("\n🎯 목표 함수 설정 중...")
-
-        objective_terms = []
-
-        # 1. 연속 5일 이상 근무 최소화 (가중치: 높음)
-        objective_terms.extend([v * 100 for v in self.consecutive_5plus_violations])
-
-        # 2. OFF_B → OFF_R 최대화 (음수로 추가하여 최대화)
-        objective_terms.extend([-v * 50 for v in self.offb_to_offr_bonuses])
-
-        # 3. DAY/NIGHT 균등 분배 (차이 최소화)
-        objective_terms.extend([v * 10 for v in self.day_imbalance_vars])
-        objective_terms.extend([v * 10 for v in self.night_imbalance_vars])
-
-        self.model.Minimize(sum(objective_terms))
-        print(f"  ✓ 목표 함수 설정 완료 ({len(objective_terms)}개 항목)")
-
-    def solve(self) -> bool:
-        """모델 해결"""
-        print("\n🔍 CP-SAT 솔버 실행 중...")
-        print("  (복잡한 제약 조건으로 인해 시간이 걸릴 수 있습니다...)\n")
-
-        # 솔버 옵션 설정
-        self.solver.parameters.max_time_in_seconds = 300.0  # 최대 5분
-        self.solver.parameters.log_search_progress = True
-
-        status = self.solver.Solve(self.model)
-
-        status_name = self.solver.StatusName(status)
-        print(f"\n{'='*60}")
-        print(f"솔버 상태: {status_name}")
-        print(f"{'='*60}\n")
-
-        if status == cp_model.OPTIMAL:
-            print("✅ 최적해를 찾았습니다!")
-            return True
-        elif status == cp_model.FEASIBLE:
-            print("✅ 실행 가능한 해를 찾았습니다! (최적은 아닐 수 있음)")
-            return True
-        elif status == cp_model.INFEASIBLE:
-            print("⚠️  경고: 설정된 제약 조건이 너무 강력하여 모든 필수 조건을 만족하는")
-            print("    근무표를 생성할 수 없습니다. 최소한의 필수 조건을 제외한 일부")
-            print("    제약 조건(예: 4일 초과 근무 피하기, 휴무 균등 분포 등)을")
-            print("    완화하거나 인원수와 근무-휴일 비율을 조정해야 합니다.\n")
-            return False
-        else:
-            print(f"⚠️  알 수 없는 상태: {status_name}")
-            return False
-
-    def print_schedule(self):
-        """근무표 출력"""
-        if self.solver.StatusName(self.solver.Solve(self.model)) in ['INFEASIBLE', 'MODEL_INVALID']:
-            return
-
-        print("\n" + "="*80)
-        print(f"📊 {self.config.year}년 {self.config.month}월 근무표")
-        print("="*80)
-
-        # 헤더 출력
-        print(f"\n{'이름':<10}", end='')
-        for d in range(self.config.num_days):
-            print(f"{d+1:>3}", end='')
-        print(f"  {'DAY':<4} {'NIGHT':<5} {'OFF_B':<5} {'OFF_R':<5}")
-        print("-" * 80)
-
-        # 각 직원별 근무표 출력
-        for i, emp_name in enumerate(self.config.employees):
-            print(f"{emp_name:<10}", end='')
-
-            day_count = 0
-            night_count = 0
-            offb_count = 0
-            offr_count = 0
-
-            for d in range(self.config.num_days):
-                assigned_shift = None
-                for s in range(4):
-                    if self.solver.Value(self.shifts[(i, d, s)]) == 1:
-                        assigned_shift = s
-                        break
-
-                shift_symbol = {
-                    ShiftType.DAY: 'D',
-                    ShiftType.NIGHT: 'N',
-                    ShiftType.OFF_B: 'B',
-                    ShiftType.OFF_R: 'R'
-                }.get(assigned_shift, '?')
-
-                print(f"{shift_symbol:>3}", end='')
-
-                if assigned_shift == ShiftType.DAY:
-                    day_count += 1
-                elif assigned_shift == ShiftType.NIGHT:
-                    night_count += 1
-                elif assigned_shift == ShiftType.OFF_B:
-                    offb_count += 1
-                elif assigned_shift == ShiftType.OFF_R:
-                    offr_count += 1
-
-            print(f"  {day_count:<4} {night_count:<5} {offb_count:<5} {offr_count:<5}")
-
-        print("="*80)
-        print("\n범례: D=주간(DAY), N=야간(NIGHT), B=비번(OFF_B), R=휴무(OFF_R)\n")
-
-        # 통계 정보
-        self.print_statistics()
-
-    def print_statistics(self):
-        """통계 정보 출력"""
-        print("\n📈 근무표 통계 정보")
-        print("="*60)
-
-        # 각 날짜별 인원 수
-        print("\n각 날짜별 근무 인원:")
-        print(f"{'날짜':<6} {'주간(DAY)':<12} {'야간(NIGHT)':<12}")
-        print("-" * 40)
-
-        for d in range(self.config.num_days):
-            day_workers = sum(
-                self.solver.Value(self.shifts[(i, d, ShiftType.DAY)])
-                for i in range(self.config.num_employees)
-            )
-            night_workers = sum(
-                self.solver.Value(self.shifts[(i, d, ShiftType.NIGHT)])
-                for i in range(self.config.num_employees)
-            )
-            print(f"{d+1:<6} {day_workers:<12} {night_workers:<12}")
-
-        print("="*60)
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from schedule_solver import ShiftType, WorkScheduleConfig, WorkScheduleSolver
+from solve_capture import SolveCapture
+
+DEFAULT_TIME_LIMIT = 300  # 최대 5분
+
+# 결과 파일 이름에 쓸 수 없는 문자 (경로 구분자, Windows 예약 문자, 제어 문자)
+UNSAFE_NAME_CHARS = set('/\\:*?"<>|') | {chr(c) for c in range(32)}
+
+
+def print_config_info(config: WorkScheduleConfig):
+    """설정 정보 출력"""
+    print(f"\n{'='*60}")
+    print(f"📅 근무표 생성 설정 정보")
+    print(f"{'='*60}")
+    print(f"대상 연월: {config.year}년 {config.month}월")
+    print(f"총 일수: {config.num_days}일")
+    print(f"1일 요일: {calendar.day_name[config.first_day_weekday]}")
+    print(f"말일 요일: {calendar.day_name[config.last_day_weekday]}")
+    print(f"인원 수: {config.num_employees}명")
+    print(f"인원 명단: {', '.join(config.employees)}")
+    print(f"실질 근무일수: {config.work_days}일 (DAY + NIGHT + OFF_B)")
+    print(f"순수 휴일: {config.rest_days}일 (OFF_R)")
+    if config.fixed_shifts:
+        print(f"\n고정 근무:")
+        for fixed in config.fixed_shifts:
+            print(f"  - {config.employees[fixed['employee_idx']]}: {fixed['day']+1}일 "
+                  f"{ShiftType.get_name(fixed['shift_type'])}")
+    print(f"{'='*60}\n")
+
+
+def print_status(status_name: str):
+    """솔버 상태 출력"""
+    print(f"\n{'='*60}")
+    print(f"솔버 상태: {status_name}")
+    print(f"{'='*60}\n")
+
+    if status_name == 'OPTIMAL':
+        print("✅ 최적해를 찾았습니다!")
+    elif status_name == 'FEASIBLE':
+        print("✅ 실행 가능한 해를 찾았습니다! (최적은 아닐 수 있음)")
+    elif status_name == 'INFEASIBLE':
+        print("⚠️  경고: 설정된 제약 조건이 너무 강력하여 모든 필수 조건을 만족하는")
+        print("    근무표를 생성할 수 없습니다. 최소한의 필수 조건을 제외한 일부")
+        print("    제약 조건(예: 4일 초과 근무 피하기, 휴무 균등 분포 등)을")
+        print("    완화하거나 인원수와 근무-휴일 비율을 조정해야 합니다.\n")
+    else:
+        print(f"⚠️  알 수 없는 상태: {status_name}")
+
+
+def print_schedule(result: Dict):
+    """근무표 출력 (솔버가 저장한 해를 그대로 사용)"""
+    info = result['config']
+
+    print("\n" + "="*80)
+    print(f"📊 {info['year']}년 {info['month']}월 근무표")
+    print("="*80)
+
+    # 헤더 출력
+    print(f"\n{'이름':<10}", end='')
+    for d in range(info['num_days']):
+        print(f"{d+1:>3}", end='')
+    print(f"  {'DAY':<4} {'NIGHT':<5} {'OFF_B':<5} {'OFF_R':<5}")
+    print("-" * 80)
+
+    # 각 직원별 근무표 출력
+    for emp in result['schedule']:
+        print(f"{emp['name']:<10}", end='')
+        for shift in emp['shifts']:
+            print(f"{shift['symbol']:>3}", end='')
+        print(f"  {emp['day_count']:<4} {emp['night_count']:<5} "
+              f"{emp['offb_count']:<5} {emp['offr_count']:<5}")
+
+    print("="*80)
+    print("\n범례: D=주간(DAY), N=야간(NIGHT), B=비번(OFF_B), R=휴무(OFF_R)\n")
+
+    # 통계 정보
+    print_statistics(result)
+
+
+def print_statistics(result: Dict):
+    """통계 정보 출력"""
+    print("\n📈 근무표 통계 정보")
+    print("="*60)
+
+    # 각 날짜별 인원 수
+    print("\n각 날짜별 근무 인원:")
+    print(f"{'날짜':<6} {'주간(DAY)':<12} {'야간(NIGHT)':<12}")
+    print("-" * 40)
+
+    for coverage in result['statistics']['daily_coverage']:
+        print(f"{coverage['day']:<6} {coverage['day_workers']:<12} "
+              f"{coverage['night_workers']:<12}")
+
+    print("="*60)
 
 
 def get_user_input() -> Tuple[int, int, List[str]]:
@@ -468,8 +169,149 @@ def get_user_input() -> Tuple[int, int, List[str]]:
     return year, month, employees
 
 
+# ===== 배치 모드 =====
+
+def load_batch_file(path: Path) -> List[Dict]:
+    """JSON/CSV 파일에서 설정 목록 읽기 (이름이 없으면 '파일명_순번')"""
+    if path.suffix.lower() == '.csv':
+        entries = []
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                entry = {
+                    'year': int(row['year']),
+                    'month': int(row['month']),
+                    'employees': [n.strip() for n in row['employees'].split(';') if n.strip()],
+                }
+                if row.get('work_days'):
+                    entry['work_days'] = int(row['work_days'])
+                if row.get('time_limit'):
+                    entry['time_limit'] = float(row['time_limit'])
+                if row.get('name'):
+                    entry['name'] = row['name']
+                entries.append(entry)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data if isinstance(data, list) else [data]
+
+    for index, entry in enumerate(entries, start=1):
+        entry.setdefault('name', f'{path.stem}_{index}')
+        if not is_safe_name(entry['name']):
+            raise ValueError(f"결과 파일 이름으로 쓸 수 없는 설정 이름입니다: {entry['name']!r} ({path})")
+    return entries
+
+
+def is_safe_name(name) -> bool:
+    """--output-dir 안의 파일 이름 하나로만 쓰이는 이름인지 (경로 구분자, '.', '..' 불가)"""
+    return (isinstance(name, str) and name.strip() not in ('', '.', '..')
+            and not UNSAFE_NAME_CHARS & set(name))
+
+
+def solve_entry(entry: Dict, default_time_limit: float,
+                num_workers: Optional[int]) -> Dict:
+    """
+    설정 하나를 풀고 상태, 소요 시간, 결과 반환 (프로세스 풀에서 실행)
+
+    SCHEDULE_CAPTURE_DIR이 있으면 느리거나 실패한 실행을 캡처한다 (solve_capture.py).
+    """
+    params = dict(entry)
+    name = params.pop('name')
+    time_limit = params.pop('time_limit', default_time_limit)
+    capture = SolveCapture.from_env()
+
+    started = time.perf_counter()
+    solver = None
+    try:
+        config = WorkScheduleConfig(**params)
+        config_seconds = time.perf_counter() - started
+        solver = WorkScheduleSolver(config)
+        if capture is not None:
+            capture.prepare(solver)
+        status_name, result = solver.solve(max_time_seconds=time_limit, num_workers=num_workers)
+        if capture is not None:
+            capture.record(params, solver, status_name, time.perf_counter() - started)
+        return {
+            'name': name,
+            'status': status_name,
+            'seconds': time.perf_counter() - started,
+            'solve_seconds': solver.solver.WallTime(),
+            # 설정 생성 + 모델 생성 (모델은 solve() 안에서 만들어짐)
+            'setup_seconds': config_seconds + (solver.build_seconds or 0.0),
+            'result': result
+        }
+    except Exception as e:
+        if capture is not None:
+            capture.record(params, solver, 'ERROR', time.perf_counter() - started, error=e)
+        return {
+            'name': name,
+            'status': 'ERROR',
+            'seconds': time.perf_counter() - started,
+            'error': str(e),
+            'result': None
+        }
+
+
+def run_batch(paths: List[str], workers: int, output_dir: str,
+              time_limit: float) -> List[Dict]:
+    """
+    여러 설정을 병렬로 풀고 결과를 output_dir/<name>.json에 저장
+
+    CPU 코어를 워커 수로 나눠 각 솔버의 탐색 스레드 수를 정한다.
+    """
+    entries = []
+    for path in paths:
+        entries.extend(load_batch_file(Path(path)))
+
+    # 결과 파일 이름이 되므로 대소문자를 구분하지 않는 파일 시스템(Windows, macOS)에 맞춰 비교
+    keys = [entry['name'].casefold() for entry in entries]
+    duplicates = sorted({entry['name'] for entry, key in zip(entries, keys) if keys.count(key) > 1})
+    if duplicates:
+        raise ValueError(f"설정 이름이 중복됩니다: {', '.join(duplicates)}")
+
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    num_workers = max(1, (os.cpu_count() or 1) // workers)
+
+    print(f"📦 {len(entries)}개 설정, 워커 {workers}개 (솔버당 탐색 스레드 {num_workers}개)")
+    print(f"{'이름':<24} {'상태':<12} {'전체(초)':>9} {'탐색(초)':>9}")
+    print("-" * 60)
+
+    outcomes = []
+    batch_started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_entry, entry, time_limit, num_workers) for entry in entries]
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes.append(outcome)
+            with open(out / f"{outcome['name']}.json", 'w', encoding='utf-8') as f:
+                json.dump(outcome, f, ensure_ascii=False, indent=2)
+            print(f"{outcome['name']:<24} {outcome['status']:<12} {outcome['seconds']:>9.2f} "
+                  f"{outcome.get('solve_seconds', 0.0):>9.2f}")
+
+    print("-" * 60)
+    print(f"총 소요 시간: {time.perf_counter() - batch_started:.2f}초 → {out}")
+    return outcomes
+
+
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='사회복무요원 근무표 자동 생성기')
+    parser.add_argument('--batch', nargs='+', metavar='FILE',
+                        help='설정 파일(JSON/CSV) - 지정하면 대화형 입력 없이 일괄 처리')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='동시에 푸는 설정 수 (기본: 1)')
+    parser.add_argument('--output-dir', default='results',
+                        help='배치 결과 저장 디렉터리 (기본: results)')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help=f'설정당 최대 탐색 시간(초) (기본: {DEFAULT_TIME_LIMIT})')
+    args = parser.parse_args()
+
+    if args.batch:
+        if args.workers < 1:
+            parser.error('--workers는 1 이상이어야 합니다.')
+        run_batch(args.batch, args.workers, args.output_dir, args.time_limit)
+        return
+
     # 사용자 입력 받기
     year, month, employees = get_user_input()
 
@@ -477,26 +319,23 @@ def main():
     config = WorkScheduleConfig(year, month, employees)
 
     # 고정 근무 예시 (필요시 추가)
-    # config.add_fixed_shift(0, 0, ShiftType.DAY)  # 첫 번째 직원, 1일, 주간 근무
-
-    config.print_info()
-
-    # 근무표 생성기 생성
-    generator = WorkScheduleGenerator(config)
+    # config.fixed_shifts.append({'employee_idx': 0, 'day': 0, 'shift_type': ShiftType.DAY})
 
-    # 변수 생성
-    generator.create_variables()
+    print_config_info(config)
 
-    # 제약 조건 추가
-    generator.add_hard_constraints()
-    generator.add_soft_constraints()
+    # 해결 (탐색 과정 출력)
+    print("\n🔍 CP-SAT 솔버 실행 중...")
+    print("  (복잡한 제약 조건으로 인해 시간이 걸릴 수 있습니다...)\n")
+    solver = WorkScheduleSolver(config)
+    solver.solver.parameters.log_search_progress = True
 
-    # 목표 함수 설정
-    generator.set_objective()
+    started = time.perf_counter()
+    status_name, result = solver.solve(max_time_seconds=args.time_limit)
+    print_status(status_name)
 
-    # 해결
-    if generator.solve():
-        generator.print_schedule()
+    if result:
+        print_schedule(result)
+        print(f"소요 시간: {time.perf_counter() - started:.2f}초")
     else:
         print("\n❌ 근무표 생성 실패")
 
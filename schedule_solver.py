@@ -4,9 +4,14 @@ OR-Tools CP-SAT 기반 근무표 생성 솔버
 
 from ortools.sat.python import cp_model
 import calendar
-from datetime import datetime
+import threading
+import time
 from typing import List, Dict, Tuple, Optional
 
+from conflict_graph import build_edges, maximal_cliques, resolve_employee
+from model_cache import ModelTemplate, ModelTemplateCache
+from work_calendar import month_info
+
 
 class ShiftType:
     """근무 유형 정의"""
@@ -15,6 +20,7 @@ class ShiftType:
     OFF_B = 2    # 비번/익일휴무
     OFF_R = 3    # 휴무
 
+    ALL = (DAY, NIGHT, OFF_B, OFF_R)
     NAMES = ['DAY', 'NIGHT', 'OFF_B', 'OFF_R']
     SYMBOLS = ['D', 'N', 'B', 'R']
     FULL_NAMES = ['주간', '야간', '비번', '휴무']
@@ -32,24 +38,81 @@ class ShiftType:
         return ShiftType.FULL_NAMES[shift_type]
 
 
+class ObjectiveMode:
+    """목표 함수 구성 방식"""
+    WEIGHTED = 'weighted'            # 모든 목표를 가중합 하나로 최소화
+    LEXICOGRAPHIC = 'lexicographic'  # 목표 우선순위대로 단계별 최적화
+
+    ALL = [WEIGHTED, LEXICOGRAPHIC]
+
+
+class FairnessMode:
+    """근무 균등 분배 목표 방식"""
+    AVERAGE = 'average'  # 각 직원의 DAY/NIGHT 횟수와 (일수 // 인원수)의 차이 최소화
+    SPREAD = 'spread'    # 직원 간 (최대 - 최소) 횟수 차이 최소화 (주말 근무 포함)
+
+    ALL = [AVERAGE, SPREAD]
+
+
+class PreferenceType:
+    """근무 선호 유형"""
+    PREFER = 'prefer'    # 지정 근무를 원함
+    AVOID = 'avoid'      # 지정 근무를 피하고 싶음
+    DAY_OFF = 'day_off'  # 휴무(OFF_R)를 원함
+
+    ALL = [PREFER, AVOID, DAY_OFF]
+
+
+# 근무 선호 가중치 기본값/최대값과, 인원 한 명의 만족도 중 목표에 반영하는 상한 기본값
+DEFAULT_PREFERENCE_WEIGHT = 10
+MAX_PREFERENCE_WEIGHT = 100
+DEFAULT_PREFERENCE_CAP = 100
+
+# 모델 크기 추정: 변수/제약 하나당 텍스트 형식 바이트 수 (10~100명 모델에서 약 215~226)
+MODEL_BYTES_PER_ELEMENT = 220
+
+
 class WorkScheduleConfig:
     """근무표 설정"""
     def __init__(self, year: int, month: int, employees: List[str],
-                 work_days: int = 20, fixed_shifts: List[Dict] = None):
+                 work_days: int = 20, fixed_shifts: List[Dict] = None,
+                 objective_mode: str = ObjectiveMode.WEIGHTED,
+                 fairness_mode: str = FairnessMode.AVERAGE,
+                 separation_pairs: Optional[List[List]] = None,
+                 separation_groups: Optional[List[List]] = None,
+                 num_alternatives: int = 1,
+                 min_alternative_distance: Optional[int] = None,
+                 leave: Optional[List[Dict]] = None,
+                 unavailable: Optional[List[Dict]] = None,
+                 holidays: Optional[List[int]] = None,
+                 holiday_coverage: Optional[Dict] = None,
+                 holiday_fairness: bool = False,
+                 preferences: Optional[List[Dict]] = None,
+                 preference_cap: Optional[int] = None):
         self.year = year
         self.month = month
         self.employees = employees
         self.num_employees = len(employees)
 
-        # 해당 월의 일수 자동 계산
-        self.num_days = calendar.monthrange(year, month)[1]
+        # 일수, 1일/말일 요일(0=월요일), 주말(토/일) 날짜 인덱스(0-based) - 달력 색인에서 공유
+        info = month_info(year, month)
+        self.num_days = info.num_days
+        self.first_day_weekday = info.first_day_weekday
+        self.last_day_weekday = info.last_day_weekday
+        self.weekend_days = list(info.weekend_days)
 
-        # 1일의 요일 (0=월요일, 6=일요일)
-        self.first_day_weekday = calendar.monthrange(year, month)[0]
+        # 공휴일 (내장 공휴일 표 + 추가 휴일 holidays, 0-based 날짜)
+        self.holiday_names = dict(info.holidays)
+        for d in holidays or []:
+            d = int(d)
+            if not 0 <= d < self.num_days:
+                raise ValueError(f'휴일 날짜가 범위를 벗어났습니다: {d + 1}일')
+            self.holiday_names.setdefault(d, '지정 휴일')
+        self.holiday_days = sorted(self.holiday_names)
 
-        # 말일의 요일
-        last_day = datetime(year, month, self.num_days)
-        self.last_day_weekday = last_day.weekday()
+        # 공휴일 최소 인원 {'day': n, 'night': m} (기본: 평일과 같은 1명)과 공휴일 근무 균등 분배
+        self.holiday_coverage = self._normalize_coverage(holiday_coverage or {})
+        self.holiday_fairness = bool(holiday_fairness)
 
         # 근무-휴일 비율
         self.work_days = work_days  # 실질 근무일수 (DAY + NIGHT + OFF_B)
@@ -58,6 +121,236 @@ class WorkScheduleConfig:
         # 고정 근무 (특정 인원/날짜/근무 지정)
         self.fixed_shifts: List[Dict] = fixed_shifts or []
 
+        # 휴가 {employee_idx, days}: 해당 날짜는 OFF_R로 고정되고 근무일로 인정
+        # 근무 불가 {employee_idx, days, shift_types}: 지정 근무 제외 (기본: DAY/NIGHT)
+        # employee_idx는 번호 또는 이름, days는 0-based 날짜 목록 (day 하나도 가능)
+        self.leave = [self._normalize_cells(entry) for entry in leave or []]
+        self.unavailable = [
+            self._normalize_cells(entry, default_types=[ShiftType.DAY, ShiftType.NIGHT])
+            for entry in unavailable or []
+        ]
+        self._build_shift_domains()
+
+        # 근무 선호 {employee_idx, type, shift_types, days / weekdays, weight}
+        # 인원마다 만족도 = 지켜진 선호의 가중치 합, 목표에는 preference_cap까지만 반영
+        self.preference_cap = DEFAULT_PREFERENCE_CAP if preference_cap is None else int(preference_cap)
+        if self.preference_cap < 1:
+            raise ValueError('선호 만족도 상한은 1 이상이어야 합니다.')
+        self.preferences = [self._normalize_preference(entry) for entry in preferences or []]
+        self._build_preference_weights()
+
+        # 목표 함수 구성 방식 (가중합 / 단계별)
+        if objective_mode not in ObjectiveMode.ALL:
+            raise ValueError(f'알 수 없는 목표 방식입니다: {objective_mode}')
+        self.objective_mode = objective_mode
+
+        # 근무 균등 분배 방식 (평균 대비 차이 / 최대-최소 차이)
+        if fairness_mode not in FairnessMode.ALL:
+            raise ValueError(f'알 수 없는 균등 분배 방식입니다: {fairness_mode}')
+        self.fairness_mode = fairness_mode
+
+        # 같은 날 같은 근무(DAY/NIGHT) 불가 인원 (번호 또는 이름)
+        # 둘 다 지정하지 않으면 기존 규칙대로 맨 밑 두 명
+        if separation_pairs is None and separation_groups is None:
+            separation_pairs = (
+                [[self.num_employees - 2, self.num_employees - 1]]
+                if self.num_employees >= 2 else []
+            )
+        self.separation_edges = build_edges(
+            employees, separation_pairs or [], separation_groups or []
+        )
+        # 충돌 그래프의 극대 클릭 - 클릭마다 날짜·근무별 AddAtMostOne 하나
+        self.separation_cliques = maximal_cliques(self.separation_edges)
+
+        # 대안 근무표 수 (최적해 포함)와 대안 간 최소 차이 칸 수 (기본: 전체 칸의 5%)
+        if num_alternatives < 1:
+            raise ValueError('근무표 수는 1 이상이어야 합니다.')
+        self.num_alternatives = num_alternatives
+        self.min_alternative_distance = (
+            min_alternative_distance if min_alternative_distance is not None
+            else max(4, self.num_employees * self.num_days // 20)
+        )
+
+    def _normalize_cells(self, entry: Dict, default_types: Optional[List[int]] = None) -> Dict:
+        """휴가/근무 불가 항목을 {employee_idx, days[, shift_types]} 형태로 정리"""
+        employee_idx = resolve_employee(entry['employee_idx'], self.employees)
+        days = entry['days'] if 'days' in entry else [entry['day']]
+        days = sorted({int(d) for d in days})
+        for d in days:
+            if not 0 <= d < self.num_days:
+                raise ValueError(f'날짜가 범위를 벗어났습니다: {d + 1}일')
+        normalized = {'employee_idx': employee_idx, 'days': days}
+        if default_types is not None:
+            shift_types = sorted({int(s) for s in entry.get('shift_types', default_types)})
+            if not shift_types or any(s not in ShiftType.ALL for s in shift_types):
+                raise ValueError(f'잘못된 근무 유형입니다: {entry.get("shift_types")}')
+            normalized['shift_types'] = shift_types
+        return normalized
+
+    def _normalize_preference(self, entry: Dict) -> Dict:
+        """
+        근무 선호 항목을 {employee_idx, type, shift_types, days, weight} 형태로 정리
+
+        days(0-based)와 weekdays(0=월요일)를 둘 다 생략하면 그 달 전체,
+        weekdays만 주면 해당 요일인 날짜 전체, 둘 다 주면 교집합이다.
+        day_off는 shift_types 없이 OFF_R로 정해진다.
+        """
+        kind = entry.get('type', PreferenceType.PREFER)
+        if kind not in PreferenceType.ALL:
+            raise ValueError(f'알 수 없는 선호 유형입니다: {kind}')
+        employee_idx = resolve_employee(entry['employee_idx'], self.employees)
+
+        if kind == PreferenceType.DAY_OFF:
+            shift_types = [ShiftType.OFF_R]
+        else:
+            shift_types = sorted({int(s) for s in entry.get('shift_types', [])})
+            if not shift_types or any(s not in ShiftType.ALL for s in shift_types):
+                raise ValueError(f'잘못된 근무 유형입니다: {entry.get("shift_types")}')
+
+        if 'days' in entry or 'day' in entry:
+            days = self._normalize_cells(entry)['days']
+        else:
+            days = list(range(self.num_days))
+        if 'weekdays' in entry:
+            weekdays = {int(w) for w in entry['weekdays']}
+            if any(not 0 <= w < 7 for w in weekdays):
+                raise ValueError(f'요일은 0(월)~6(일)이어야 합니다: {sorted(weekdays)}')
+            days = [d for d in days if (self.first_day_weekday + d) % 7 in weekdays]
+
+        weight = int(entry.get('weight', DEFAULT_PREFERENCE_WEIGHT))
+        if not 1 <= weight <= MAX_PREFERENCE_WEIGHT:
+            raise ValueError(f'선호 가중치는 1~{MAX_PREFERENCE_WEIGHT}이어야 합니다: {weight}')
+        return {'employee_idx': employee_idx, 'type': kind, 'shift_types': shift_types,
+                'days': days, 'weight': weight}
+
+    def _build_preference_weights(self):
+        """
+        근무 선호를 인원별 칸 계수로 합침
+
+        만족도 = preference_base[i] + Σ preference_weights[i][(d, s)] × [근무 (d) == s]
+        - 원하는 근무: 그 근무를 하면 +weight
+        - 피하는 근무: 기본으로 +weight를 주고 그 근무를 하면 -weight
+        같은 칸에 걸린 선호는 계수 하나로 합쳐지므로, 선호가 아무리 많아도 목표식 항은
+        인원당 (날짜 × 근무 유형) 개를 넘지 않는다. preference_max는 만족도의 최대 가능값.
+        days와 weekdays가 겹치지 않아 해당 날짜가 없는 선호는 건너뛴다.
+        """
+        self.preference_weights: Dict[int, Dict[Tuple[int, int], int]] = {}
+        self.preference_base: Dict[int, int] = {}
+        self.preference_max: Dict[int, int] = {}
+        for entry in self.preferences:
+            if not entry['days']:
+                continue
+            i, weight = entry['employee_idx'], entry['weight']
+            coefficients = self.preference_weights.setdefault(i, {})
+            sign = -1 if entry['type'] == PreferenceType.AVOID else 1
+            for d in entry['days']:
+                self.preference_max[i] = self.preference_max.get(i, 0) + weight
+                if sign < 0:
+                    self.preference_base[i] = self.preference_base.get(i, 0) + weight
+                for s in entry['shift_types']:
+                    coefficients[(d, s)] = coefficients.get((d, s), 0) + sign * weight
+        for coefficients in self.preference_weights.values():
+            for cell in [cell for cell, c in coefficients.items() if c == 0]:
+                del coefficients[cell]
+
+    def preference_satisfaction(self, employee_idx: int, row: List[int]) -> int:
+        """근무 배치 한 줄의 선호 만족도 (상한 적용 전)"""
+        coefficients = self.preference_weights.get(employee_idx, {})
+        return self.preference_base.get(employee_idx, 0) + sum(
+            c for (d, s), c in coefficients.items() if row[d] == s
+        )
+
+    def _normalize_coverage(self, coverage: Dict) -> Dict[int, int]:
+        """공휴일 최소 인원을 {ShiftType: 인원수}로 정리"""
+        unknown = set(coverage) - {'day', 'night'}
+        if unknown:
+            raise ValueError(f'공휴일 최소 인원은 day/night만 지정할 수 있습니다: {sorted(unknown)}')
+        normalized = {}
+        for name, shift_type in (('day', ShiftType.DAY), ('night', ShiftType.NIGHT)):
+            count = int(coverage.get(name, 1))
+            if not 1 <= count <= self.num_employees:
+                raise ValueError(f'공휴일 {name} 최소 인원은 1~{self.num_employees}명이어야 합니다.')
+            normalized[shift_type] = count
+        return normalized
+
+    def min_coverage(self, day: int, shift_type: int) -> int:
+        """날짜별 DAY/NIGHT 최소 인원 (공휴일은 holiday_coverage)"""
+        if day in self.holiday_names:
+            return self.holiday_coverage[shift_type]
+        return 1
+
+    @property
+    def holiday_work_average(self) -> int:
+        """공휴일 근무(DAY + NIGHT) 횟수의 1인 평균 (최소 인원 기준, 평균 방식 균등 분배에 사용)"""
+        per_day = self.holiday_coverage[ShiftType.DAY] + self.holiday_coverage[ShiftType.NIGHT]
+        return per_day * len(self.holiday_days) // self.num_employees
+
+    def _build_shift_domains(self):
+        """
+        칸별 가능한 근무 유형 계산
+
+        - unavailable_cells: 사용자가 막은 근무 유형 (검증기에서 위반 표시에 사용)
+        - shift_domains: 위 제한에 1일 OFF_B 금지, NIGHT(d-1)↔OFF_B(d) 규칙을 더한
+          최종 허용 근무 (모든 근무가 가능한 칸은 생략). 솔버는 허용되지 않은
+          근무를 변수로 만들지 않는다.
+        """
+        work_types = {ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B}
+        forbidden: Dict[Tuple[int, int], set] = {}
+        self.leave_days: Dict[int, List[int]] = {}
+        for entry in self.leave:
+            i = entry['employee_idx']
+            for d in entry['days']:
+                forbidden.setdefault((i, d), set()).update(work_types)
+            self.leave_days[i] = sorted(set(self.leave_days.get(i, [])) | set(entry['days']))
+        for entry in self.unavailable:
+            for d in entry['days']:
+                forbidden.setdefault((entry['employee_idx'], d), set()).update(entry['shift_types'])
+        self.unavailable_cells = {cell: frozenset(types) for cell, types in forbidden.items()}
+
+        # 휴가일은 근무일로 인정 - 남은 날짜에서 채울 근무일/휴일 수
+        self.work_targets = [
+            self.work_days - len(self.leave_days.get(i, [])) for i in range(self.num_employees)
+        ]
+        self.rest_targets = [self.num_days - target for target in self.work_targets]
+        for i, target in enumerate(self.work_targets):
+            if target < 0:
+                raise ValueError(f'{self.employees[i]}의 휴가일수가 근무일수를 초과합니다.')
+
+        self.shift_domains: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        for i in range(self.num_employees):
+            allowed = [
+                set(ShiftType.ALL) - forbidden.get((i, d), set()) for d in range(self.num_days)
+            ]
+            # 1일 OFF_B 불가 (전월 데이터 없음), NIGHT(d-1)와 OFF_B(d)는 함께만 가능
+            allowed[0].discard(ShiftType.OFF_B)
+            for d in range(1, self.num_days):
+                if ShiftType.NIGHT not in allowed[d - 1] or ShiftType.OFF_B not in allowed[d]:
+                    allowed[d - 1].discard(ShiftType.NIGHT)
+                    allowed[d].discard(ShiftType.OFF_B)
+            for d, cell in enumerate(allowed):
+                if not cell:
+                    raise ValueError(f'{self.employees[i]}의 {d + 1}일에 가능한 근무가 없습니다.')
+                if len(cell) < len(ShiftType.ALL):
+                    self.shift_domains[(i, d)] = tuple(sorted(cell))
+
+        for d in range(self.num_days):
+            for s in (ShiftType.DAY, ShiftType.NIGHT):
+                if not any(s in self.allowed_shifts(i, d) for i in range(self.num_employees)):
+                    raise ValueError(
+                        f'{d + 1}일에 {ShiftType.get_full_name(s)} 근무가 가능한 인원이 없습니다.'
+                    )
+
+        for fixed in self.fixed_shifts:
+            if fixed['shift_type'] not in self.allowed_shifts(fixed['employee_idx'], fixed['day']):
+                raise ValueError(
+                    f"{self.employees[fixed['employee_idx']]}의 {fixed['day'] + 1}일 고정 근무"
+                    f"({ShiftType.get_name(fixed['shift_type'])})가 휴가/근무 불가 일정과 겹칩니다."
+                )
+
+    def allowed_shifts(self, employee_idx: int, day: int) -> Tuple[int, ...]:
+        """칸에 허용된 근무 유형"""
+        return self.shift_domains.get((employee_idx, day), ShiftType.ALL)
+
     def get_info(self) -> Dict:
         """설정 정보를 딕셔너리로 반환"""
         return {
@@ -70,84 +363,203 @@ class WorkScheduleConfig:
             'employees': self.employees,
             'work_days': self.work_days,
             'rest_days': self.rest_days,
-            'fixed_shifts': self.fixed_shifts
+            'fixed_shifts': self.fixed_shifts,
+            'leave': self.leave,
+            'unavailable': self.unavailable,
+            'work_targets': self.work_targets,
+            'holidays': {d: name for d, name in sorted(self.holiday_names.items())},
+            'holiday_coverage': {'day': self.holiday_coverage[ShiftType.DAY],
+                                 'night': self.holiday_coverage[ShiftType.NIGHT]},
+            'holiday_fairness': self.holiday_fairness,
+            'preferences': self.preferences,
+            'preference_cap': self.preference_cap,
+            'objective_mode': self.objective_mode,
+            'fairness_mode': self.fairness_mode,
+            'separation_groups': [
+                [self.employees[i] for i in clique] for clique in self.separation_cliques
+            ]
         }
 
+    def shape_key(self) -> Tuple:
+        """모델 골격을 결정하는 값 (이름과 고정 근무 제외)"""
+        key = (self.num_days, self.num_employees, self.work_days, self.fairness_mode,
+               tuple(self.separation_cliques), tuple(self.work_targets),
+               tuple(sorted(self.shift_domains.items())))
+        if self.fairness_mode == FairnessMode.SPREAD:
+            key += (tuple(self.weekend_days),)
+        if self.holiday_fairness or set(self.holiday_coverage.values()) != {1}:
+            key += (tuple(self.holiday_days), tuple(sorted(self.holiday_coverage.items())),
+                    self.holiday_fairness)
+        return key
+
+
+class StopSearchCallback(cp_model.CpSolverSolutionCallback):
+    """해를 찾을 때마다 시각을 알리고 취소 여부를 확인해 탐색 중단"""
+
+    def __init__(self, cancel_event: Optional[threading.Event] = None,
+                 on_solution=None):
+        super().__init__()
+        self.cancel_event = cancel_event
+        self.on_solution = on_solution
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        if self.on_solution is not None:
+            self.on_solution()
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.StopSearch()
+
 
 class WorkScheduleSolver:
     """근무표 솔버"""
 
-    def __init__(self, config: WorkScheduleConfig):
+    # 취소 요청 확인 주기 (초) - 해가 나오지 않는 구간에서도 탐색을 멈추기 위함
+    CANCEL_POLL_SECONDS = 0.05
+
+    # 대안 근무표 탐색에 쓰는 전체 시간 비율과, 최적값 대비 허용 목표값 차이 비율
+    ALTERNATIVES_TIME_RATIO = 0.3
+    ALTERNATIVE_OBJECTIVE_SLACK = 0.05
+
+    # 단계별 최적화 순서: (이름, 방향, 목표 변수 목록, 전체 시간 중 비율)
+    # 앞 단계에서 남은 시간은 다음 단계로 넘어간다
+    LEXICOGRAPHIC_STAGES = [
+        ('consecutive_5plus', 'min', 'consecutive_5plus_violations', 0.4),
+        ('offb_to_offr', 'max', 'offb_to_offr_bonuses', 0.3),
+        ('imbalance', 'min', 'imbalance_terms', 0.3),
+        ('preferences', 'max', 'preference_scores', 0.2),
+    ]
+
+    # 템플릿에 보관할 목표 함수 변수 목록
+    TEMPLATE_VAR_GROUPS = [
+        'consecutive_5plus_violations',
+        'offb_to_offr_bonuses',
+        'day_imbalance_vars',
+        'night_imbalance_vars',
+        'holiday_imbalance_vars',
+        'fairness_spread_vars',
+    ]
+
+    def __init__(self, config: WorkScheduleConfig,
+                 model_cache: Optional[ModelTemplateCache] = None):
         self.config = config
         self.model = cp_model.CpModel()
         self.shifts = {}
         self.solver = cp_model.CpSolver()
         self.status = None
 
+        # 모델 템플릿 캐시 (None이면 매번 새로 생성)
+        self.model_cache = model_cache
+        self.cache_hit = False
+
+        # 단계별 최적화 결과 [{stage, status, value, wall_time}, ...]
+        self.stage_results: List[Dict] = []
+
+        # 마지막으로 해를 찾은 목표 (식, 방향, 값) - 대안 탐색 시 목표값 범위 제한에 사용
+        self.last_objective: Optional[Tuple] = None
+
+        # 탐색 시각 기록 (time.monotonic) - 실행 이력/시간 예측에 사용
+        self.search_started_at: Optional[float] = None
+        self.first_solution_at: Optional[float] = None
+        self.last_solution_at: Optional[float] = None
+        self.num_solutions = 0
+        self.search_stats: Optional[Dict] = None
+
+        # 모델 생성에 걸린 시간 (None이면 아직 생성 전 - solve가 생성)
+        self.build_seconds: Optional[float] = None
+
+        # capture_model이면 본 탐색 직후(대안 탐색 제약 추가 전) 모델을 텍스트로 보관 - 재실행용
+        self.capture_model = False
+        self.captured_model: Optional[str] = None
+
         # Soft constraint 위반 카운트 변수들
         self.consecutive_5plus_violations = []
         self.offb_to_offr_bonuses = []
         self.day_imbalance_vars = []
         self.night_imbalance_vars = []
+        self.holiday_imbalance_vars = []
+        self.fairness_spread_vars = []
+
+        # 인원별 근무 선호 만족도 식 (요청마다 다르므로 템플릿에 넣지 않음)
+        self.preference_scores = []
 
     def create_variables(self):
         """의사결정 변수 생성"""
+        # 허용되지 않은 근무는 변수 대신 공용 상수 0, 근무가 하나뿐인 칸은 상수 1
+        # (휴가/근무 불가 칸이 많을수록 모델이 작아짐)
+        never = self.model.NewConstant(0)
+        always = self.model.NewConstant(1)
+
         # shifts[i, d, s]: 직원 i가 날짜 d에 근무 유형 s를 하는지 여부
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days):
+                allowed = self.config.allowed_shifts(i, d)
                 for s in range(4):
-                    self.shifts[(i, d, s)] = self.model.NewBoolVar(
-                        f'shift_e{i}_d{d}_s{ShiftType.get_name(s)}'
-                    )
+                    if s not in allowed:
+                        self.shifts[(i, d, s)] = never
+                    elif len(allowed) == 1:
+                        self.shifts[(i, d, s)] = always
+                    else:
+                        self.shifts[(i, d, s)] = self.model.NewBoolVar(
+                            f'shift_e{i}_d{d}_s{ShiftType.get_name(s)}'
+                        )
+
+    def is_free(self, i: int, d: int, s: int) -> bool:
+        """shifts[i, d, s]가 상수가 아닌 변수인지 여부"""
+        allowed = self.config.allowed_shifts(i, d)
+        return s in allowed and len(allowed) > 1
+
+    def is_rest_day(self, i: int, d: int) -> bool:
+        """OFF_R로 고정된 칸 (휴가 등)"""
+        return self.config.allowed_shifts(i, d) == (ShiftType.OFF_R,)
 
     def add_hard_constraints(self):
         """필수 제약 조건 추가"""
-        # 1. 각 직원은 매일 정확히 하나의 근무 유형만 가짐
+        # 1. 각 직원은 매일 정확히 하나의 근무 유형만 가짐 (근무가 하나뿐인 칸은 제외)
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days):
-                self.model.Add(
-                    sum(self.shifts[(i, d, s)] for s in range(4)) == 1
-                )
+                allowed = self.config.allowed_shifts(i, d)
+                if len(allowed) > 1:
+                    self.model.AddExactlyOne([self.shifts[(i, d, s)] for s in allowed])
 
-        # 2. 근무일수 계산 및 총 일수 준수
+        # 2. 근무일수 계산 및 총 일수 준수 (휴가일만큼 차감된 목표)
         for i in range(self.config.num_employees):
-            # 실질 근무일수 (DAY + NIGHT + OFF_B) = work_days
+            # 실질 근무일수 (DAY + NIGHT + OFF_B) = work_days - 휴가일수
             work_shifts = sum(
                 self.shifts[(i, d, s)]
                 for d in range(self.config.num_days)
                 for s in [ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B]
             )
-            self.model.Add(work_shifts == self.config.work_days)
+            self.model.Add(work_shifts == self.config.work_targets[i])
 
             # 순수 휴일 (OFF_R) = rest_days
             rest_shifts = sum(
                 self.shifts[(i, d, ShiftType.OFF_R)]
                 for d in range(self.config.num_days)
             )
-            self.model.Add(rest_shifts == self.config.rest_days)
+            self.model.Add(rest_shifts == self.config.rest_targets[i])
 
         # 3. NIGHT 근무 다음 날은 반드시 OFF_B (양방향 제약)
+        # 1일 OFF_B 금지와 둘 중 하나가 불가능한 쌍은 변수 도메인에서 이미 제외됨
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days - 1):
+                if ShiftType.NIGHT not in self.config.allowed_shifts(i, d):
+                    continue
                 # NIGHT(d) → OFF_B(d+1)
                 self.model.Add(
                     self.shifts[(i, d+1, ShiftType.OFF_B)] >= self.shifts[(i, d, ShiftType.NIGHT)]
                 )
-
-            # OFF_B는 전날 NIGHT가 있었을 때만 가능
-            for d in range(self.config.num_days):
-                if d == 0:
-                    # 1일에 OFF_B 허용하지 않음 (전월 데이터 없음)
-                    self.model.Add(self.shifts[(i, d, ShiftType.OFF_B)] == 0)
-                else:
-                    # OFF_B(d) → NIGHT(d-1)
-                    self.model.Add(
-                        self.shifts[(i, d, ShiftType.OFF_B)] <= self.shifts[(i, d-1, ShiftType.NIGHT)]
-                    )
+                # OFF_B(d+1) → NIGHT(d)
+                self.model.Add(
+                    self.shifts[(i, d+1, ShiftType.OFF_B)] <= self.shifts[(i, d, ShiftType.NIGHT)]
+                )
 
         # 4. 최대 연속 근무 6일 (7일 이상 금지)
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days - 6):
+                # 휴무가 고정된 날이 있는 구간은 항상 만족
+                if any(self.is_rest_day(i, d+k) for k in range(7)):
+                    continue
                 # 7일 연속 실질 근무 금지
                 work_in_7days = sum(
                     self.shifts[(i, d+k, s)]
@@ -157,36 +569,64 @@ class WorkScheduleSolver:
                 # 7일 중 최소 1일은 OFF_R이어야 함
                 self.model.Add(work_in_7days <= 6)
 
-        # 5. 모든 날짜에 최소 인원 필수 (DAY ≥ 1, NIGHT ≥ 1)
+        # 5. 모든 날짜에 최소 인원 필수 (DAY ≥ 1, NIGHT ≥ 1, 공휴일은 holiday_coverage)
+        for d in range(self.config.num_days):
+            for s in [ShiftType.DAY, ShiftType.NIGHT]:
+                self.model.Add(
+                    sum(self.shifts[(i, d, s)] for i in range(self.config.num_employees))
+                    >= self.config.min_coverage(d, s)
+                )
+
+        # 5-1. 보조 제약: 전날 NIGHT 인원은 OFF_B이므로 2일부터는 매일 3명 이상이 실질 근무
+        # (위 제약에서 유도되지만 명시하면 인원/근무일수가 부족한 경우를 즉시 증명)
         for d in range(self.config.num_days):
             self.model.Add(
-                sum(self.shifts[(i, d, ShiftType.DAY)] for i in range(self.config.num_employees)) >= 1
-            )
-            self.model.Add(
-                sum(self.shifts[(i, d, ShiftType.NIGHT)] for i in range(self.config.num_employees)) >= 1
+                sum(self.shifts[(i, d, s)]
+                    for i in range(self.config.num_employees)
+                    for s in [ShiftType.DAY, ShiftType.NIGHT, ShiftType.OFF_B]) >= (3 if d > 0 else 2)
             )
 
-        # 6. 맨 밑 두 명은 같은 날 같은 근무(DAY/NIGHT) 불가
-        if self.config.num_employees >= 2:
-            last_two = [self.config.num_employees - 2, self.config.num_employees - 1]
+        # 6. 분리 인원은 같은 날 같은 근무(DAY/NIGHT) 불가 (기본: 맨 밑 두 명)
+        for clique in self.config.separation_cliques:
             for d in range(self.config.num_days):
                 for s in [ShiftType.DAY, ShiftType.NIGHT]:
-                    self.model.Add(
-                        self.shifts[(last_two[0], d, s)] + self.shifts[(last_two[1], d, s)] <= 1
-                    )
+                    self.model.AddAtMostOne([self.shifts[(i, d, s)] for i in clique])
 
-        # 7. 고정 근무 (지정 날짜 근무)
+    def add_fixed_shifts(self):
+        """고정 근무 (지정 날짜 근무) - 요청마다 달라지므로 템플릿과 분리"""
         for fixed_shift in self.config.fixed_shifts:
             emp_idx = fixed_shift['employee_idx']
             day = fixed_shift['day']
             shift_type = fixed_shift['shift_type']
             self.model.Add(self.shifts[(emp_idx, day, shift_type)] == 1)
 
+    def add_preferences(self):
+        """
+        근무 선호 만족도 - 요청마다 달라지므로 템플릿과 분리
+
+        선호 가중치를 근무 변수의 목표 계수로 바로 쓰고 칸마다 보조 변수를 만들지 않는다.
+        만족도가 preference_cap을 넘을 수 있는 인원만 상한이 있는 정수 변수 하나를 둬서
+        선호가 많은 한 사람이 목표를 독차지하지 않게 한다.
+        """
+        cap = self.config.preference_cap
+        for i, coefficients in sorted(self.config.preference_weights.items()):
+            satisfaction = self.config.preference_base.get(i, 0) + sum(
+                c * self.shifts[(i, d, s)] for (d, s), c in sorted(coefficients.items())
+            )
+            if self.config.preference_max.get(i, 0) <= cap:
+                self.preference_scores.append(satisfaction)
+                continue
+            capped = self.model.NewIntVar(0, cap, f'preference_e{i}')
+            self.model.Add(capped <= satisfaction)
+            self.preference_scores.append(capped)
+
     def add_soft_constraints(self):
         """형평성 및 최적화 목표 추가"""
         # 1. 연속 근무 5일 이상 최소화
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days - 4):
+                if any(self.is_rest_day(i, d+k) for k in range(5)):
+                    continue
                 consecutive_5 = self.model.NewBoolVar(f'consecutive_5_e{i}_d{d}')
                 work_in_5days = sum(
                     self.shifts[(i, d+k, s)]
@@ -200,6 +640,9 @@ class WorkScheduleSolver:
         # 2. OFF_B 다음 날 OFF_R 권장
         for i in range(self.config.num_employees):
             for d in range(self.config.num_days - 1):
+                if (ShiftType.OFF_B not in self.config.allowed_shifts(i, d)
+                        or ShiftType.OFF_R not in self.config.allowed_shifts(i, d+1)):
+                    continue
                 offb_to_offr = self.model.NewBoolVar(f'offb_to_offr_e{i}_d{d}')
                 self.model.AddMultiplicationEquality(
                     offb_to_offr,
@@ -217,6 +660,20 @@ class WorkScheduleSolver:
             day_counts.append(day_count)
             night_counts.append(night_count)
 
+        if self.config.fairness_mode == FairnessMode.SPREAD:
+            self.add_fairness_spread_terms(day_counts, night_counts)
+            return
+
+        # 공휴일 근무 횟수와 평균의 차이
+        if self.config.holiday_fairness and self.config.holiday_days:
+            average = self.config.holiday_work_average
+            upper = max(len(self.config.holiday_days), average)
+            for i, count in enumerate(self.holiday_work_counts()):
+                diff_pos = self.model.NewIntVar(0, upper, f'holiday_diff_pos_e{i}')
+                diff_neg = self.model.NewIntVar(0, upper, f'holiday_diff_neg_e{i}')
+                self.model.Add(count - average == diff_pos - diff_neg)
+                self.holiday_imbalance_vars.extend([diff_pos, diff_neg])
+
         # 평균과의 차이를 최소화
         avg_day = self.config.num_days // self.config.num_employees
         avg_night = self.config.num_days // self.config.num_employees
@@ -232,8 +689,75 @@ class WorkScheduleSolver:
             self.model.Add(night_counts[i] - avg_night == night_diff_pos - night_diff_neg)
             self.night_imbalance_vars.extend([night_diff_pos, night_diff_neg])
 
-    def set_objective(self):
-        """목표 함수 설정"""
+    def add_fairness_spread_terms(self, day_counts: List, night_counts: List):
+        """
+        직원 간 DAY/NIGHT/주말 근무 횟수의 (최대 - 최소) 차이를 목표로 추가
+
+        최대/최소 변수의 범위는 근무일수와 최소 인원 조건에서 구한다.
+        - DAY ≤ work_days, NIGHT ≤ (work_days + 1) // 2 (NIGHT 다음 날은 OFF_B)
+        - 매일 DAY/NIGHT 각 1명 이상이므로 최대값 ≥ ceil(일수 / 인원수)
+        """
+        num_days = self.config.num_days
+        num_employees = self.config.num_employees
+        work_days = self.config.work_days
+        coverage_share = -(-num_days // num_employees)
+
+        # 보조 제약: OFF_B는 전날 NIGHT와 1:1이므로 DAY + 2×NIGHT - (말일 NIGHT) = work_days
+        # (필수 제약에서 유도되지만 명시하면 LP 하한이 강해진다)
+        for i in range(num_employees):
+            self.model.Add(
+                day_counts[i] + 2 * night_counts[i]
+                - self.shifts[(i, num_days - 1, ShiftType.NIGHT)] == self.config.work_targets[i]
+            )
+
+        self._add_spread('day', day_counts, min(coverage_share, work_days), work_days)
+        max_nights = (work_days + 1) // 2
+        self._add_spread('night', night_counts, min(coverage_share, max_nights), max_nights)
+
+        # 주말 근무 (DAY + NIGHT) - 주말마다 최소 2명 근무
+        weekend_days = self.config.weekend_days
+        if weekend_days:
+            weekend_counts = [
+                sum(self.shifts[(i, d, s)]
+                    for d in weekend_days
+                    for s in [ShiftType.DAY, ShiftType.NIGHT])
+                for i in range(num_employees)
+            ]
+            upper = len(weekend_days)
+            share = -(-2 * len(weekend_days) // num_employees)
+            self._add_spread('weekend', weekend_counts, min(share, upper), upper)
+
+        # 공휴일 근무 (DAY + NIGHT) - 공휴일마다 최소 인원(holiday_coverage) 근무
+        holiday_days = self.config.holiday_days
+        if self.config.holiday_fairness and holiday_days:
+            upper = len(holiday_days)
+            per_day = sum(self.config.holiday_coverage.values())
+            share = -(-per_day * len(holiday_days) // num_employees)
+            self._add_spread('holiday', self.holiday_work_counts(), min(share, upper), upper)
+
+    def holiday_work_counts(self) -> List:
+        """직원별 공휴일 DAY/NIGHT 근무 횟수 식"""
+        return [
+            sum(self.shifts[(i, d, s)]
+                for d in self.config.holiday_days
+                for s in [ShiftType.DAY, ShiftType.NIGHT])
+            for i in range(self.config.num_employees)
+        ]
+
+    def _add_spread(self, name: str, counts: List, max_lower_bound: int, upper_bound: int):
+        """counts의 최대 - 최소를 나타내는 변수 생성"""
+        lowest = self.model.NewIntVar(0, upper_bound, f'{name}_min')
+        highest = self.model.NewIntVar(max_lower_bound, upper_bound, f'{name}_max')
+        for count in counts:
+            self.model.Add(count <= highest)
+            self.model.Add(count >= lowest)
+
+        spread = self.model.NewIntVar(0, upper_bound, f'{name}_spread')
+        self.model.Add(spread == highest - lowest)
+        self.fairness_spread_vars.append(spread)
+
+    def objective_expression(self):
+        """가중합 목표식"""
         objective_terms = []
 
         # 1. 연속 5일 이상 근무 최소화 (가중치: 높음)
@@ -245,16 +769,20 @@ class WorkScheduleSolver:
         # 3. DAY/NIGHT 균등 분배
         objective_terms.extend([v * 10 for v in self.day_imbalance_vars])
         objective_terms.extend([v * 10 for v in self.night_imbalance_vars])
+        objective_terms.extend([v * 10 for v in self.holiday_imbalance_vars])
+        objective_terms.extend([v * 10 for v in self.fairness_spread_vars])
 
-        self.model.Minimize(sum(objective_terms))
+        # 4. 근무 선호 만족도 최대화 (음수로 추가, 가중치: 선호별 weight)
+        objective_terms.extend([-v for v in self.preference_scores])
 
-    def solve(self, max_time_seconds: int = 120) -> Tuple[str, Optional[Dict]]:
-        """
-        모델 해결
+        return sum(objective_terms)
 
-        Returns:
-            (status_name, result_dict or None)
-        """
+    def set_objective(self):
+        """목표 함수 설정 (가중합 최소화)"""
+        self.model.Minimize(self.objective_expression())
+
+    def build_skeleton(self):
+        """고정 근무를 제외한 모델 골격 생성"""
         # 변수 생성
         self.create_variables()
 
@@ -265,22 +793,338 @@ class WorkScheduleSolver:
         # 목표 함수 설정
         self.set_objective()
 
-        # 솔버 옵션 설정
-        self.solver.parameters.max_time_in_seconds = float(max_time_seconds)
+    def build_model(self):
+        """모델 생성 - 같은 형태의 골격이 캐시에 있으면 복제 후 고정 근무만 적용"""
+        started = time.monotonic()
+        if self.model_cache is None:
+            self.build_skeleton()
+        else:
+            key = self.config.shape_key()
+            template = self.model_cache.get(key)
+            if template is None:
+                self.build_skeleton()
+                self.model_cache.put(
+                    key, ModelTemplate.capture(self, self.TEMPLATE_VAR_GROUPS)
+                )
+            else:
+                template.restore_into(self)
+                self.cache_hit = True
 
-        # 해결
-        self.status = self.solver.Solve(self.model)
-        status_name = self.solver.StatusName(self.status)
+        self.add_fixed_shifts()
+        self.add_preferences()
+        if self.preference_scores:
+            self.set_objective()
+        self.build_seconds = time.monotonic() - started
 
-        if self.status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return status_name, self.extract_solution()
+    def model_size(self) -> int:
+        """
+        모델 크기 추정 (텍스트 형식 바이트 수) - 메모리 사용량 추정용
+
+        모델을 텍스트로 바꾸면 큰 모델에서 생성 시간의 1/4 정도가 걸리고 수 MB 문자열이
+        생기므로, 변수/제약 수에 평균 크기를 곱해 추정한다.
+        """
+        proto = self.model.Proto()
+        return MODEL_BYTES_PER_ELEMENT * (len(proto.variables) + len(proto.constraints))
+
+    def solve(self, max_time_seconds: int = 120,
+              cancel_event: Optional[threading.Event] = None,
+              num_workers: Optional[int] = None) -> Tuple[str, Optional[Dict]]:
+        """
+        모델 해결
+
+        Args:
+            cancel_event: set되면 탐색을 중단하고 'CANCELLED'를 반환
+            num_workers: CP-SAT 탐색 스레드 수 (None이면 솔버 기본값)
+
+        Returns:
+            (status_name, result_dict or None)
+        """
+        # 모델 생성 (캐시가 있으면 템플릿 복제, 미리 생성했으면 생략)
+        if self.build_seconds is None:
+            self.build_model()
+        self.search_started_at = time.monotonic()
+
+        if cancel_event is not None and cancel_event.is_set():
+            return 'CANCELLED', None
+
+        if num_workers is not None:
+            self.solver.parameters.num_workers = num_workers
+
+        # 대안 근무표를 요청하면 전체 시간 일부를 대안 탐색에 남겨 둠
+        deadline = time.monotonic() + max_time_seconds
+        main_time = max_time_seconds
+        if self.config.num_alternatives > 1:
+            main_time = max_time_seconds * (1 - self.ALTERNATIVES_TIME_RATIO)
+
+        if self.config.objective_mode == ObjectiveMode.LEXICOGRAPHIC:
+            status_name, grid = self.solve_lexicographic(main_time, cancel_event)
         else:
+            # 솔버 옵션 설정
+            self.solver.parameters.max_time_in_seconds = float(main_time)
+
+            # 해결
+            self.status = self._run_solver(cancel_event)
+            status_name = self.solver.StatusName(self.status)
+            grid = None
+            if self.status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                grid = self.solution_grid()
+                self.last_objective = (
+                    self.objective_expression(), 'min', int(self.solver.ObjectiveValue())
+                )
+
+        self.search_stats = self._search_stats(status_name, self.build_seconds)
+        self.search_stats['proto_bytes'] = self.model_size()
+        if self.capture_model:
+            self.captured_model = str(self.model.Proto())
+
+        if cancel_event is not None and cancel_event.is_set():
+            return 'CANCELLED', None
+        if grid is None:
             return status_name, None
 
-    def extract_solution(self) -> Dict:
-        """해답 추출"""
-        if self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return None
+        result = self.extract_solution(grid)
+        if self.config.num_alternatives > 1:
+            result['alternatives'] = self.find_alternatives(
+                grid, self.config.num_alternatives - 1,
+                deadline - time.monotonic(), cancel_event
+            )
+        return status_name, result
+
+    def solve_feasibility(self, max_time_seconds: float = 5,
+                          num_workers: Optional[int] = None,
+                          cancel_event: Optional[threading.Event] = None) -> str:
+        """
+        필수 제약만으로 해 존재 여부 확인 (목표 함수와 최적화 변수 없음)
+
+        Returns:
+            'FEASIBLE', 'INFEASIBLE', 'UNKNOWN'(시간 초과) 또는 'CANCELLED'
+        """
+        self.create_variables()
+        self.add_hard_constraints()
+        self.add_fixed_shifts()
+
+        self.solver.parameters.max_time_in_seconds = float(max_time_seconds)
+        if num_workers is not None:
+            self.solver.parameters.num_workers = num_workers
+
+        self.status = self._run_solver(cancel_event)
+        if cancel_event is not None and cancel_event.is_set():
+            return 'CANCELLED'
+        if self.status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            return 'FEASIBLE'
+        return self.solver.StatusName(self.status)
+
+    def find_alternatives(self, best_grid: List[List[int]], count: int,
+                          time_limit: float,
+                          cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        최적해와 다른 대안 근무표 탐색
+
+        이미 만든 모델을 그대로 쓰고, 목표값을 최적값 근처로 묶은 뒤
+        앞서 찾은 모든 근무표와 min_alternative_distance칸 이상 다르도록
+        제약(no-good)을 하나씩 추가하며 다시 푼다. 이전 해를 힌트로 준다.
+        """
+        alternatives = []
+        if self.last_objective is None or count <= 0:
+            return alternatives
+
+        expr, sense, value = self.last_objective
+        slack = max(1, int(abs(value) * self.ALTERNATIVE_OBJECTIVE_SLACK))
+        if sense == 'min':
+            self.model.Add(expr <= value + slack)
+        else:
+            self.model.Add(expr >= value - slack)
+
+        num_cells = self.config.num_employees * self.config.num_days
+        found = [best_grid]
+        deadline = time.monotonic() + time_limit
+
+        for k in range(count):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                break
+
+            # 직전 해와 같은 칸 수 ≤ 전체 칸 - 최소 차이
+            previous = found[-1]
+            same_cells = sum(
+                self.shifts[(i, d, previous[i][d])]
+                for i in range(self.config.num_employees)
+                for d in range(self.config.num_days)
+            )
+            self.model.Add(same_cells <= num_cells - self.config.min_alternative_distance)
+            self.add_solution_hint(previous)
+
+            self.solver.parameters.max_time_in_seconds = remaining / (count - k)
+            self.status = self._run_solver(cancel_event)
+            if self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                break
+
+            grid = self.solution_grid()
+            found.append(grid)
+            alternative = self.extract_solution(grid)
+            alternatives.append({
+                'schedule': alternative['schedule'],
+                'statistics': alternative['statistics'],
+                'objective_value': int(self.solver.ObjectiveValue()),
+                'hamming_distance': sum(
+                    1 for i in range(self.config.num_employees)
+                    for d in range(self.config.num_days)
+                    if grid[i][d] != best_grid[i][d]
+                )
+            })
+
+        return alternatives
+
+    @property
+    def imbalance_terms(self) -> List:
+        return (self.day_imbalance_vars + self.night_imbalance_vars
+                + self.holiday_imbalance_vars + self.fairness_spread_vars)
+
+    def solve_lexicographic(self, max_time_seconds: float,
+                            cancel_event: Optional[threading.Event] = None
+                            ) -> Tuple[str, Optional[List[List[int]]]]:
+        """
+        목표 우선순위대로 단계별 최적화
+
+        각 단계의 최적값(또는 찾은 값)을 제약으로 고정하고 다음 목표를 최적화한다.
+        다음 단계는 이전 단계의 해를 힌트로 받아 시작한다.
+
+        Returns:
+            (status_name, solution_grid or None)
+        """
+        deadline = time.monotonic() + max_time_seconds
+        # 목표 변수가 없는 단계(선호 미지정 등)는 건너뜀
+        stages = [stage for stage in self.LEXICOGRAPHIC_STAGES if getattr(self, stage[2])]
+        remaining_ratio = sum(stage[3] for stage in stages)
+        grid = None
+        all_optimal = True
+
+        for name, sense, group, ratio in stages:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                all_optimal = False
+                break
+
+            expr = sum(getattr(self, group))
+            if sense == 'min':
+                self.model.Minimize(expr)
+            else:
+                self.model.Maximize(expr)
+
+            # 남은 시간을 남은 단계 비율대로 배분 (마지막 단계는 전부 사용)
+            budget = remaining * ratio / remaining_ratio
+            remaining_ratio -= ratio
+            self.solver.parameters.max_time_in_seconds = budget
+
+            self.status = self._run_solver(cancel_event)
+            self.stage_results.append({
+                'stage': name,
+                'status': self.solver.StatusName(self.status),
+                'value': (int(self.solver.ObjectiveValue())
+                          if self.status in [cp_model.OPTIMAL, cp_model.FEASIBLE] else None),
+                'wall_time': self.solver.WallTime()
+            })
+
+            if self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                if grid is None:
+                    # 첫 단계에서 해가 없으면 전체 실패
+                    return self.solver.StatusName(self.status), None
+                all_optimal = False
+                break
+
+            grid = self.solution_grid()
+            all_optimal = all_optimal and self.status == cp_model.OPTIMAL
+
+            # 이번 단계 값 고정 후 해를 다음 단계 힌트로 사용
+            value = int(self.solver.ObjectiveValue())
+            self.last_objective = (expr, sense, value)
+            if sense == 'min':
+                self.model.Add(expr <= value)
+            else:
+                self.model.Add(expr >= value)
+            self.add_solution_hint(grid)
+
+        return ('OPTIMAL' if all_optimal else 'FEASIBLE'), grid
+
+    def add_solution_hint(self, grid: List[List[int]]):
+        """근무 배치를 다음 탐색의 힌트로 설정"""
+        self.model.ClearHints()
+        for i in range(self.config.num_employees):
+            for d in range(self.config.num_days):
+                for s in range(4):
+                    if self.is_free(i, d, s):
+                        self.model.AddHint(self.shifts[(i, d, s)], int(grid[i][d] == s))
+
+    def _record_solution(self):
+        now = time.monotonic()
+        if self.first_solution_at is None:
+            self.first_solution_at = now
+        self.last_solution_at = now
+        self.num_solutions += 1
+
+    def _search_stats(self, status_name: str, build_seconds: float) -> Dict:
+        """본 탐색(대안 탐색 제외)의 소요 시간 - 시각은 탐색 시작 기준 초"""
+        started = self.search_started_at
+
+        def since_start(moment: Optional[float]) -> Optional[float]:
+            return None if moment is None else moment - started
+
+        search_seconds = time.monotonic() - started
+        return {
+            'status': status_name,
+            'build_seconds': build_seconds,
+            'search_seconds': search_seconds,
+            'first_solution_seconds': since_start(self.first_solution_at),
+            'last_improvement_seconds': since_start(self.last_solution_at),
+            'optimal_seconds': search_seconds if status_name == 'OPTIMAL' else None,
+            'num_solutions': self.num_solutions,
+            'num_workers': self.solver.parameters.num_workers
+        }
+
+    def _run_solver(self, cancel_event: Optional[threading.Event] = None) -> int:
+        if cancel_event is None:
+            return self.solver.Solve(self.model, StopSearchCallback(on_solution=self._record_solution))
+        return self._solve_cancellable(cancel_event)
+
+    def _solve_cancellable(self, cancel_event: threading.Event) -> int:
+        """취소 이벤트를 감시하며 Solve 실행"""
+        finished = threading.Event()
+
+        def watch():
+            while not finished.wait(self.CANCEL_POLL_SECONDS):
+                if cancel_event.is_set():
+                    self.solver.StopSearch()
+                    return
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        try:
+            return self.solver.Solve(
+                self.model, StopSearchCallback(cancel_event, self._record_solution)
+            )
+        finally:
+            finished.set()
+            watcher.join()
+
+    def solution_grid(self) -> List[List[int]]:
+        """현재 해를 [직원][날짜] = 근무 유형 형태로 추출"""
+        grid = []
+        for i in range(self.config.num_employees):
+            row = []
+            for d in range(self.config.num_days):
+                for s in range(4):
+                    if self.solver.Value(self.shifts[(i, d, s)]) == 1:
+                        row.append(s)
+                        break
+            grid.append(row)
+        return grid
+
+    def extract_solution(self, grid: Optional[List[List[int]]] = None) -> Dict:
+        """해답 추출 (grid가 없으면 현재 솔버의 해 사용)"""
+        if grid is None:
+            if self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                return None
+            grid = self.solution_grid()
 
         schedule = []
         statistics = {
@@ -290,35 +1134,37 @@ class WorkScheduleSolver:
 
         # 각 직원별 근무표 추출
         for i, emp_name in enumerate(self.config.employees):
+            leave_days = set(self.config.leave_days.get(i, []))
             employee_schedule = {
                 'name': emp_name,
                 'shifts': [],
                 'day_count': 0,
                 'night_count': 0,
                 'offb_count': 0,
-                'offr_count': 0
+                'offr_count': 0,
+                'leave_count': len(leave_days)  # offr_count에 포함
             }
 
             for d in range(self.config.num_days):
-                for s in range(4):
-                    if self.solver.Value(self.shifts[(i, d, s)]) == 1:
-                        shift_type = s
-                        employee_schedule['shifts'].append({
-                            'day': d + 1,
-                            'type': shift_type,
-                            'symbol': ShiftType.get_symbol(shift_type),
-                            'name': ShiftType.get_full_name(shift_type)
-                        })
-
-                        if shift_type == ShiftType.DAY:
-                            employee_schedule['day_count'] += 1
-                        elif shift_type == ShiftType.NIGHT:
-                            employee_schedule['night_count'] += 1
-                        elif shift_type == ShiftType.OFF_B:
-                            employee_schedule['offb_count'] += 1
-                        elif shift_type == ShiftType.OFF_R:
-                            employee_schedule['offr_count'] += 1
-                        break
+                shift_type = grid[i][d]
+                cell = {
+                    'day': d + 1,
+                    'type': shift_type,
+                    'symbol': ShiftType.get_symbol(shift_type),
+                    'name': ShiftType.get_full_name(shift_type)
+                }
+                if d in leave_days:
+                    cell['leave'] = True
+                employee_schedule['shifts'].append(cell)
+
+                if shift_type == ShiftType.DAY:
+                    employee_schedule['day_count'] += 1
+                elif shift_type == ShiftType.NIGHT:
+                    employee_schedule['night_count'] += 1
+                elif shift_type == ShiftType.OFF_B:
+                    employee_schedule['offb_count'] += 1
+                elif shift_type == ShiftType.OFF_R:
+                    employee_schedule['offr_count'] += 1
 
             schedule.append(employee_schedule)
             statistics['employee_stats'].append({
@@ -332,12 +1178,10 @@ class WorkScheduleSolver:
         # 날짜별 인원 수 통계
         for d in range(self.config.num_days):
             day_workers = sum(
-                self.solver.Value(self.shifts[(i, d, ShiftType.DAY)])
-                for i in range(self.config.num_employees)
+                1 for i in range(self.config.num_employees) if grid[i][d] == ShiftType.DAY
             )
             night_workers = sum(
-                self.solver.Value(self.shifts[(i, d, ShiftType.NIGHT)])
-                for i in range(self.config.num_employees)
+                1 for i in range(self.config.num_employees) if grid[i][d] == ShiftType.NIGHT
             )
             statistics['daily_coverage'].append({
                 'day': d + 1,
@@ -345,8 +1189,25 @@ class WorkScheduleSolver:
                 'night_workers': night_workers
             })
 
-        return {
+        # 인원별 근무 선호 만족도 (score: 지켜진 선호 가중치 합, counted: 목표에 반영된 값)
+        if self.config.preferences:
+            statistics['preference_satisfaction'] = []
+            for i in sorted(self.config.preference_weights):
+                score = self.config.preference_satisfaction(i, grid[i])
+                max_score = self.config.preference_max.get(i, 0)
+                statistics['preference_satisfaction'].append({
+                    'name': self.config.employees[i],
+                    'score': score,
+                    'max_score': max_score,
+                    'counted': min(score, self.config.preference_cap),
+                    'ratio': round(score / max_score, 3) if max_score else 1.0
+                })
+
+        result = {
             'schedule': schedule,
             'statistics': statistics,
             'config': self.config.get_info()
         }
+        if self.stage_results:
+            result['objective_stages'] = self.stage_results
+        return result
@@ -0,0 +1,241 @@
+"""
+NumPy 기반 근무표 검증기
+
+(인원 × 일수) 근무 유형 배열을 받아 모든 필수 규칙을 검사하고 최적화 목표 점수를
+계산한다. CP-SAT 없이 배열 연산만 사용하므로 사용자가 근무표를 고칠 때마다
+바로 호출할 수 있고, 테스트에서는 솔버 결과의 정답 확인용으로 사용한다.
+
+config는 WorkScheduleConfig처럼 num_employees, num_days, work_days, rest_days,
+fixed_shifts, separation_cliques, weekend_days, fairness_mode 속성을 가진 객체다.
+work_targets/rest_targets(휴가 반영 인원별 목표), unavailable_cells, leave_days,
+holiday_days/holiday_coverage/holiday_fairness(공휴일 최소 인원과 균등 분배),
+preference_weights/preference_base/preference_cap(근무 선호)이 있으면 함께 검사한다.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+DAY, NIGHT, OFF_B, OFF_R = 0, 1, 2, 3
+SYMBOL_TO_TYPE = {'D': DAY, 'N': NIGHT, 'B': OFF_B, 'R': OFF_R}
+
+# 목표 함수 가중치 (WorkScheduleSolver.set_objective와 동일)
+WEIGHT_CONSECUTIVE_5 = 100
+WEIGHT_OFFB_TO_OFFR = 50
+WEIGHT_IMBALANCE = 10
+WEIGHT_PREFERENCE = 1  # 선호별 가중치는 만족도에 이미 반영됨
+
+MAX_CONSECUTIVE_WORK = 6
+SOFT_CONSECUTIVE_WORK = 5
+
+
+def to_grid(cells: Union[np.ndarray, Sequence[Sequence]]) -> np.ndarray:
+    """근무 유형 번호(0~3) 또는 기호('D','N','B','R')로 된 2차원 배열을 int8 배열로 변환"""
+    if isinstance(cells, np.ndarray):
+        grid = cells.astype(np.int8, copy=False)
+    else:
+        grid = np.array([
+            [SYMBOL_TO_TYPE[c] if isinstance(c, str) else c for c in row]
+            for row in cells
+        ], dtype=np.int8)
+    if grid.ndim != 2:
+        raise ValueError('근무표는 (인원 × 일수) 2차원 배열이어야 합니다.')
+    if grid.size and (grid.min() < DAY or grid.max() > OFF_R):
+        raise ValueError('근무 유형은 0~3 (D/N/B/R) 중 하나여야 합니다.')
+    return grid
+
+
+def grid_from_result(result: Dict) -> np.ndarray:
+    """솔버 결과(result['schedule'], 압축 결과는 result['grid'])를 근무 유형 배열로 변환"""
+    if 'grid' in result:
+        return to_grid(result['grid'])
+    return np.array(
+        [[shift['type'] for shift in emp['shifts']] for emp in result['schedule']],
+        dtype=np.int8
+    )
+
+
+def window_sums(mask: np.ndarray, width: int) -> np.ndarray:
+    """각 행에서 길이 width 구간의 합 (누적합 이용) - 결과 열 d는 구간 [d, d+width)"""
+    if mask.shape[1] < width:
+        return np.zeros((mask.shape[0], 0), dtype=np.int32)
+    cumulative = np.zeros((mask.shape[0], mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(mask, axis=1, out=cumulative[:, 1:])
+    return cumulative[:, width:] - cumulative[:, :-width]
+
+
+def _cells(rule: str, rows: np.ndarray, days: np.ndarray) -> List[Dict]:
+    return [
+        {'rule': rule, 'employee_idx': int(i), 'day': int(d)}
+        for i, d in zip(rows.tolist(), days.tolist())
+    ]
+
+
+def check_hard_rules(grid: np.ndarray, config) -> List[Dict]:
+    """필수 규칙 위반 목록 (day는 0-based, 인원 전체에 해당하면 employee_idx=None)"""
+    violations: List[Dict] = []
+    num_employees, num_days = grid.shape
+    if (num_employees, num_days) != (config.num_employees, config.num_days):
+        raise ValueError(
+            f'근무표 크기({num_employees}×{num_days})가 설정'
+            f'({config.num_employees}×{config.num_days})과 다릅니다.'
+        )
+
+    night = grid == NIGHT
+    offb = grid == OFF_B
+    work = grid != OFF_R
+
+    # NIGHT 다음 날은 OFF_B (위반 위치: 다음 날)
+    rows, days = np.nonzero(night[:, :-1] & ~offb[:, 1:])
+    violations += _cells('night_then_offb', rows, days + 1)
+
+    # OFF_B는 전날 NIGHT가 있어야 함, 1일 OFF_B 금지
+    rows, days = np.nonzero(offb[:, 1:] & ~night[:, :-1])
+    violations += _cells('offb_after_night', rows, days + 1)
+    rows = np.nonzero(offb[:, 0])[0]
+    violations += _cells('offb_on_first_day', rows, np.zeros_like(rows))
+
+    # 7일 연속 실질 근무 금지 (위반 위치: 7일째)
+    window = MAX_CONSECUTIVE_WORK + 1
+    rows, starts = np.nonzero(window_sums(work, window) >= window)
+    for cell in _cells('max_consecutive_work', rows, starts + window - 1):
+        cell['start_day'] = cell['day'] - window + 1
+        violations.append(cell)
+
+    # 근무일수 / 휴일수 (휴가일은 근무일로 인정되어 인원별 목표가 다름)
+    work_targets = np.array(
+        getattr(config, 'work_targets', [config.work_days] * num_employees)
+    )
+    rest_targets = np.array(
+        getattr(config, 'rest_targets', [config.rest_days] * num_employees)
+    )
+    work_counts = work.sum(axis=1)
+    for i in np.nonzero(work_counts != work_targets)[0].tolist():
+        violations.append({'rule': 'work_days', 'employee_idx': i, 'day': None,
+                           'actual': int(work_counts[i]), 'expected': int(work_targets[i])})
+    rest_counts = num_days - work_counts
+    for i in np.nonzero(rest_counts != rest_targets)[0].tolist():
+        violations.append({'rule': 'rest_days', 'employee_idx': i, 'day': None,
+                           'actual': int(rest_counts[i]), 'expected': int(rest_targets[i])})
+
+    # 휴가 / 근무 불가 칸
+    leave_days = getattr(config, 'leave_days', {})
+    for (i, d), forbidden in getattr(config, 'unavailable_cells', {}).items():
+        if int(grid[i, d]) in forbidden:
+            rule = 'leave' if d in leave_days.get(i, ()) else 'unavailable'
+            violations.append({'rule': rule, 'employee_idx': i, 'day': d,
+                               'actual': int(grid[i, d])})
+
+    # 매일 DAY ≥ 1, NIGHT ≥ 1 (공휴일은 holiday_coverage)
+    holiday_coverage = getattr(config, 'holiday_coverage', {DAY: 1, NIGHT: 1})
+    holidays = list(getattr(config, 'holiday_days', []))
+    for shift_type, rule in ((DAY, 'day_coverage'), (NIGHT, 'night_coverage')):
+        required = np.ones(num_days, dtype=np.int32)
+        required[holidays] = holiday_coverage[shift_type]
+        counts = (grid == shift_type).sum(axis=0)
+        for d in np.nonzero(counts < required)[0].tolist():
+            violation = {'rule': rule, 'employee_idx': None, 'day': d}
+            if required[d] > 1:
+                violation.update(actual=int(counts[d]), expected=int(required[d]))
+            violations.append(violation)
+
+    # 분리 인원은 같은 날 같은 근무 불가
+    for clique in config.separation_cliques:
+        members = grid[list(clique)]
+        for shift_type in (DAY, NIGHT):
+            for d in np.nonzero((members == shift_type).sum(axis=0) > 1)[0].tolist():
+                together = [clique[k] for k in np.nonzero(members[:, d] == shift_type)[0]]
+                for i in together:
+                    violations.append({'rule': 'separation', 'employee_idx': int(i),
+                                       'day': d, 'with': [int(j) for j in together if j != i]})
+
+    # 고정 근무
+    for fixed in config.fixed_shifts:
+        i, d, s = fixed['employee_idx'], fixed['day'], fixed['shift_type']
+        if grid[i, d] != s:
+            violations.append({'rule': 'fixed_shift', 'employee_idx': i, 'day': d,
+                               'expected': s, 'actual': int(grid[i, d])})
+
+    return violations
+
+
+def preference_score(row: np.ndarray, employee_idx: int, config) -> int:
+    """인원 한 명의 근무 선호 만족도 중 목표에 반영되는 값 (preference_cap까지)"""
+    coefficients = config.preference_weights.get(employee_idx, {})
+    satisfaction = config.preference_base.get(employee_idx, 0) + sum(
+        c for (d, s), c in coefficients.items() if row[d] == s
+    )
+    return min(satisfaction, config.preference_cap)
+
+
+def score_soft_goals(grid: np.ndarray, config) -> Dict:
+    """최적화 목표 항목별 값과 가중합 목표값 (솔버와 같은 방식)"""
+    num_employees, num_days = grid.shape
+    work = grid != OFF_R
+    day_counts = (grid == DAY).sum(axis=1)
+    night_counts = (grid == NIGHT).sum(axis=1)
+
+    consecutive_5 = int((window_sums(work, SOFT_CONSECUTIVE_WORK) == SOFT_CONSECUTIVE_WORK).sum())
+    offb_to_offr = int(((grid[:, :-1] == OFF_B) & (grid[:, 1:] == OFF_R)).sum())
+
+    scores = {
+        'consecutive_5plus': consecutive_5,
+        'offb_to_offr': offb_to_offr,
+    }
+
+    # 공휴일 근무 균등 분배 (holiday_fairness일 때만 목표에 포함)
+    holidays = list(getattr(config, 'holiday_days', [])) if getattr(config, 'holiday_fairness', False) else []
+    holiday_counts = ((grid == DAY) | (grid == NIGHT))[:, holidays].sum(axis=1)
+
+    if getattr(config, 'fairness_mode', 'average') == 'spread':
+        weekend = np.zeros(num_days, dtype=bool)
+        weekend[list(config.weekend_days)] = True
+        weekend_counts = ((grid == DAY) | (grid == NIGHT))[:, weekend].sum(axis=1)
+        spreads = {
+            'day': int(np.ptp(day_counts)) if num_employees else 0,
+            'night': int(np.ptp(night_counts)) if num_employees else 0,
+        }
+        if weekend.any():
+            spreads['weekend'] = int(np.ptp(weekend_counts)) if num_employees else 0
+        if holidays:
+            spreads['holiday'] = int(np.ptp(holiday_counts)) if num_employees else 0
+        scores['fairness_spread'] = spreads
+        imbalance = sum(spreads.values())
+    else:
+        average = num_days // num_employees if num_employees else 0
+        imbalance = int(np.abs(day_counts - average).sum() + np.abs(night_counts - average).sum())
+        if holidays:
+            holiday_imbalance = int(np.abs(holiday_counts - config.holiday_work_average).sum())
+            scores['holiday_imbalance'] = holiday_imbalance
+            imbalance += holiday_imbalance
+    scores['imbalance'] = imbalance
+
+    # 근무 선호 만족도 합 (높을수록 좋음)
+    preference = 0
+    if getattr(config, 'preference_weights', None):
+        preference = sum(preference_score(grid[i], i, config) for i in config.preference_weights)
+        scores['preference_satisfaction'] = preference
+
+    scores['objective'] = (
+        WEIGHT_CONSECUTIVE_5 * consecutive_5
+        - WEIGHT_OFFB_TO_OFFR * offb_to_offr
+        + WEIGHT_IMBALANCE * imbalance
+        - WEIGHT_PREFERENCE * preference
+    )
+    return scores
+
+
+def validate_schedule(cells, config) -> Dict:
+    """
+    근무표 전체 검증
+
+    Returns:
+        {'valid': bool, 'violations': [...], 'scores': {...}}
+    """
+    grid = to_grid(cells)
+    violations = check_hard_rules(grid, config)
+    return {
+        'valid': not violations,
+        'violations': violations,
+        'scores': score_soft_goals(grid, config)
+    }
@@ -0,0 +1,133 @@
+"""
+운영 서버 실행 - 근무표 생성기
+
+개발용 app.run() 대신 pre-fork WSGI 서버(gunicorn)로 여러 워커 프로세스를 띄운다.
+워커들은 SCHEDULE_STORE_PATH의 SQLite 파일로 작업 상태와 결과 캐시를 공유하고,
+CPU 코어를 워커 수로 나눠 솔버 하나의 탐색 스레드 수를 정한다.
+gunicorn이 없는 Windows에서는 waitress(단일 프로세스, 다중 스레드)로 실행한다.
+
+사용법:
+    pip install gunicorn          # Windows: pip install waitress
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# 워커 하나가 동시에 처리하는 요청 수 (솔버 대기 중에도 달력/검증/취소 요청 처리)
+THREADS_PER_WORKER = 8
+
+
+def request_timeout() -> int:
+    """요청 타임아웃 - 솔버 마감 상한 + 결과 정리 여유 + 응답 전송 여유"""
+    import solver_service
+    return solver_service.MAX_SOLVE_SECONDS + solver_service.REQUEST_GRACE_SECONDS + 15
+
+
+def default_workers() -> int:
+    """워커 수 기본값 - 솔버는 CPU를 많이 쓰므로 코어 2개당 1개 (최대 4개)"""
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+def configure_environment(workers: int, store_path: str):
+    """워커 프로세스가 물려받을 공유 저장소 경로, 솔버 스레드 수, 격리 모드 설정 (solver_service import 전)"""
+    os.environ.setdefault('SCHEDULE_STORE_PATH', store_path)
+    # 프로세스마다 솔버 2개(SOLVER_POOL_SIZE)가 동시에 돌 수 있음
+    threads = max(1, (os.cpu_count() or 1) // (workers * 2))
+    os.environ.setdefault('SCHEDULE_SOLVER_THREADS', str(threads))
+    # 솔버는 요청마다 자식 프로세스에서 실행 (메모리 폭주가 워커를 죽이지 않도록)
+    os.environ.setdefault('SCHEDULE_SOLVE_ISOLATION', '1')
+
+
+def run_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class ScheduleApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f'{host}:{port}',
+                'workers': workers,
+                'worker_class': 'gthread',
+                'threads': THREADS_PER_WORKER,
+                'timeout': request_timeout(),
+                'graceful_timeout': request_timeout(),
+                'keepalive': 5,
+                'post_worker_init': post_worker_init,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    ScheduleApplication().run()
+
+
+def post_worker_init(worker):
+    """워커마다 OR-Tools import와 첫 Solve 비용을 미리 지불"""
+    import solver_service
+    solver_service.start_prewarm()
+
+
+def run_waitress(host: str, port: int):
+    from waitress import serve
+
+    import solver_service
+    from app import app
+
+    solver_service.start_prewarm()
+    # channel_request_lookahead > 0이어야 waitress가 클라이언트 연결 끊김을 알려줌
+    serve(app, host=host, port=port, threads=THREADS_PER_WORKER,
+          channel_timeout=request_timeout(), channel_request_lookahead=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='근무표 생성기 운영 서버')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='워커 프로세스 수 (gunicorn)')
+    parser.add_argument('--store', default=os.path.join(tempfile.gettempdir(), 'schedule_store.db'),
+                        help='워커 공유 상태 SQLite 파일 경로')
+    parser.add_argument('--solve-memory-mb', type=float, default=None,
+                        help='솔버 자식 프로세스 하나의 RSS 상한 (MB, 기본: 제한 없음)')
+    args = parser.parse_args()
+
+    try:
+        import gunicorn  # noqa: F401
+        use_gunicorn = sys.platform != 'win32'
+    except ImportError:
+        use_gunicorn = False
+
+    workers = args.workers if use_gunicorn else 1
+    configure_environment(workers, args.store)
+    if args.solve_memory_mb is not None:
+        os.environ['SCHEDULE_SOLVE_RSS_MB'] = str(args.solve_memory_mb)
+
+    from shared_store import SharedStore
+    SharedStore(os.environ['SCHEDULE_STORE_PATH']).clear_jobs()
+
+    print("\n" + "="*50)
+    print("  Work Schedule Generator (production)")
+    print(f"  URL: http://{args.host}:{args.port}")
+    print(f"  Server: {'gunicorn' if use_gunicorn else 'waitress'}, workers: {workers}, "
+          f"solver threads: {os.environ['SCHEDULE_SOLVER_THREADS']}")
+    print(f"  Shared store: {os.environ['SCHEDULE_STORE_PATH']}")
+    print(f"  Solver isolation: {os.environ['SCHEDULE_SOLVE_ISOLATION']}, "
+          f"RSS limit: {os.environ.get('SCHEDULE_SOLVE_RSS_MB', '-')} MB")
+    print("="*50 + "\n")
+
+    if use_gunicorn:
+        run_gunicorn(args.host, args.port, workers)
+    else:
+        try:
+            run_waitress(args.host, args.port)
+        except ImportError:
+            sys.exit('gunicorn 또는 waitress가 필요합니다: pip install gunicorn (Windows: waitress)')
+
+
+if __name__ == '__main__':
+    main()
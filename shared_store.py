@@ -0,0 +1,206 @@
+"""
+워커 프로세스 공유 상태 저장소 (SQLite)
+
+운영 모드(serve.py)에서는 여러 워커 프로세스가 요청을 나눠 받는다. 취소 요청이나
+같은 세션의 새 요청이 작업을 실행 중인 프로세스와 다른 프로세스로 들어올 수 있으므로
+작업 상태와 결과 캐시를 로컬 SQLite 파일 하나에 두고 모든 워커가 함께 사용한다.
+
+경로를 지정하지 않으면 프로세스 내부 공유 메모리 DB를 사용한다 (개발 서버, 테스트).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# 결과 캐시 보관 시간 (초)과 최대 항목 수
+RESULT_TTL_SECONDS = 3600
+RESULT_CACHE_SIZE = 256
+
+# 마감 후 이 시간(초)이 지나도 남아 있는 작업은 정리
+STALE_JOB_SECONDS = 60
+
+# 결과가 시간 제한과 무관한 상태만 캐시 (증명된 최적해 / 해 없음)
+CACHEABLE_STATUSES = ('OPTIMAL', 'INFEASIBLE')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    session_id TEXT,
+    pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    deadline_at REAL NOT NULL,
+    cancel_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_session ON jobs (session_id);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    result TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def params_key(params: Dict) -> str:
+    """근무표 설정의 캐시 키 (키 순서와 무관)"""
+    encoded = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class SharedStore:
+    """작업 상태(ID, 세션, 취소 요청)와 근무표 결과 캐시"""
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            # 프로세스마다 다른 이름의 공유 메모리 DB (연결 하나를 열어 두어야 유지됨)
+            self.path = f'file:schedule_store_{os.getpid()}_{id(self)}?mode=memory&cache=shared'
+        else:
+            self.path = path
+        self.is_memory = path is None
+        self._local = threading.local()
+        self._keeper = self._connect()
+        self._keeper.executescript(SCHEMA)
+        self.result_hits = 0
+        self.result_misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               uri=self.is_memory, check_same_thread=False)
+        if not self.is_memory:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """스레드별 연결"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ===== 작업 상태 =====
+
+    def register_job(self, job_id: str, session_id: Optional[str],
+                     deadline_seconds: float) -> Optional[str]:
+        """
+        작업 등록 - 같은 세션의 실행 중인 작업에는 'superseded' 취소 요청을 남김
+
+        Returns:
+            취소 요청을 받은 이전 작업 ID (없으면 None)
+
+        Raises:
+            ValueError: 이미 실행 중인 작업 ID
+        """
+        now = time.time()
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # 마감이 한참 지난 항목은 비정상 종료된 워커가 남긴 것
+            conn.execute('DELETE FROM jobs WHERE deadline_at < ?', (now - STALE_JOB_SECONDS,))
+            if conn.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,)).fetchone():
+                raise ValueError(f'이미 실행 중인 작업 ID입니다: {job_id}')
+            previous = None
+            if session_id:
+                row = conn.execute(
+                    'SELECT job_id FROM jobs WHERE session_id = ? AND cancel_reason IS NULL '
+                    'ORDER BY created_at DESC LIMIT 1', (session_id,)
+                ).fetchone()
+                if row:
+                    previous = row[0]
+                    conn.execute(
+                        "UPDATE jobs SET cancel_reason = 'superseded' WHERE job_id = ?", (previous,)
+                    )
+            conn.execute(
+                'INSERT INTO jobs (job_id, session_id, pid, created_at, deadline_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (job_id, session_id, os.getpid(), now, now + deadline_seconds)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return previous
+
+    def request_cancel(self, job_id: str, reason: str) -> bool:
+        """작업에 취소 요청 기록 (실행 중인 작업이 없으면 False)"""
+        cursor = self.conn.execute(
+            'UPDATE jobs SET cancel_reason = COALESCE(cancel_reason, ?) WHERE job_id = ?',
+            (reason, job_id)
+        )
+        return cursor.rowcount > 0
+
+    def session_job(self, session_id: str) -> Optional[str]:
+        """세션의 가장 최근 작업 ID"""
+        row = self.conn.execute(
+            'SELECT job_id FROM jobs WHERE session_id = ? ORDER BY created_at DESC LIMIT 1',
+            (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def cancel_requests(self, job_ids: Iterable[str]) -> Dict[str, str]:
+        """주어진 작업 중 취소 요청이 있는 작업 {job_id: 사유}"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ','.join('?' * len(job_ids))
+        rows = self.conn.execute(
+            f'SELECT job_id, cancel_reason FROM jobs '
+            f'WHERE cancel_reason IS NOT NULL AND job_id IN ({placeholders})', job_ids
+        ).fetchall()
+        return dict(rows)
+
+    def finish_job(self, job_id: str):
+        self.conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+
+    def clear_jobs(self):
+        """서버 기동 시 이전 실행이 남긴 작업 정리"""
+        self.conn.execute('DELETE FROM jobs')
+
+    def active_job_count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    # ===== 결과 캐시 =====
+
+    def get_result(self, key: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        row = self.conn.execute(
+            'SELECT status, result FROM results WHERE key = ? AND created_at >= ?',
+            (key, time.time() - RESULT_TTL_SECONDS)
+        ).fetchone()
+        if row is None:
+            self.result_misses += 1
+            return None
+        self.result_hits += 1
+        status, result = row
+        return status, (json.loads(result) if result is not None else None)
+
+    def put_result(self, key: str, status: str, result: Optional[Dict]):
+        """증명된 결과만 저장하고 오래된 항목 정리"""
+        if status not in CACHEABLE_STATUSES:
+            return
+        encoded = json.dumps(result, ensure_ascii=False) if result is not None else None
+        conn = self.conn
+        conn.execute(
+            'INSERT OR REPLACE INTO results (key, status, result, created_at) VALUES (?, ?, ?, ?)',
+            (key, status, encoded, time.time())
+        )
+        conn.execute(
+            'DELETE FROM results WHERE created_at < ? OR key NOT IN '
+            '(SELECT key FROM results ORDER BY created_at DESC LIMIT ?)',
+            (time.time() - RESULT_TTL_SECONDS, RESULT_CACHE_SIZE)
+        )
+
+    def stats(self) -> Dict:
+        lookups = self.result_hits + self.result_misses
+        return {
+            'path': None if self.is_memory else self.path,
+            'active_jobs': self.active_job_count(),
+            'cached_results': self.conn.execute('SELECT COUNT(*) FROM results').fetchone()[0],
+            'result_hits': self.result_hits,
+            'result_misses': self.result_misses,
+            'result_hit_rate': self.result_hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,292 @@
+"""
+느리거나 실패한 솔버 실행 캡처와 오프라인 재실행
+
+SCHEDULE_CAPTURE_DIR을 지정하면(기본 꺼짐) 시간이 오래 걸렸거나 해를 얻지 못한
+요청마다 다음을 디렉터리 하나에 저장한다. 오래된 캡처부터 지워 최대 개수를 유지한다.
+
+- meta.json: 근무표 설정(WorkScheduleConfig 인자), 상태, 소요 시간, 시드, 탐색 통계
+- model.pbtxt.gz: 본 탐색에 쓴 CP-SAT 모델 (대안 탐색 제약 추가 전, 단계별 최적화는 마지막 단계)
+- parameters.pbtxt: 솔버 파라미터 (시간 제한, 스레드 수, 시드)
+
+재실행은 설정으로 모델을 다시 만드는 단계(cProfile)와 저장된 모델을 같은 시드로
+푸는 단계(CP-SAT 탐색 로그)를 나눠 측정한다. 탐색 스레드가 여러 개면 interleave_search로
+결정적으로 실행한다.
+
+사용법:
+    SCHEDULE_CAPTURE_DIR=captures python serve.py
+    python solve_capture.py list captures
+    python solve_capture.py replay captures/20250101-120000_..._unknown --workers 1
+"""
+
+import argparse
+import cProfile
+import gzip
+import io
+import json
+import os
+import pstats
+import shutil
+import time
+import traceback
+import uuid
+from typing import Dict, List, Optional
+
+# 캡처 조건: 본 탐색까지 걸린 시간(초)이 이 값 이상이거나 해를 얻지 못한 상태
+DEFAULT_SLOW_SECONDS = 10.0
+FAILED_STATUSES = ('UNKNOWN', 'MODEL_INVALID', 'ERROR')
+
+# 보관할 최대 캡처 수
+DEFAULT_KEEP = 50
+
+META_FILE = 'meta.json'
+MODEL_FILE = 'model.pbtxt.gz'
+PARAMETERS_FILE = 'parameters.pbtxt'
+
+
+class SolveCapture:
+    """캡처 디렉터리와 캡처 조건"""
+
+    def __init__(self, directory: str, slow_seconds: float = DEFAULT_SLOW_SECONDS,
+                 keep: int = DEFAULT_KEEP):
+        self.directory = directory
+        self.slow_seconds = slow_seconds
+        self.keep = keep
+        self.saved = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['SolveCapture']:
+        """SCHEDULE_CAPTURE_DIR이 없으면 None (캡처 안 함)"""
+        directory = os.environ.get('SCHEDULE_CAPTURE_DIR')
+        if not directory:
+            return None
+        return cls(
+            directory,
+            slow_seconds=float(os.environ.get('SCHEDULE_CAPTURE_SLOW_SECONDS', DEFAULT_SLOW_SECONDS)),
+            keep=int(os.environ.get('SCHEDULE_CAPTURE_KEEP', DEFAULT_KEEP))
+        )
+
+    def prepare(self, solver):
+        """풀기 전에 호출 - 본 탐색 직후의 모델을 남기도록 설정"""
+        solver.capture_model = True
+
+    def should_capture(self, status_name: str, seconds: float) -> bool:
+        return status_name in FAILED_STATUSES or seconds >= self.slow_seconds
+
+    def record(self, params: Dict, solver, status_name: str, seconds: float,
+               error: Optional[BaseException] = None) -> Optional[str]:
+        """
+        조건에 맞으면 캡처 저장
+
+        Args:
+            params: WorkScheduleConfig 인자
+            solver: 실행한 WorkScheduleSolver (설정 오류로 만들지 못했으면 None)
+            seconds: 모델 생성부터 본 탐색 종료까지 걸린 시간
+            error: 실행 중 발생한 예외 (status_name은 'ERROR')
+
+        Returns:
+            저장한 캡처 디렉터리 (저장하지 않았으면 None)
+        """
+        if not self.should_capture(status_name, seconds):
+            return None
+
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}_{status_name.lower()}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+
+        # Python 3.8/3.9 호환 - 예외 하나만 받는 형태는 3.10부터
+        error_text = None
+        if error is not None:
+            error_text = ''.join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            )
+        meta = {
+            'params': params,
+            'status': status_name,
+            'seconds': seconds,
+            'captured_at': time.time(),
+            'pid': os.getpid(),
+            'error': error_text,
+            'seed': None,
+            'search_stats': None,
+            'objective': None,
+            'has_model': False
+        }
+        if solver is not None:
+            meta['seed'] = solver.solver.parameters.random_seed
+            meta['search_stats'] = solver.search_stats
+            if solver.last_objective is not None:
+                meta['objective'] = solver.last_objective[2]
+            with open(os.path.join(path, PARAMETERS_FILE), 'w', encoding='utf-8') as f:
+                f.write(str(solver.solver.parameters))
+            if solver.captured_model is not None:
+                with gzip.open(os.path.join(path, MODEL_FILE), 'wt', encoding='utf-8') as f:
+                    f.write(solver.captured_model)
+                meta['has_model'] = True
+
+        with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+
+        self.saved += 1
+        self.rotate()
+        return path
+
+    def rotate(self):
+        """오래된 캡처부터 삭제해 keep개만 남김 (이름이 시각으로 시작하므로 이름순 = 시간순)"""
+        for name in list_captures(self.directory)[:-self.keep or None]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+def list_captures(directory: str) -> List[str]:
+    """캡처 디렉터리 이름 (오래된 순)"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name, META_FILE))
+    )
+
+
+def load_meta(path: str) -> Dict:
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def profile_call(function, top: int):
+    """cProfile로 function 실행 - (반환값, 누적 시간 상위 top개 함수 표)"""
+    profiler = cProfile.Profile()
+    value = profiler.runcall(function)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+    return value, stream.getvalue()
+
+
+def replay(path: str, num_workers: int = 1, seed: Optional[int] = None,
+           time_limit: Optional[float] = None, top: int = 20) -> Dict:
+    """
+    캡처 재실행 - 모델 생성 단계와 탐색 단계를 나눠 측정
+
+    Args:
+        num_workers: 탐색 스레드 수 (1보다 크면 interleave_search로 결정적 실행)
+        seed: 탐색 시드 (None이면 캡처의 시드)
+        time_limit: 탐색 시간 제한 (None이면 캡처의 파라미터)
+        top: 생성 단계 프로파일에서 보여줄 함수 수
+    """
+    from ortools.sat.python import cp_model
+    from schedule_solver import WorkScheduleConfig, WorkScheduleSolver
+
+    meta = load_meta(path)
+    report = {'capture': path, 'original_status': meta['status'],
+              'original_seconds': meta['seconds'], 'original_objective': meta['objective']}
+
+    # 1) 모델 생성 단계 - 설정 검증부터 build_model까지 (Python 코드 프로파일)
+    def build():
+        solver = WorkScheduleSolver(WorkScheduleConfig(**meta['params']))
+        solver.build_model()
+        return solver
+
+    started = time.perf_counter()
+    try:
+        rebuilt, build_profile = profile_call(build, top)
+    except Exception as e:
+        report.update(build_error=repr(e))
+        return report
+    report['build_seconds'] = time.perf_counter() - started
+    report['build_profile'] = build_profile
+    report['variables'] = len(rebuilt.model.Proto().variables)
+    report['constraints'] = len(rebuilt.model.Proto().constraints)
+
+    # 2) 탐색 단계 - 저장된 모델이 없으면 다시 만든 모델 사용
+    if meta['has_model']:
+        model = cp_model.CpModel()
+        with gzip.open(os.path.join(path, MODEL_FILE), 'rt', encoding='utf-8') as f:
+            model.Proto().parse_text_format(f.read())
+    else:
+        model = rebuilt.model
+    report['model_source'] = 'captured' if meta['has_model'] else 'rebuilt'
+    report['captured_constraints'] = len(model.Proto().constraints)
+
+    solver = cp_model.CpSolver()
+    parameters_path = os.path.join(path, PARAMETERS_FILE)
+    if os.path.exists(parameters_path):
+        with open(parameters_path, encoding='utf-8') as f:
+            solver.parameters.parse_text_format(f.read())
+    solver.parameters.num_workers = num_workers
+    solver.parameters.interleave_search = num_workers > 1
+    if seed is not None:
+        solver.parameters.random_seed = seed
+    elif meta['seed'] is not None:
+        solver.parameters.random_seed = meta['seed']
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
+
+    log_lines: List[str] = []
+    solver.parameters.log_search_progress = True
+    solver.parameters.log_to_stdout = False
+    solver.log_callback = log_lines.append
+
+    started = time.perf_counter()
+    status = solver.Solve(model)
+    report.update(
+        search_seconds=time.perf_counter() - started,
+        status=solver.StatusName(status),
+        objective=(solver.ObjectiveValue()
+                   if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None),
+        seed=solver.parameters.random_seed,
+        num_workers=num_workers,
+        response_stats=solver.ResponseStats(),
+        search_log='\n'.join(log_lines)
+    )
+    return report
+
+
+def print_report(report: Dict, show_log: bool):
+    print(f"캡처: {report['capture']}")
+    print(f"원래 실행: {report['original_status']}, {report['original_seconds']:.2f}초, "
+          f"목표값 {report['original_objective']}")
+    if 'build_error' in report:
+        print(f"모델 생성 실패: {report['build_error']}")
+        return
+
+    print(f"\n[모델 생성] {report['build_seconds']:.3f}초 "
+          f"(변수 {report['variables']}개, 제약 {report['constraints']}개)")
+    print(report['build_profile'])
+
+    print(f"[탐색] {report['status']}, {report['search_seconds']:.2f}초, 목표값 {report['objective']} "
+          f"(모델: {report['model_source']}, 시드 {report['seed']}, 스레드 {report['num_workers']})")
+    print(report['response_stats'])
+    if show_log:
+        print(report['search_log'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='솔버 실행 캡처 목록 / 재실행')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    listing = commands.add_parser('list', help='캡처 목록')
+    listing.add_argument('directory')
+
+    rerun = commands.add_parser('replay', help='캡처 재실행 (생성 단계 프로파일 + 탐색 로그)')
+    rerun.add_argument('capture')
+    rerun.add_argument('--workers', type=int, default=1, help='탐색 스레드 수')
+    rerun.add_argument('--seed', type=int, default=None, help='탐색 시드 (기본: 캡처의 시드)')
+    rerun.add_argument('--time-limit', type=float, default=None, help='탐색 시간 제한 (초)')
+    rerun.add_argument('--top', type=int, default=20, help='프로파일에 표시할 함수 수')
+    rerun.add_argument('--log', action='store_true', help='CP-SAT 탐색 로그 출력')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in list_captures(args.directory):
+            meta = load_meta(os.path.join(args.directory, name))
+            params = meta['params']
+            print(f"{name:<48} {meta['status']:<14} {meta['seconds']:>8.2f}s  "
+                  f"{params.get('year')}-{params.get('month')} {len(params.get('employees', []))}명")
+    else:
+        print_report(
+            replay(args.capture, num_workers=args.workers, seed=args.seed,
+                   time_limit=args.time_limit, top=args.top),
+            show_log=args.log
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+솔버 실행 이력과 시간 예측
+
+근무표 생성 요청마다 문제 특징(인원수, 일수, 근무일수, 고정 근무 수 등)과 결과
+(상태, 첫 해 / 마지막 개선 / 최적 증명까지 걸린 시간, 모델 크기와 최대 RSS)를
+로컬 SQLite 파일에 남긴다.
+새 요청이 들어오면 특징이 가까운 과거 실행(k-최근접 이웃)을 찾아
+
+- 시간 제한: 비슷한 문제가 끝나거나 더 나아지지 않은 시각에 여유를 더한 값
+- 탐색 스레드 수: 금방 끝나는 문제는 적게 써서 다른 요청에 코어를 남김
+- 예상 소요 시간(ETA): 화면의 진행 안내에 사용
+
+을 정한다. 비슷한 이력이 부족하면 요청한 마감 시간을 그대로 쓴다.
+
+OR-Tools 없이 동작하므로 app/solver_service에서 솔버를 불러오지 않고 쓸 수 있다.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import work_calendar
+
+# 보관할 최대 실행 기록 수 (오래된 것부터 삭제)
+HISTORY_SIZE = 2000
+
+# 예측에 쓰는 이웃 수와 최소 이웃 수, 이웃으로 인정하는 최대 거리
+NEIGHBORS = 7
+MIN_NEIGHBORS = 3
+MAX_DISTANCE = 2.0
+
+# 예측한 시간 제한의 하한 (초) - 예측이 빗나가도 해 하나는 찾을 시간
+MIN_BUDGET_SECONDS = 5.0
+
+# 이 시간(초) 안에 끝나는 문제는 탐색 스레드를 EASY_WORKERS개만 사용
+EASY_SECONDS = 2.0
+EASY_WORKERS = 2
+
+# 마지막 개선이 시간 제한의 이 비율 이후면 "아직 개선 중이었음"으로 보고 줄이지 않음
+STILL_IMPROVING_RATIO = 0.8
+
+# 특징별 거리 척도 (이 값만큼 차이 나면 거리 1)
+FEATURE_SCALES = {
+    'num_employees': 1.0,
+    'num_days': 3.0,
+    'work_ratio': 0.05,  # 근무일수 / 일수
+    'fixed_count': 5.0,
+    'restricted_count': 10.0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    num_employees INTEGER NOT NULL,
+    num_days INTEGER NOT NULL,
+    work_days INTEGER NOT NULL,
+    fixed_count INTEGER NOT NULL,
+    restricted_count INTEGER NOT NULL,
+    objective_mode TEXT NOT NULL,
+    fairness_mode TEXT NOT NULL,
+    num_workers INTEGER,
+    time_limit REAL NOT NULL,
+    status TEXT NOT NULL,
+    build_seconds REAL,
+    search_seconds REAL,
+    first_solution_seconds REAL,
+    last_improvement_seconds REAL,
+    optimal_seconds REAL,
+    proto_bytes INTEGER,
+    peak_rss_mb REAL
+);
+CREATE INDEX IF NOT EXISTS solves_modes ON solves (objective_mode, fairness_mode);
+"""
+
+FEATURE_COLUMNS = ('num_employees', 'num_days', 'work_days', 'fixed_count', 'restricted_count',
+                   'objective_mode', 'fairness_mode')
+STATS_COLUMNS = ('build_seconds', 'search_seconds', 'first_solution_seconds',
+                 'last_improvement_seconds', 'optimal_seconds', 'proto_bytes', 'peak_rss_mb')
+
+# 이전 버전 파일에 없는 열 (열고 나서 추가)
+ADDED_COLUMNS = {'proto_bytes': 'INTEGER', 'peak_rss_mb': 'REAL'}
+
+
+def default_path() -> str:
+    """SCHEDULE_HISTORY_PATH 또는 사용자 홈 아래 기본 경로"""
+    path = os.environ.get('SCHEDULE_HISTORY_PATH')
+    if path:
+        return path
+    return os.path.join(os.path.expanduser('~'), '.work_schedule_generator', 'solve_history.db')
+
+
+def _count_days(entries) -> int:
+    """{employee_idx, days} 목록의 칸 수"""
+    total = 0
+    for entry in entries or []:
+        days = entry.get('days', [])
+        total += len(days) if isinstance(days, (list, tuple)) else 1
+    return total
+
+
+def features_from_params(params: Dict) -> Dict:
+    """WorkScheduleConfig 인자에서 예측용 특징 추출"""
+    num_days = work_calendar.month_info(int(params['year']), int(params['month'])).num_days
+    return {
+        'num_employees': len(params['employees']),
+        'num_days': num_days,
+        'work_days': int(params.get('work_days', 20)),
+        'fixed_count': len(params.get('fixed_shifts') or []),
+        'restricted_count': _count_days(params.get('leave')) + _count_days(params.get('unavailable')),
+        'objective_mode': str(params.get('objective_mode', 'weighted')),
+        'fairness_mode': str(params.get('fairness_mode', 'average')),
+    }
+
+
+def distance(a: Dict, b: Dict) -> float:
+    """척도로 나눈 특징 차이의 유클리드 거리"""
+    diffs = {
+        'num_employees': a['num_employees'] - b['num_employees'],
+        'num_days': a['num_days'] - b['num_days'],
+        'work_ratio': a['work_days'] / a['num_days'] - b['work_days'] / b['num_days'],
+        'fixed_count': a['fixed_count'] - b['fixed_count'],
+        'restricted_count': a['restricted_count'] - b['restricted_count'],
+    }
+    return math.sqrt(sum((diffs[name] / scale) ** 2 for name, scale in FEATURE_SCALES.items()))
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def estimate_from_neighbors(neighbors: List[Dict], cap_seconds: float,
+                            max_workers: Optional[int]) -> Dict:
+    """
+    이웃 실행 기록으로 시간 제한 / 스레드 수 / ETA 결정
+
+    - 모두 해 없음: 가장 오래 걸린 증명 시간의 3배
+    - 대부분 최적: 가장 오래 걸린 최적 증명 시간의 2배
+    - 그 외: 마지막 개선 시각의 90분위수 × 1.5 (아직 개선 중이던 이웃이 있으면 줄이지 않음)
+    """
+    statuses = [row['status'] for row in neighbors]
+    build = sum(row['build_seconds'] or 0.0 for row in neighbors) / len(neighbors)
+
+    if all(status == 'INFEASIBLE' for status in statuses):
+        basis = 'infeasible'
+        eta = max(row['search_seconds'] for row in neighbors)
+        budget = 3 * eta + 1
+    elif statuses.count('OPTIMAL') * 3 >= len(statuses) * 2:
+        basis = 'optimal'
+        eta = max(row['optimal_seconds'] for row in neighbors if row['status'] == 'OPTIMAL')
+        budget = 2 * eta + 1
+    else:
+        basis = 'last_improvement'
+        improved = [row['last_improvement_seconds'] for row in neighbors
+                    if row['last_improvement_seconds'] is not None]
+        still_improving = any(
+            row['status'] != 'OPTIMAL' and row['last_improvement_seconds'] is not None
+            and row['last_improvement_seconds'] >= STILL_IMPROVING_RATIO * row['time_limit']
+            for row in neighbors
+        )
+        if not improved or still_improving:
+            eta, budget = cap_seconds, cap_seconds
+        else:
+            eta = percentile(improved, 0.9)
+            budget = 1.5 * eta + 2
+
+    budget = min(max(budget, MIN_BUDGET_SECONDS), cap_seconds)
+    num_workers = max_workers
+    if eta < EASY_SECONDS and max_workers:
+        num_workers = min(max_workers, EASY_WORKERS)
+    return {
+        'budget_seconds': budget,
+        'eta_seconds': min(eta, budget) + build,
+        'num_workers': num_workers,
+        'basis': basis,
+        'neighbors': len(neighbors)
+    }
+
+
+class SolveHistory:
+    """솔버 실행 기록 (SQLite 파일) 과 k-최근접 이웃 예측"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(solves)')}
+        for name, kind in ADDED_COLUMNS.items():
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE solves ADD COLUMN {name} {kind}')
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """스레드별 연결"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def record(self, features: Dict, stats: Dict, time_limit: float):
+        """
+        실행 기록 추가
+
+        Args:
+            features: features_from_params 결과
+            stats: WorkScheduleSolver.search_stats (상태, 단계별 소요 시간, 모델 크기,
+                자식 프로세스에서 풀었으면 최대 RSS)
+            time_limit: 본 탐색에 준 시간 제한 (초)
+        """
+        columns = ('created_at',) + FEATURE_COLUMNS + ('num_workers', 'time_limit', 'status') \
+            + STATS_COLUMNS
+        values = ((time.time(),) + tuple(features[name] for name in FEATURE_COLUMNS)
+                  + (stats.get('num_workers'), time_limit, stats['status'])
+                  + tuple(stats.get(name) for name in STATS_COLUMNS))
+        conn = self.conn
+        conn.execute(
+            f"INSERT INTO solves ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+        conn.execute(
+            'DELETE FROM solves WHERE id <= (SELECT MAX(id) FROM solves) - ?', (HISTORY_SIZE,)
+        )
+
+    def neighbors(self, features: Dict, k: int = NEIGHBORS) -> List[Dict]:
+        """같은 목표/공정성 방식의 기록 중 특징이 가까운 k개"""
+        cursor = self.conn.execute(
+            'SELECT * FROM solves WHERE objective_mode = ? AND fairness_mode = ?',
+            (features['objective_mode'], features['fairness_mode'])
+        )
+        names = [column[0] for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        scored = [(distance(features, row), row) for row in rows]
+        scored = [(d, row) for d, row in scored if d <= MAX_DISTANCE]
+        scored.sort(key=lambda item: (item[0], -item[1]['created_at']))
+        return [row for _, row in scored[:k]]
+
+    def predict(self, features: Dict, cap_seconds: float,
+                max_workers: Optional[int] = None) -> Dict:
+        """
+        요청 하나의 시간 제한, 탐색 스레드 수, 예상 소요 시간
+
+        비슷한 이력이 MIN_NEIGHBORS개 미만이면 cap_seconds / max_workers를 그대로
+        쓰고 eta_seconds는 None.
+        """
+        neighbors = self.neighbors(features)
+        if len(neighbors) < MIN_NEIGHBORS:
+            return {
+                'budget_seconds': cap_seconds,
+                'eta_seconds': None,
+                'num_workers': max_workers,
+                'basis': 'default',
+                'neighbors': len(neighbors)
+            }
+        return estimate_from_neighbors(neighbors, cap_seconds, max_workers)
+
+    def stats(self) -> Dict:
+        count, peak = self.conn.execute('SELECT COUNT(*), MAX(peak_rss_mb) FROM solves').fetchone()
+        return {'path': self.path, 'records': count, 'max_peak_rss_mb': peak}
@@ -0,0 +1,235 @@
+"""
+솔버 실행 격리 - 자식 프로세스, 메모리 제한, 메모리 사용량 기록
+
+인원이 많은 근무표를 탐색 스레드 여러 개로 풀면 CP-SAT 메모리가 크게 늘어난다.
+웹 서버 프로세스 안에서 풀면 요청 하나가 서버 전체를 죽일 수 있으므로,
+SCHEDULE_SOLVE_ISOLATION=1(또는 메모리 제한 지정) 이면 솔버를 요청마다 자식
+프로세스에서 실행한다.
+
+- SCHEDULE_SOLVE_RSS_MB: 자식 프로세스 RSS 상한 - 부모가 주기적으로 확인해 넘으면 종료
+  (탐색 스레드 수도 모델 크기로 추정한 메모리가 이 안에 들도록 줄임)
+- SCHEDULE_SOLVE_ADDRESS_SPACE_MB: 주소 공간 상한 (RLIMIT_AS) - 할당 실패는 MemoryError
+  또는 비정상 종료가 된다. 스레드마다 가상 메모리를 크게 예약하므로 RSS 상한보다 넉넉히 준다.
+
+자식 프로세스는 OR-Tools를 미리 import한 forkserver에서 만들어(Linux) 시작 비용이 작다.
+forkserver가 없는 플랫폼(Windows 등)은 spawn을 쓰고, resource 모듈이나 /proc이 없으면
+해당 제한과 측정만 생략한다.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 탐색 스레드 하나가 쓰는 메모리 추정: 모델 텍스트 크기의 배수 (하한 MIN_WORKER_MB)
+# 30명 × 31일 모델(텍스트 약 2.6MB)에서 스레드당 약 25MB 증가
+WORKER_MB_PER_PROTO_MB = 10
+MIN_WORKER_MB = 16
+
+# 자식 프로세스 RSS / 취소 확인 주기 (초)
+POLL_SECONDS = 0.2
+
+# 자식 프로세스가 취소 후 스스로 끝나기를 기다리는 시간 (초) - 넘으면 강제 종료
+STOP_GRACE_SECONDS = 5.0
+
+# forkserver가 미리 import할 모듈 (자식 프로세스마다 OR-Tools import 비용을 내지 않도록)
+PRELOAD_MODULES = ['schedule_solver', 'solver_service']
+
+
+class IsolationSettings:
+    """자식 프로세스 실행 여부와 메모리 제한 (MB, None이면 제한 없음)"""
+
+    def __init__(self, enabled: bool = False, rss_mb: Optional[float] = None,
+                 address_space_mb: Optional[float] = None):
+        self.enabled = enabled or rss_mb is not None or address_space_mb is not None
+        self.rss_mb = rss_mb
+        self.address_space_mb = address_space_mb
+
+    @classmethod
+    def from_env(cls) -> 'IsolationSettings':
+        def megabytes(name: str) -> Optional[float]:
+            value = os.environ.get(name)
+            return float(value) if value else None
+
+        return cls(
+            enabled=os.environ.get('SCHEDULE_SOLVE_ISOLATION', '') not in ('', '0'),
+            rss_mb=megabytes('SCHEDULE_SOLVE_RSS_MB'),
+            address_space_mb=megabytes('SCHEDULE_SOLVE_ADDRESS_SPACE_MB')
+        )
+
+    def to_dict(self) -> Dict:
+        return {'enabled': self.enabled, 'rss_mb': self.rss_mb,
+                'address_space_mb': self.address_space_mb}
+
+
+def current_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """프로세스의 현재 RSS (MB) - /proc이 없으면 None"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """이 프로세스의 최대 RSS (MB) - resource 모듈이 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+def memory_aware_workers(requested: Optional[int], proto_bytes: int,
+                         limit_mb: Optional[float]) -> Optional[int]:
+    """
+    RSS 상한 안에 들어가는 탐색 스레드 수
+
+    현재 RSS(모델 생성 후)에 스레드마다 모델 크기로 추정한 메모리를 더해 상한을
+    넘지 않는 최대 수. 한 개는 항상 허용한다 (넘으면 RSS 감시가 종료).
+    """
+    if limit_mb is None:
+        return requested
+    base_mb = current_rss_mb() or 0.0
+    per_worker_mb = max(MIN_WORKER_MB, WORKER_MB_PER_PROTO_MB * proto_bytes / (1024 * 1024))
+    allowed = max(1, math.floor((limit_mb - base_mb) / per_worker_mb))
+    return min(requested or os.cpu_count() or 1, allowed)
+
+
+_context = None
+_context_lock = threading.Lock()
+
+
+def get_context():
+    """자식 프로세스 생성 방식 (forkserver가 있으면 솔버 모듈을 미리 import해 둠)"""
+    global _context
+    with _context_lock:
+        if _context is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                _context = multiprocessing.get_context('forkserver')
+                _context.set_forkserver_preload(PRELOAD_MODULES)
+            else:
+                _context = multiprocessing.get_context('spawn')
+    return _context
+
+
+def start_server():
+    """forkserver를 미리 띄워 첫 요청의 모듈 import 비용을 없앰 (예열용)"""
+    context = get_context()
+    if context.get_start_method() == 'forkserver':
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+
+
+def _child_main(conn, target: Callable, args: Sequence, kwargs: Dict, cancel_event,
+                address_space_mb: Optional[float]):
+    """자식 프로세스 - 주소 공간 제한 후 target 실행, 결과나 오류를 부모에게 전송"""
+    if address_space_mb is not None and resource is not None:
+        limit = int(address_space_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        value = target(*args, cancel_event=cancel_event, **kwargs)
+        conn.send({'kind': 'ok', 'value': value, 'peak_rss_mb': peak_rss_mb()})
+    except MemoryError:
+        conn.send({'kind': 'memory', 'reason': 'memory_error', 'peak_rss_mb': peak_rss_mb()})
+    except RuntimeError as e:
+        # 주소 공간 제한에 걸리면 스레드 스택을 할당하지 못해 스레드 생성이 실패함
+        if address_space_mb is not None and "can't start new thread" in str(e):
+            conn.send({'kind': 'memory', 'reason': 'address_space', 'peak_rss_mb': peak_rss_mb()})
+        else:
+            conn.send({'kind': 'error', 'error': f'{type(e).__name__}: {e}',
+                       'peak_rss_mb': peak_rss_mb()})
+    except Exception as e:
+        conn.send({'kind': 'error', 'error': f'{type(e).__name__}: {e}',
+                   'peak_rss_mb': peak_rss_mb()})
+    finally:
+        conn.close()
+
+
+def run_isolated(target: Callable, args: Sequence = (), kwargs: Optional[Dict] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 settings: Optional[IsolationSettings] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    target(*args, cancel_event=..., **kwargs)를 자식 프로세스에서 실행
+
+    target과 인자는 pickle할 수 있어야 한다 (모듈 수준 함수). cancel_event가 set되면
+    자식 프로세스의 취소 이벤트를 set하고, 끝나지 않으면 강제 종료한다.
+
+    Returns:
+        {'kind': 'ok' | 'memory' | 'error' | 'crashed' | 'timeout',
+         'value', 'reason', 'error', 'exitcode', 'peak_rss_mb', 'seconds'}
+        peak_rss_mb는 자식이 보고한 최대 RSS와 부모가 측정한 RSS 중 큰 값
+    """
+    settings = settings or IsolationSettings(enabled=True)
+    context = get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    child_cancel = context.Event()
+    process = context.Process(
+        target=_child_main, name='solver-child', daemon=True,
+        args=(sender, target, tuple(args), kwargs or {}, child_cancel, settings.address_space_mb)
+    )
+    started = time.perf_counter()
+    process.start()
+    sender.close()
+
+    outcome: Optional[Dict] = None
+    observed_mb = 0.0
+    stop_requested_at: Optional[float] = None
+    try:
+        while outcome is None:
+            if receiver.poll(POLL_SECONDS):
+                try:
+                    outcome = receiver.recv()
+                except EOFError:
+                    break
+                continue
+            if not process.is_alive():
+                # 종료 직전에 보낸 결과가 남아 있을 수 있음
+                if receiver.poll(0):
+                    continue
+                break
+
+            rss = current_rss_mb(process.pid)
+            if rss is not None:
+                observed_mb = max(observed_mb, rss)
+                if settings.rss_mb is not None and rss > settings.rss_mb:
+                    process.kill()
+                    outcome = {'kind': 'memory', 'reason': 'rss_limit'}
+                    break
+
+            now = time.perf_counter()
+            if stop_requested_at is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    child_cancel.set()
+                    stop_requested_at = now
+                elif timeout is not None and now - started > timeout:
+                    child_cancel.set()
+                    stop_requested_at = now
+            elif now - stop_requested_at > STOP_GRACE_SECONDS:
+                process.kill()
+                outcome = {'kind': 'timeout'}
+                break
+    finally:
+        receiver.close()
+        process.join(STOP_GRACE_SECONDS)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    if outcome is None:
+        # 결과 없이 종료 - 시그널로 죽었으면(OOM, RLIMIT_AS에서 C++ 할당 실패 등) 음수
+        outcome = {'kind': 'crashed', 'exitcode': process.exitcode}
+    outcome.setdefault('exitcode', process.exitcode)
+    outcome['peak_rss_mb'] = max(filter(None, (outcome.get('peak_rss_mb'), observed_mb)),
+                                 default=None)
+    outcome['seconds'] = time.perf_counter() - started
+    return outcome
@@ -0,0 +1,779 @@
+"""
+솔버 실행 서비스
+
+OR-Tools는 import와 첫 Solve에 일회성 비용이 크다. 웹 서버 기동을 막지 않도록
+솔버 모듈은 처음 필요할 때 불러오고, 기동 직후 워커 풀에서 작은 문제를 한 번
+풀어 예열해 둔다. 기동/요청 소요 시간은 StartupMetrics에 기록한다.
+
+요청마다 SolveJob을 만들어 마감 시각과 취소 이벤트를 함께 넘긴다. 같은 세션에서
+새 요청이 들어오면 이전 요청은 자동으로 취소된다.
+
+같은 설정(정규화 후)의 요청이 동시에 들어오면 솔버를 하나만 실행하고(SolveFlight)
+나머지 요청은 그 결과를 함께 기다린다. 기다리는 요청이 모두 취소되어야 솔버가 멈춘다.
+
+작업 ID/세션/취소 요청과 결과 캐시는 SharedStore에 둔다. 운영 모드에서 여러 워커
+프로세스가 같은 파일(SCHEDULE_STORE_PATH)을 쓰므로, 다른 워커로 들어온 취소 요청도
+작업을 실행 중인 워커가 주기적으로 확인해 반영한다.
+
+실제로 푼 결과는 SolveHistory(SCHEDULE_HISTORY_PATH)에 남기고, 웹 요청은 비슷한
+문제의 이력으로 시간 제한과 탐색 스레드 수를 정해 예상 소요 시간과 함께 돌려준다.
+
+격리 모드(solve_isolation)에서는 솔버를 요청마다 자식 프로세스에서 메모리 제한을 걸고
+실행한다. 제한을 넘으면 서버는 그대로 두고 탐색 스레드 1개로, 그래도 안 되면 목표 함수
+없이 필수 규칙만 만족하는 근무표로 단계적으로 물러선다.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import solve_isolation
+from shared_store import SharedStore, params_key
+from solve_capture import SolveCapture
+from solve_history import SolveHistory, features_from_params
+
+# 동시에 실행할 솔버 수 (각 솔버는 내부적으로 여러 스레드를 사용)
+SOLVER_POOL_SIZE = 2
+
+# 요청 마감 시간 상한 (초) - 클라이언트가 더 길게 요청해도 이 값으로 제한
+MAX_SOLVE_SECONDS = 120
+
+# 작업 마감 후 결과 정리(대안 근무표 추출 등)까지 기다리는 시간 (초)
+# 요청 전체 제한 = MAX_SOLVE_SECONDS + REQUEST_GRACE_SECONDS
+REQUEST_GRACE_SECONDS = 15
+
+# 솔버 하나의 CP-SAT 탐색 스레드 수 (운영 모드에서 코어를 워커 수로 나눠 지정)
+SOLVER_THREADS = int(os.environ.get('SCHEDULE_SOLVER_THREADS', '0')) or None
+
+# 다른 워커에서 들어온 취소 요청 확인 주기 (초)
+CANCEL_SYNC_SECONDS = 0.2
+
+# 예열용 문제: 2명은 매일 DAY/NIGHT/OFF_B를 채울 수 없어 즉시 INFEASIBLE로 끝난다
+PREWARM_PARAMS = {
+    'year': 2025,
+    'month': 2,
+    'employees': ['warmup_a', 'warmup_b'],
+    'work_days': 20,
+}
+
+
+class StartupMetrics:
+    """기동 단계별 시각과 콜드/웜 요청 지연시간 기록"""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+        self.requests: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        """기준 시각으로부터 경과 시간(ms) 기록"""
+        with self._lock:
+            self.marks[name] = (time.perf_counter() - self.origin) * 1000
+
+    def record_duration(self, name: str, seconds: float):
+        with self._lock:
+            self.durations[name] = seconds * 1000
+
+    def record_request(self, endpoint: str, seconds: float):
+        """첫 요청은 콜드, 이후 요청은 웜 지연시간으로 집계"""
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            stats = self.requests.get(endpoint)
+            if stats is None:
+                self.requests[endpoint] = {
+                    'cold_ms': elapsed_ms,
+                    'cold_before_prewarm': 'prewarm_done' not in self.marks,
+                    'warm_count': 0,
+                    'warm_total_ms': 0.0,
+                    'warm_min_ms': None,
+                    'warm_max_ms': None
+                }
+                return
+            stats['warm_count'] += 1
+            stats['warm_total_ms'] += elapsed_ms
+            if stats['warm_min_ms'] is None or elapsed_ms < stats['warm_min_ms']:
+                stats['warm_min_ms'] = elapsed_ms
+            if stats['warm_max_ms'] is None or elapsed_ms > stats['warm_max_ms']:
+                stats['warm_max_ms'] = elapsed_ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            requests = {}
+            for endpoint, stats in self.requests.items():
+                requests[endpoint] = dict(stats)
+                requests[endpoint]['warm_avg_ms'] = (
+                    stats['warm_total_ms'] / stats['warm_count']
+                    if stats['warm_count'] else None
+                )
+            return {
+                'marks_ms': dict(self.marks),
+                'durations_ms': dict(self.durations),
+                'requests': requests
+            }
+
+
+STARTUP = StartupMetrics()
+
+_stack: Optional[SimpleNamespace] = None
+_stack_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_prewarm_future: Optional[Future] = None
+_prewarm_lock = threading.Lock()
+_store: Optional[SharedStore] = None
+_store_lock = threading.Lock()
+_history: Optional[SolveHistory] = None
+_history_lock = threading.Lock()
+
+# 느리거나 실패한 실행 캡처 (SCHEDULE_CAPTURE_DIR이 없으면 None)
+CAPTURE = SolveCapture.from_env()
+
+# 자식 프로세스 실행과 메모리 제한 (SCHEDULE_SOLVE_ISOLATION / _RSS_MB / _ADDRESS_SPACE_MB)
+ISOLATION = solve_isolation.IsolationSettings.from_env()
+_isolation_stats = {'solves': 0, 'memory_failures': 0, 'crashes': 0, 'degraded': 0,
+                    'last_peak_rss_mb': None, 'max_peak_rss_mb': None}
+_isolation_lock = threading.Lock()
+
+
+def set_origin(origin: float):
+    """기동 시간 측정 기준 시각 지정 (app 모듈 import 시작 시각)"""
+    STARTUP.origin = origin
+
+
+def load_solver_stack() -> SimpleNamespace:
+    """솔버 모듈(OR-Tools 포함)을 처음 호출될 때 import"""
+    global _stack
+    if _stack is not None:
+        return _stack
+
+    with _stack_lock:
+        if _stack is None:
+            started = time.perf_counter()
+            import schedule_solver
+            import schedule_validator
+            import model_cache
+            import feasibility_sweep
+            import swap_suggest
+
+            _stack = SimpleNamespace(
+                WorkScheduleConfig=schedule_solver.WorkScheduleConfig,
+                WorkScheduleSolver=schedule_solver.WorkScheduleSolver,
+                ShiftType=schedule_solver.ShiftType,
+                validate_schedule=schedule_validator.validate_schedule,
+                to_grid=schedule_validator.to_grid,
+                suggest_swaps=swap_suggest.suggest_swaps,
+                resolve_employee=schedule_solver.resolve_employee,
+                sweep_feasibility=feasibility_sweep.sweep_feasibility,
+                model_cache=model_cache.ModelTemplateCache(max_size=32)
+            )
+            STARTUP.record_duration('solver_import', time.perf_counter() - started)
+            STARTUP.mark('solver_imported')
+    return _stack
+
+
+def get_store() -> SharedStore:
+    """공유 저장소 (SCHEDULE_STORE_PATH가 없으면 프로세스 내부 메모리 DB)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SharedStore(os.environ.get('SCHEDULE_STORE_PATH') or None)
+    return _store
+
+
+def get_history() -> SolveHistory:
+    """솔버 실행 이력 (SCHEDULE_HISTORY_PATH, 없으면 사용자 홈 아래 기본 경로)"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = SolveHistory()
+    return _history
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SOLVER_POOL_SIZE, thread_name_prefix='solver'
+            )
+    return _executor
+
+
+def _resolve(future: Future, outcome=None, error: Optional[BaseException] = None):
+    """Future 완료 처리 (이미 완료된 경우 무시 - 취소와 결과 도착이 겹칠 수 있음)"""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(outcome)
+    except InvalidStateError:
+        pass
+
+
+class SolveJob:
+    """
+    실행 중인 근무표 생성 요청 (마감 시각 및 취소 상태)
+
+    future는 요청별로 따로 두어, 취소된 요청은 솔버가 계속 도는 동안에도
+    바로 ('CANCELLED', None)으로 끝난다.
+    """
+
+    def __init__(self, job_id: str, session_id: Optional[str], deadline_seconds: float):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + deadline_seconds
+        self.cancel_event = threading.Event()
+        self.cancel_reason: Optional[str] = None
+        self.future: Future = Future()
+        self.flight: Optional['SolveFlight'] = None
+        self.estimate: Optional[Dict] = None  # 이력 기반 시간 제한 / 스레드 수 / ETA
+
+    def cancel(self, reason: str):
+        if not self.cancel_event.is_set():
+            self.cancel_reason = reason
+            self.cancel_event.set()
+            _resolve(self.future, ('CANCELLED', None))
+            if self.flight is not None:
+                self.flight.release()
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'session_id': self.session_id,
+            'remaining_seconds': max(0.0, self.remaining_seconds()),
+            'cancelled': self.cancel_event.is_set(),
+            'cancel_reason': self.cancel_reason,
+            'done': self.future is not None and self.future.done()
+        }
+
+
+class SolveFlight:
+    """같은 설정의 요청들이 함께 기다리는 솔버 실행 하나"""
+
+    def __init__(self, key: str, deadline: float, num_workers: Optional[int] = SOLVER_THREADS):
+        self.key = key
+        self.deadline = deadline  # 첫 요청의 마감 (합류한 요청의 마감은 모두 이보다 늦음)
+        self.num_workers = num_workers
+        self.cancel_event = threading.Event()
+        self.jobs: List[SolveJob] = []
+        self.future: Optional[Future] = None
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def release(self):
+        """기다리는 요청이 모두 취소되면 솔버 중단"""
+        with _flights_lock:
+            if all(job.cancel_event.is_set() for job in self.jobs):
+                self.cancel_event.set()
+                if _flights.get(self.key) is self:
+                    del _flights[self.key]
+
+
+# 이 프로세스에서 실행 중인 작업 (취소 이벤트 전달용) - 세션/취소 상태는 공유 저장소
+_jobs: Dict[str, SolveJob] = {}
+_jobs_lock = threading.Lock()
+_cancel_sync: Optional[threading.Thread] = None
+
+# 설정 키별 실행 중인 솔버와 합류(coalescing) 통계
+_flights: Dict[str, SolveFlight] = {}
+_flights_lock = threading.Lock()
+_coalescing = {'flights_total': 0, 'coalesced_total': 0, 'max_waiters': 0}
+
+# 압축 결과의 근무 기호 - 위치가 근무 유형 번호 (ShiftType.SYMBOLS와 같은 순서)
+GRID_SYMBOLS = 'DNBR'
+
+# 순서가 의미 없는 목록 인자 - 정렬해서 같은 설정이면 같은 키가 되도록 함
+UNORDERED_PARAMS = ('fixed_shifts', 'leave', 'unavailable', 'separation_pairs', 'separation_groups',
+                    'holidays', 'preferences')
+
+
+def normalize_params(params: Dict) -> Dict:
+    """요청 합류와 결과 캐시에 쓰는 정규화된 설정"""
+    normalized = dict(params)
+    for name in UNORDERED_PARAMS:
+        if normalized.get(name):
+            normalized[name] = sorted(
+                normalized[name], key=lambda v: json.dumps(v, sort_keys=True, ensure_ascii=False)
+            )
+    return normalized
+
+
+def clamp_deadline(deadline_seconds: Optional[float]) -> float:
+    """클라이언트 요청 마감 시간을 [1, MAX_SOLVE_SECONDS] 범위로 제한"""
+    if deadline_seconds is None:
+        return float(MAX_SOLVE_SECONDS)
+    return min(max(float(deadline_seconds), 1.0), float(MAX_SOLVE_SECONDS))
+
+
+def solve_attempt(params: Dict, time_limit: float, num_workers: Optional[int] = None,
+                  cancel_event=None, use_model_cache: bool = True,
+                  memory_limit_mb: Optional[float] = None,
+                  feasibility_only: bool = False) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+    """
+    설정 생성부터 탐색까지 한 번 실행 (격리 모드에서는 자식 프로세스에서 호출)
+
+    Args:
+        memory_limit_mb: 모델을 만든 뒤 이 RSS 안에 들도록 탐색 스레드 수를 줄임
+        feasibility_only: 목표 함수 없이 필수 규칙만 만족하는 근무표 (메모리 부족 시 마지막 단계)
+
+    Returns:
+        (status_name, result or None, search_stats or None)
+    """
+    stack = load_solver_stack()
+    started = time.perf_counter()
+    solver = None
+    try:
+        config = stack.WorkScheduleConfig(**params)
+        solver = stack.WorkScheduleSolver(
+            config, model_cache=stack.model_cache if use_model_cache else None
+        )
+        if feasibility_only:
+            status_name = solver.solve_feasibility(time_limit, num_workers=1,
+                                                   cancel_event=cancel_event)
+            result = None
+            if status_name == 'FEASIBLE':
+                result = solver.extract_solution(solver.solution_grid())
+            return status_name, result, None
+
+        if CAPTURE is not None:
+            CAPTURE.prepare(solver)
+        if memory_limit_mb is not None:
+            solver.build_model()
+            num_workers = solve_isolation.memory_aware_workers(
+                num_workers, solver.model_size(), memory_limit_mb
+            )
+        status_name, result = solver.solve(
+            max_time_seconds=time_limit, cancel_event=cancel_event, num_workers=num_workers
+        )
+    except Exception as e:
+        if CAPTURE is not None:
+            CAPTURE.record(params, solver, 'ERROR', time.perf_counter() - started, error=e)
+        raise
+    if CAPTURE is not None and solver.search_stats is not None and status_name != 'CANCELLED':
+        stats = solver.search_stats
+        CAPTURE.record(params, solver, status_name,
+                       stats['build_seconds'] + stats['search_seconds'])
+    return status_name, result, solver.search_stats
+
+
+def _record_isolated(outcome: Dict):
+    with _isolation_lock:
+        _isolation_stats['solves'] += 1
+        if outcome['kind'] == 'memory':
+            _isolation_stats['memory_failures'] += 1
+        elif outcome['kind'] == 'crashed':
+            _isolation_stats['crashes'] += 1
+        peak = outcome['peak_rss_mb']
+        if peak is not None:
+            _isolation_stats['last_peak_rss_mb'] = peak
+            _isolation_stats['max_peak_rss_mb'] = max(_isolation_stats['max_peak_rss_mb'] or 0.0, peak)
+
+
+def _solve_isolated(params: Dict, flight: SolveFlight) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+    """
+    자식 프로세스에서 실행 - 메모리 제한을 넘거나 비정상 종료하면 단계적으로 물러섬
+
+    1) 요청한 탐색 스레드 수 (RSS 상한에 맞춰 줄임) → 2) 탐색 스레드 1개
+    → 3) 목표 함수 없이 필수 규칙만 (result['degraded']에 기록)
+    모두 실패하면 ('MEMORY_LIMIT', None, None).
+    """
+    requested = flight.num_workers or os.cpu_count() or 1
+    steps = [('requested', requested, False), ('single_worker', 1, False),
+             ('feasibility_only', 1, True)]
+    if requested == 1:
+        steps.pop(0)
+
+    failures = []
+    for mode, num_workers, feasibility_only in steps:
+        remaining = flight.remaining_seconds()
+        if flight.cancel_event.is_set():
+            return 'CANCELLED', None, None
+        if remaining <= 0:
+            return 'DEADLINE_EXCEEDED', None, None
+        outcome = solve_isolation.run_isolated(
+            solve_attempt, (params, remaining, num_workers),
+            kwargs={'use_model_cache': False, 'memory_limit_mb': ISOLATION.rss_mb,
+                    'feasibility_only': feasibility_only},
+            cancel_event=flight.cancel_event, settings=ISOLATION,
+            timeout=remaining + REQUEST_GRACE_SECONDS
+        )
+        _record_isolated(outcome)
+        if outcome['kind'] == 'error':
+            raise RuntimeError(outcome['error'])
+        if outcome['kind'] == 'timeout':
+            return 'CANCELLED' if flight.cancel_event.is_set() else 'DEADLINE_EXCEEDED', None, None
+        if outcome['kind'] == 'ok':
+            status_name, result, stats = outcome['value']
+            if stats is not None:
+                stats['peak_rss_mb'] = outcome['peak_rss_mb']
+            if failures and result is not None:
+                with _isolation_lock:
+                    _isolation_stats['degraded'] += 1
+                result['degraded'] = {'mode': mode, 'failures': failures}
+            return status_name, result, stats
+        failures.append({
+            'mode': mode,
+            'num_workers': num_workers,
+            'kind': outcome['kind'],
+            'reason': outcome.get('reason'),
+            'exitcode': outcome['exitcode'],
+            'peak_rss_mb': outcome['peak_rss_mb']
+        })
+    return 'MEMORY_LIMIT', None, None
+
+
+def _run_solve(params: Dict, flight: SolveFlight) -> Tuple[str, Optional[Dict]]:
+    """워커 스레드에서 설정 생성 및 솔버 실행 (대기열에서 보낸 시간은 마감에서 차감)"""
+    if flight.cancel_event.is_set():
+        return 'CANCELLED', None
+    remaining = flight.remaining_seconds()
+    if remaining <= 0:
+        return 'DEADLINE_EXCEEDED', None
+
+    # 같은 설정의 증명된 결과(최적해 / 해 없음)가 있으면 다시 풀지 않음
+    store = get_store()
+    key = flight.key
+    cached = store.get_result(key)
+    if cached is not None:
+        return cached
+
+    if ISOLATION.enabled:
+        status_name, result, stats = _solve_isolated(params, flight)
+    else:
+        status_name, result, stats = solve_attempt(
+            params, remaining, flight.num_workers, cancel_event=flight.cancel_event
+        )
+    # 대안 근무표는 시간에 따라 찾는 개수가 달라지므로 캐시하지 않음
+    # (메모리 부족으로 물러선 결과도 최선이 아니므로 캐시하지 않음)
+    if params.get('num_alternatives', 1) == 1 and not (result and 'degraded' in result):
+        store.put_result(key, status_name, result)
+        if status_name != 'CANCELLED' and stats is not None:
+            get_history().record(features_from_params(params), stats, remaining)
+    return status_name, result
+
+
+def _attach(job: SolveJob, params: Dict):
+    """
+    같은 설정의 실행 중인 솔버에 합류하거나 새로 실행
+
+    마감이 더 이른 요청은 합류하지 않는다 (첫 요청의 마감까지 기다리게 되므로).
+    결과 전달(_land)은 솔버를 새로 실행할 때 한 번만 등록한다. 합류한 요청은 _land가
+    같은 잠금 안에서 대기 목록을 복사하므로 빠짐없이 결과를 받는다.
+    """
+    key = params_key(normalize_params(params))
+    started = False
+    with _flights_lock:
+        flight = _flights.get(key)
+        if (flight is not None and not flight.cancel_event.is_set()
+                and flight.deadline <= job.deadline):
+            flight.jobs.append(job)
+            _coalescing['coalesced_total'] += 1
+            _coalescing['max_waiters'] = max(_coalescing['max_waiters'], len(flight.jobs) - 1)
+        else:
+            num_workers = job.estimate['num_workers'] if job.estimate else SOLVER_THREADS
+            flight = SolveFlight(key, job.deadline, num_workers)
+            flight.jobs.append(job)
+            _flights[key] = flight
+            _coalescing['flights_total'] += 1
+            flight.future = get_executor().submit(_run_solve, params, flight)
+            started = True
+        job.flight = flight
+    # 이미 끝난 future면 콜백이 바로 실행되므로 잠금을 푼 뒤 등록
+    if started:
+        flight.future.add_done_callback(lambda future: _land(flight, future))
+
+
+def _land(flight: SolveFlight, future: Future):
+    """솔버 결과를 기다리던 모든 요청에 전달"""
+    with _flights_lock:
+        if _flights.get(flight.key) is flight:
+            del _flights[flight.key]
+        jobs = list(flight.jobs)
+    error = future.exception()
+    outcome = None if error is not None else future.result()
+    for job in jobs:
+        _resolve(job.future, outcome, error)
+
+
+def _finish_job(job: SolveJob):
+    with _jobs_lock:
+        _jobs.pop(job.job_id, None)
+    get_store().finish_job(job.job_id)
+
+
+def _sync_cancel_requests():
+    """실행 중인 작업이 있는 동안 공유 저장소의 취소 요청을 로컬 이벤트로 전달"""
+    global _cancel_sync
+    store = get_store()
+    while True:
+        time.sleep(CANCEL_SYNC_SECONDS)
+        with _jobs_lock:
+            if not _jobs:
+                _cancel_sync = None
+                return
+            local = dict(_jobs)
+        for job_id, reason in store.cancel_requests(local).items():
+            local[job_id].cancel(reason)
+
+
+def _ensure_cancel_sync():
+    """취소 요청 확인 스레드 시작 (_jobs_lock을 잡은 상태에서 호출)"""
+    global _cancel_sync
+    if _cancel_sync is None:
+        _cancel_sync = threading.Thread(
+            target=_sync_cancel_requests, name='cancel-sync', daemon=True
+        )
+        _cancel_sync.start()
+
+
+def estimate_solve(params: Dict, deadline_seconds: Optional[float] = None) -> Dict:
+    """
+    비슷한 문제의 실행 이력으로 시간 제한, 탐색 스레드 수, 예상 소요 시간 예측
+
+    대안 근무표 요청은 대안 탐색 시간을 예측하지 않으므로 마감 시간을 그대로 쓴다.
+    """
+    cap = clamp_deadline(deadline_seconds)
+    max_workers = SOLVER_THREADS or os.cpu_count()
+    if params.get('num_alternatives', 1) != 1:
+        return {'budget_seconds': cap, 'eta_seconds': None, 'num_workers': SOLVER_THREADS,
+                'basis': 'alternatives', 'neighbors': 0}
+    return get_history().predict(features_from_params(params), cap, max_workers)
+
+
+def submit_job(params: Dict, deadline_seconds: Optional[float] = None,
+               job_id: Optional[str] = None,
+               session_id: Optional[str] = None,
+               adaptive: bool = False) -> SolveJob:
+    """
+    워커 풀에 근무표 생성 요청 제출
+
+    Args:
+        params: WorkScheduleConfig 생성 인자 (year, month, employees, ...)
+        deadline_seconds: 클라이언트 마감 시간 (MAX_SOLVE_SECONDS로 제한)
+        job_id: 취소 요청에 사용할 식별자 (없으면 생성)
+        session_id: 같은 세션의 이전 요청은 자동 취소
+        adaptive: 실행 이력으로 예측한 시간 제한과 탐색 스레드 수 사용
+    """
+    deadline = clamp_deadline(deadline_seconds)
+    estimate = estimate_solve(params, deadline) if adaptive else None
+    if estimate is not None:
+        deadline = min(deadline, estimate['budget_seconds'])
+
+    job = SolveJob(job_id or uuid.uuid4().hex, session_id, deadline)
+    job.estimate = estimate
+    previous = _register_job(job)
+
+    # 먼저 합류해 두면 같은 설정으로 다시 보낸 요청(더블 클릭)은 이전 솔버를 이어받음
+    _attach(job, params)
+    if previous is not None:
+        previous.cancel('superseded')
+    return job
+
+
+def _register_job(job: SolveJob) -> Optional[SolveJob]:
+    """
+    작업 등록 후 같은 세션의 이전 작업 반환 (이 프로세스에서 실행 중인 경우만)
+
+    ID 중복 확인과 이전 세션 작업 취소는 워커 전체에서 한 번에 처리한다.
+    """
+    previous_id = get_store().register_job(
+        job.job_id, job.session_id, job.deadline - job.submitted_at
+    )
+
+    with _jobs_lock:
+        previous = _jobs.get(previous_id) if previous_id else None
+        _jobs[job.job_id] = job
+        _ensure_cancel_sync()
+    job.future.add_done_callback(lambda _: _finish_job(job))
+    return previous
+
+
+def cancel_job(job_id: str, reason: str = 'cancelled') -> bool:
+    """작업 취소 (실행 중인 작업이 없으면 False) - 다른 워커의 작업도 취소 가능"""
+    if not get_store().request_cancel(job_id, reason):
+        return False
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        job.cancel(reason)
+    return True
+
+
+def cancel_session(session_id: str, reason: str = 'cancelled') -> bool:
+    """세션의 실행 중인 작업 취소"""
+    job_id = get_store().session_job(session_id)
+    return job_id is not None and cancel_job(job_id, reason)
+
+
+def solve_schedule(params: Dict, max_time_seconds: int = 120) -> Tuple[str, Optional[Dict]]:
+    """
+    워커 풀에서 근무표 생성 (취소 없이 결과까지 대기)
+
+    Returns:
+        (status_name, result_dict or None)
+    """
+    return submit_job(params, deadline_seconds=max_time_seconds).future.result()
+
+
+def compact_result(result: Dict) -> Dict:
+    """
+    큰 근무표용 압축 결과 - 인원별 칸 목록(shifts) 대신 근무 기호 문자열 한 줄씩
+
+    result['grid'][i]의 d번째 글자가 i번째 인원의 d일(0-based) 근무이고, 글자의 위치가
+    grid_symbols에서의 근무 유형 번호다. 휴가일은 schedule[i]['leave_days']에 남긴다.
+    결과 캐시와 공유하는 원본은 바꾸지 않는다.
+    """
+    def compact(schedule: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        rows, grid = [], []
+        for emp in schedule:
+            row = {key: value for key, value in emp.items() if key != 'shifts'}
+            row['leave_days'] = [shift['day'] - 1 for shift in emp['shifts'] if shift.get('leave')]
+            rows.append(row)
+            grid.append(''.join(shift['symbol'] for shift in emp['shifts']))
+        return rows, grid
+
+    compacted = dict(result, grid_symbols=GRID_SYMBOLS)
+    compacted['schedule'], compacted['grid'] = compact(result['schedule'])
+    if result.get('alternatives'):
+        compacted['alternatives'] = []
+        for alternative in result['alternatives']:
+            schedule, grid = compact(alternative['schedule'])
+            compacted['alternatives'].append(dict(alternative, schedule=schedule, grid=grid))
+    return compacted
+
+
+def validate_schedule(params: Dict, grid) -> Dict:
+    """근무표 검증 (배열 연산만 하므로 워커 풀을 거치지 않고 바로 실행)"""
+    stack = load_solver_stack()
+    config = stack.WorkScheduleConfig(**params)
+    return stack.validate_schedule(grid, config)
+
+
+def suggest_swaps(params: Dict, grid, employee, day: int, partner=None,
+                  limit: int = 20) -> Dict:
+    """근무 교환 제안 (솔버 없이 현재 근무표만 검사하므로 워커 풀을 거치지 않음)"""
+    stack = load_solver_stack()
+    config = stack.WorkScheduleConfig(**params)
+    employee_idx = stack.resolve_employee(employee, config.employees)
+    partner_idx = None if partner is None else stack.resolve_employee(partner, config.employees)
+    cells = stack.to_grid(grid)
+    if cells.shape != (config.num_employees, config.num_days):
+        raise ValueError(
+            f'근무표 크기({cells.shape[0]}×{cells.shape[1]})가 설정'
+            f'({config.num_employees}×{config.num_days})과 다릅니다.'
+        )
+    return stack.suggest_swaps(cells, config, employee_idx, day,
+                               partner_idx=partner_idx, limit=limit)
+
+
+def _run_sweep(job: SolveJob, params: Dict, headcounts: List[int], work_days: List[int],
+               probe_seconds: float, parallel: int) -> Tuple[str, Optional[Dict]]:
+    """
+    워커 스레드에서 가능 영역 탐색 실행
+
+    풀 슬롯 하나를 탐색 전체가 쓰므로, 탐침들은 솔버 하나 몫의 탐색 스레드를 나눠 쓴다.
+    """
+    if job.cancel_event.is_set():
+        return 'CANCELLED', None
+    stack = load_solver_stack()
+    threads = SOLVER_THREADS or os.cpu_count() or 1
+    parallel = max(1, min(parallel, threads))
+    report = stack.sweep_feasibility(
+        params, headcounts, work_days, probe_seconds=probe_seconds, parallel=parallel,
+        max_seconds=job.remaining_seconds(), num_workers=max(1, threads // parallel),
+        cancel_event=job.cancel_event
+    )
+    return ('CANCELLED' if report['cancelled'] else 'COMPLETED'), report
+
+
+def submit_sweep(params: Dict, headcounts, work_days,
+                 probe_seconds: float = 5, parallel: int = 4,
+                 deadline_seconds: Optional[float] = None,
+                 job_id: Optional[str] = None,
+                 session_id: Optional[str] = None) -> SolveJob:
+    """
+    인원수 × 근무일수 가능 영역 탐색을 워커 풀에 제출
+
+    근무표 생성과 같은 풀 슬롯·작업 등록·취소(job_id, session_id, 연결 끊김)를 쓴다.
+    future 결과는 ('COMPLETED', 탐색 결과) 또는 ('CANCELLED', None).
+    """
+    job = SolveJob(job_id or uuid.uuid4().hex, session_id, clamp_deadline(deadline_seconds))
+    previous = _register_job(job)
+    future = get_executor().submit(
+        _run_sweep, job, params, list(headcounts), list(work_days), probe_seconds, parallel
+    )
+    future.add_done_callback(
+        lambda done: _resolve(job.future, None if done.exception() else done.result(),
+                              done.exception())
+    )
+    if previous is not None:
+        previous.cancel('superseded')
+    return job
+
+
+def _prewarm():
+    """OR-Tools import 후 작은 문제를 한 번 풀어 일회성 비용을 미리 지불"""
+    started = time.perf_counter()
+    if ISOLATION.enabled:
+        solve_isolation.start_server()
+    stack = load_solver_stack()
+    config = stack.WorkScheduleConfig(**PREWARM_PARAMS)
+    stack.WorkScheduleSolver(config).solve(max_time_seconds=5)
+    STARTUP.record_duration('prewarm', time.perf_counter() - started)
+    STARTUP.mark('prewarm_done')
+
+
+def start_prewarm() -> Future:
+    """백그라운드 예열 시작 (중복 호출 시 기존 작업 반환)"""
+    global _prewarm_future
+    with _prewarm_lock:
+        if _prewarm_future is None:
+            _prewarm_future = get_executor().submit(_prewarm)
+        return _prewarm_future
+
+
+def coalescing_stats() -> Dict:
+    """실행 중인 솔버 수와 합류해 기다리는 요청 수"""
+    with _flights_lock:
+        return dict(
+            _coalescing,
+            in_flight=len(_flights),
+            coalesced_waiters=sum(
+                sum(1 for job in flight.jobs if not job.cancel_event.is_set()) - 1
+                for flight in _flights.values()
+            )
+        )
+
+
+def isolation_stats() -> Dict:
+    """자식 프로세스 실행 설정과 메모리 실패 / 물러선 실행 수, 최대 RSS"""
+    with _isolation_lock:
+        return dict(ISOLATION.to_dict(), **_isolation_stats)
+
+
+def metrics() -> Dict:
+    """기동 시간 및 캐시 통계 (공유 저장소 외에는 이 워커 프로세스 기준)"""
+    return {
+        'pid': os.getpid(),
+        'startup': STARTUP.snapshot(),
+        'solver_loaded': _stack is not None,
+        'active_jobs': len(_jobs),
+        'model_cache': _stack.model_cache.stats() if _stack is not None else None,
+        'coalescing': coalescing_stats(),
+        'shared_store': get_store().stats(),
+        'solve_history': get_history().stats(),
+        'captures_saved': CAPTURE.saved if CAPTURE is not None else None,
+        'isolation': isolation_stats()
+    }
@@ -1,3 +1,11 @@
+// 근무 유형 기호와 그리드 칸 스타일 (번호 순서: 0=주간, 1=야간, 2=비번, 3=휴무)
+const SHIFT_SYMBOLS = 'DNBR';
+const SHIFT_CLASSES = ['shift-day', 'shift-night', 'shift-offb', 'shift-offr'];
+
+// 근무자 수 상한과, 달력 칸에 근무 유형별로 표시할 최대 이름 수 (나머지는 "+N명")
+const MAX_WORKERS = 300;
+const MAX_BADGES_PER_SHIFT = 4;
+
 // 전역 상태 관리
 const state = {
     currentYear: 2025,
@@ -7,12 +15,31 @@ const state = {
     restDaysPerPerson: 10,
     calendarData: null,
     schedule: {},  // {day: {dayWorkers: [], nightWorkers: []}}
-    separateWorkerPairs: [],  // [[worker1, worker2], ...]
-    selectedDay: null
+    grid: [],  // [근무자][날짜 - 1] 근무 유형 (Uint8Array) - state.schedule에서 유도
+    gridVersion: 0,  // grid가 바뀔 때마다 증가 (요약표 재계산 여부 판단)
+    separateWorkerGroups: [],  // [[worker1, worker2, ...], ...] - 같은 그룹은 같은 날 같은 근무 불가
+    selectedDay: null,
+    sessionId: generateId(),  // 같은 세션의 이전 생성 요청은 서버에서 자동 취소
+    activeJobId: null,
+    violationsByDay: {},  // {day: [rule, ...]} - /api/validate 결과
+    violationCells: new Set(),  // 위반 칸 'i,d' (0-based) - 그리드 표시용
+    solveDeadlineSeconds: 120  // 서버 상한(120초)을 넘으면 서버에서 제한
 };
 
+function generateId() {
+    return Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+}
+
+// 페이지를 떠나면 진행 중인 생성 요청 취소
+window.addEventListener('pagehide', function() {
+    if (state.activeJobId) {
+        navigator.sendBeacon('/api/cancel', JSON.stringify({ job_id: state.activeJobId }));
+    }
+});
+
 // 페이지 로드 시 초기화
 document.addEventListener('DOMContentLoaded', function() {
+    rosterGrid.init();
     initializeCalendar();
     updateWorkerCountDisplay();
 });
@@ -25,16 +52,15 @@ function initializeCalendar() {
 
 async function loadCalendarInfo(year, month) {
     try {
-        const response = await fetch('/api/calendar_info', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ year, month })
-        });
+        // GET 요청은 브라우저가 캐시 (ETag / Cache-Control)
+        const response = await fetch(`/api/calendar_info?year=${year}&month=${month}`);
 
         const data = await response.json();
         if (data.success) {
             state.calendarData = data.data;
+            rebuildGrid();
             renderCalendar();
+            rosterGrid.reset();
             updateCalendarTitle();
         }
     } catch (error) {
@@ -42,16 +68,20 @@ async function loadCalendarInfo(year, month) {
     }
 }
 
+// 날짜 → 달력 칸 요소 (한 날짜만 바뀌면 그 칸만 교체)
+const calendarCells = new Map();
+
+// 달력 전체 다시 그리기 - 월이 바뀌거나 근무표 전체가 바뀔 때만 사용
 function renderCalendar() {
     if (!state.calendarData) return;
 
-    const grid = document.getElementById('calendarGrid');
-    const daysHeader = grid.querySelectorAll('p');
+    const calendarGrid = document.getElementById('calendarGrid');
 
-    // 기존 날짜 셀 제거
-    const cells = grid.querySelectorAll('.calendar-cell');
-    cells.forEach(cell => cell.remove());
+    // 기존 날짜/빈 칸 제거 (요일 헤더 <p>는 유지)
+    calendarGrid.querySelectorAll(':scope > div').forEach(cell => cell.remove());
+    calendarCells.clear();
 
+    const grid = document.createDocumentFragment();
     const { days, num_days } = state.calendarData;
     const firstDayWeekday = days[0].weekday;
 
@@ -66,6 +96,7 @@ function renderCalendar() {
         const day = i + 1;
         const dayData = days[i];
         const cell = createDayCell(day, dayData);
+        calendarCells.set(day, cell);
         grid.appendChild(cell);
     }
 
@@ -78,6 +109,19 @@ function renderCalendar() {
             grid.appendChild(emptyCell);
         }
     }
+    calendarGrid.appendChild(grid);
+}
+
+// 지정한 날짜의 칸만 새로 만들어 교체
+function updateCalendarDays(days) {
+    if (!state.calendarData) return;
+    days.forEach(day => {
+        const old = calendarCells.get(day);
+        if (!old) return;
+        const cell = createDayCell(day, state.calendarData.days[day - 1]);
+        old.replaceWith(cell);
+        calendarCells.set(day, cell);
+    });
 }
 
 function createEmptyCell() {
@@ -95,12 +139,21 @@ function createDayCell(day, dayData) {
     dateNumber.className = 'text-right mb-2';
 
     const dateSpan = document.createElement('span');
-    dateSpan.className = dayData.is_weekend
+    dateSpan.className = dayData.is_weekend || dayData.is_holiday
         ? 'text-red-500 font-semibold'
         : 'text-[#333333] dark:text-gray-300';
     dateSpan.textContent = day;
     dateNumber.appendChild(dateSpan);
 
+    // 공휴일 이름
+    if (dayData.is_holiday) {
+        dateSpan.title = dayData.holiday_name;
+        const holidayLabel = document.createElement('span');
+        holidayLabel.className = 'block text-[10px] text-red-500 truncate';
+        holidayLabel.textContent = dayData.holiday_name;
+        dateNumber.appendChild(holidayLabel);
+    }
+
     cell.appendChild(dateNumber);
 
     // 근무자 표시
@@ -109,30 +162,42 @@ function createDayCell(day, dayData) {
 
     if (state.schedule[day]) {
         const { dayWorkers, nightWorkers } = state.schedule[day];
-
-        dayWorkers.forEach(worker => {
-            const badge = document.createElement('div');
-            badge.className = 'worker-badge day-worker';
-            badge.textContent = `주: ${worker}`;
-            workersContainer.appendChild(badge);
-        });
-
-        nightWorkers.forEach(worker => {
-            const badge = document.createElement('div');
-            badge.className = 'worker-badge night-worker';
-            badge.textContent = `야: ${worker}`;
-            workersContainer.appendChild(badge);
-        });
+        appendWorkerBadges(workersContainer, dayWorkers, 'day-worker', '주');
+        appendWorkerBadges(workersContainer, nightWorkers, 'night-worker', '야');
     }
 
     cell.appendChild(workersContainer);
 
+    // 규칙 위반 표시
+    const violations = state.violationsByDay[day];
+    if (violations && violations.length > 0) {
+        cell.classList.add('ring-2', 'ring-inset', 'ring-red-500');
+        cell.title = violations.join(', ');
+    }
+
     // 클릭 이벤트
     cell.addEventListener('click', () => openDayAssignmentModal(day));
 
     return cell;
 }
 
+// 근무자 배지 - 인원이 많으면 앞의 몇 명만 표시하고 나머지는 "+N명" (전체 명단은 title)
+function appendWorkerBadges(container, workers, className, label) {
+    workers.slice(0, MAX_BADGES_PER_SHIFT).forEach(worker => {
+        const badge = document.createElement('div');
+        badge.className = `worker-badge ${className}`;
+        badge.textContent = `${label}: ${worker}`;
+        container.appendChild(badge);
+    });
+    if (workers.length > MAX_BADGES_PER_SHIFT) {
+        const more = document.createElement('div');
+        more.className = `worker-badge ${className}`;
+        more.textContent = `${label}: +${workers.length - MAX_BADGES_PER_SHIFT}명`;
+        more.title = workers.join(', ');
+        container.appendChild(more);
+    }
+}
+
 function updateCalendarTitle() {
     document.getElementById('calendarTitle').textContent =
         `${state.currentYear}년 ${state.currentMonth}월`;
@@ -181,7 +246,7 @@ function closeWorkerManagementModal() {
 
 function increaseWorkerCount() {
     const input = document.getElementById('workerCount');
-    if (input.value < 10) input.value = parseInt(input.value) + 1;
+    if (input.value < MAX_WORKERS) input.value = parseInt(input.value) + 1;
 }
 
 function decreaseWorkerCount() {
@@ -207,8 +272,14 @@ function saveWorkerManagement() {
     const namesInput = document.getElementById('workerNames').value.trim();
     state.workers = namesInput.split(',').map(n => n.trim()).filter(n => n);
     state.workDaysPerPerson = parseInt(document.getElementById('workDaysPerPerson').value);
+    // 명단에서 빠진 근무자는 분리 그룹에서도 제외 (두 명 미만이 된 그룹은 삭제)
+    state.separateWorkerGroups = state.separateWorkerGroups
+        .map(group => group.filter(worker => state.workers.includes(worker)))
+        .filter(group => group.length >= 2);
     state.restDaysPerPerson = parseInt(document.getElementById('restDaysPerPerson').value);
 
+    rebuildGrid();
+    rosterGrid.reset();
     closeWorkerManagementModal();
     updateStatusMessage('근무자 정보가 저장되었습니다.');
 }
@@ -316,9 +387,270 @@ function saveDayAssignment() {
 
     state.schedule[day] = { dayWorkers, nightWorkers };
 
-    renderCalendar();
+    // 바뀐 날짜 칸과 그리드에서 바뀐 칸만 갱신
+    updateCalendarDays([day]);
+    rosterGrid.updateCells(syncGridDays([day]));
     closeDayAssignmentModal();
     updateStatusMessage(`${day}일 근무자가 지정되었습니다.`);
+    validateCurrentSchedule();
+}
+
+// ===== 근무 유형 배열 (근무자 × 날짜) =====
+
+// state.schedule 기준 근무 유형 - DAY/NIGHT 외의 날은 전날 NIGHT면 OFF_B(2), 아니면 OFF_R(3)
+function scheduledType(worker, day, previousType) {
+    const daySchedule = state.schedule[day];
+    if (daySchedule && daySchedule.dayWorkers.includes(worker)) return 0;
+    if (daySchedule && daySchedule.nightWorkers.includes(worker)) return 1;
+    return previousType === 1 ? 2 : 3;
+}
+
+// state.grid 전체 다시 계산 (근무자나 월이 바뀔 때)
+function rebuildGrid() {
+    const numDays = state.calendarData ? state.calendarData.num_days : 0;
+    state.grid = state.workers.map(worker => {
+        const row = new Uint8Array(numDays);
+        for (let d = 0; d < numDays; d++) {
+            row[d] = scheduledType(worker, d + 1, d > 0 ? row[d - 1] : undefined);
+        }
+        return row;
+    });
+    state.gridVersion++;
+}
+
+// 지정한 날짜(와 OFF_B가 달라질 수 있는 다음 날)만 다시 계산 - 바뀐 칸 [[i, d], ...] (0-based)
+function syncGridDays(days) {
+    const numDays = state.calendarData.num_days;
+    const targets = new Set();
+    days.forEach(day => {
+        targets.add(day);
+        if (day < numDays) targets.add(day + 1);
+    });
+
+    const changes = [];
+    Array.from(targets).sort((a, b) => a - b).forEach(day => {
+        const d = day - 1;
+        state.grid.forEach((row, i) => {
+            const type = scheduledType(state.workers[i], day, d > 0 ? row[d - 1] : undefined);
+            if (row[d] !== type) {
+                row[d] = type;
+                changes.push([i, d]);
+            }
+        });
+    });
+    if (changes.length > 0) state.gridVersion++;
+    return changes;
+}
+
+// 서버 압축 결과(인원별 근무 기호 문자열)를 근무 유형 배열로 변환
+function decodeCompactGrid(rows, symbols) {
+    const codes = {};
+    for (let s = 0; s < symbols.length; s++) codes[symbols.charCodeAt(s)] = s;
+    return rows.map(text => {
+        const row = new Uint8Array(text.length);
+        for (let d = 0; d < text.length; d++) row[d] = codes[text.charCodeAt(d)];
+        return row;
+    });
+}
+
+// ===== 근무자 × 날짜 그리드 (가상 스크롤) =====
+
+// 보이는 행(과 앞뒤 여유 행)만 DOM에 두고, 스크롤하면 범위를 벗어난 행만 지우고 새 행만 만든다.
+// 칸 하나가 바뀌면 그 칸의 글자와 클래스만 고친다.
+const ROSTER_ROW_HEIGHT = 28;  // px - index_new.html의 .roster-row 높이와 같아야 함
+const ROSTER_OVERSCAN = 8;
+
+const rosterGrid = {
+    section: null,
+    viewport: null,
+    header: null,
+    body: null,
+    rows: new Map(),  // 근무자 번호 → 행 요소 (현재 그려진 행만)
+    frame: null,
+
+    init() {
+        this.section = document.getElementById('rosterSection');
+        this.viewport = document.getElementById('rosterViewport');
+        this.header = document.getElementById('rosterHeader');
+        this.body = document.getElementById('rosterBody');
+        this.viewport.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleRender());
+
+        // 칸 클릭은 위임으로 처리 (행을 만들 때마다 핸들러를 달지 않음)
+        this.body.addEventListener('click', event => {
+            const cell = event.target.closest('.roster-cell');
+            if (cell) openDayAssignmentModal(Number(cell.dataset.day));
+        });
+    },
+
+    // 근무자 수나 일수가 바뀌면 행을 모두 버리고 다시 그림
+    reset() {
+        this.rows.forEach(row => row.remove());
+        this.rows.clear();
+        this.section.hidden = state.grid.length === 0 || !state.calendarData;
+        if (this.section.hidden) return;
+
+        this.renderHeader();
+        this.body.style.height = `${state.grid.length * ROSTER_ROW_HEIGHT}px`;
+        this.render();
+    },
+
+    scheduleRender() {
+        if (this.frame !== null) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    },
+
+    render() {
+        const top = Math.max(0, this.viewport.scrollTop - this.header.offsetHeight);
+        const first = Math.max(0, Math.floor(top / ROSTER_ROW_HEIGHT) - ROSTER_OVERSCAN);
+        const last = Math.min(
+            state.grid.length,
+            Math.ceil((top + this.viewport.clientHeight) / ROSTER_ROW_HEIGHT) + ROSTER_OVERSCAN
+        );
+
+        this.rows.forEach((row, i) => {
+            if (i < first || i >= last) {
+                row.remove();
+                this.rows.delete(i);
+            }
+        });
+
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i < last; i++) {
+            if (!this.rows.has(i)) {
+                const row = this.createRow(i);
+                this.rows.set(i, row);
+                fragment.appendChild(row);
+            }
+        }
+        this.body.appendChild(fragment);
+    },
+
+    renderHeader() {
+        this.header.textContent = '';
+        const corner = document.createElement('div');
+        corner.className = 'roster-name';
+        corner.textContent = '근무자';
+        this.header.appendChild(corner);
+
+        state.calendarData.days.forEach((dayData, d) => {
+            const cell = document.createElement('div');
+            cell.className = 'roster-day' +
+                (dayData.is_weekend || dayData.is_holiday ? ' roster-weekend' : '');
+            cell.textContent = d + 1;
+            if (dayData.is_holiday) cell.title = dayData.holiday_name;
+            this.header.appendChild(cell);
+        });
+    },
+
+    createRow(i) {
+        const row = document.createElement('div');
+        row.className = 'roster-row';
+        row.style.transform = `translateY(${i * ROSTER_ROW_HEIGHT}px)`;
+
+        const name = document.createElement('div');
+        name.className = 'roster-name';
+        name.textContent = state.workers[i];
+        row.appendChild(name);
+
+        for (let d = 0; d < state.grid[i].length; d++) {
+            const cell = document.createElement('div');
+            cell.dataset.day = d + 1;
+            this.paintCell(cell, i, d);
+            row.appendChild(cell);
+        }
+        return row;
+    },
+
+    paintCell(cell, i, d) {
+        const type = state.grid[i][d];
+        cell.className = `roster-cell ${SHIFT_CLASSES[type]}` +
+            (state.violationCells.has(`${i},${d}`) ? ' roster-violation' : '');
+        cell.textContent = SHIFT_SYMBOLS[type];
+    },
+
+    // 바뀐 칸만 갱신 - 그려지지 않은 행은 스크롤로 만들 때 최신 값으로 그려짐
+    updateCells(changes) {
+        changes.forEach(([i, d]) => {
+            const row = this.rows.get(i);
+            if (row) this.paintCell(row.children[d + 1], i, d);
+        });
+    }
+};
+
+// ===== 실시간 검증 =====
+
+// 검증 API에 보낼 (근무자 × 날짜) 근무 유형 배열
+function buildScheduleGrid() {
+    return state.grid.map(row => Array.from(row));
+}
+
+let validationTimer = null;
+
+function validateCurrentSchedule() {
+    if (state.workers.length < 2 || !state.calendarData) return;
+
+    // 연속 편집 시 마지막 변경 후 한 번만 검증
+    clearTimeout(validationTimer);
+    validationTimer = setTimeout(async () => {
+        const payload = {
+            year: state.currentYear,
+            month: state.currentMonth,
+            employees: state.workers,
+            work_days: state.workDaysPerPerson,
+            grid: buildScheduleGrid()
+        };
+        if (state.separateWorkerGroups.length > 0) {
+            payload.separate_groups = state.separateWorkerGroups;
+        }
+
+        try {
+            const response = await fetch('/api/validate', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+            const data = await response.json();
+            if (!data.success) return;
+
+            const previousDays = state.violationsByDay;
+            const previousCells = state.violationCells;
+            state.violationsByDay = {};
+            state.violationCells = new Set();
+            data.data.violations.forEach(v => {
+                if (v.day === null) return;
+                const day = v.day + 1;
+                if (!state.violationsByDay[day]) state.violationsByDay[day] = [];
+                if (!state.violationsByDay[day].includes(v.rule)) {
+                    state.violationsByDay[day].push(v.rule);
+                }
+                if (v.employee_idx !== null) state.violationCells.add(`${v.employee_idx},${v.day}`);
+            });
+            refreshViolations(previousDays, previousCells);
+        } catch (error) {
+            console.error('근무표 검증 실패:', error);
+        }
+    }, 300);
+}
+
+// 위반 표시가 달라진 달력 칸과 그리드 칸만 갱신
+function refreshViolations(previousDays, previousCells) {
+    const days = new Set([...Object.keys(previousDays), ...Object.keys(state.violationsByDay)]);
+    updateCalendarDays(Array.from(days).map(Number).filter(day =>
+        (previousDays[day] || []).join() !== (state.violationsByDay[day] || []).join()
+    ));
+
+    const cells = [];
+    previousCells.forEach(key => {
+        if (!state.violationCells.has(key)) cells.push(key);
+    });
+    state.violationCells.forEach(key => {
+        if (!previousCells.has(key)) cells.push(key);
+    });
+    rosterGrid.updateCells(cells.map(key => key.split(',').map(Number)));
 }
 
 function getSelectedWorkers(containerId) {
@@ -372,8 +704,8 @@ function renderSeparateWorkersList() {
         input.className = 'w-5 h-5 text-primary';
 
         // 이미 선택된 경우 체크
-        const isSelected = state.separateWorkerPairs.some(pair =>
-            pair.includes(worker)
+        const isSelected = state.separateWorkerGroups.some(group =>
+            group.includes(worker)
         );
         if (isSelected) input.checked = true;
 
@@ -392,13 +724,13 @@ function saveSeparateWorkers() {
 
     const selectedWorkers = Array.from(checkboxes).map(cb => cb.value);
 
-    // 선택된 근무자들을 페어로 저장 (맨 밑 두 명 규칙)
-    if (selectedWorkers.length >= 2) {
-        state.separateWorkerPairs = [[selectedWorkers[selectedWorkers.length - 2], selectedWorkers[selectedWorkers.length - 1]]];
-    }
+    // 선택한 근무자 전체를 하나의 분리 그룹으로 저장 (두 명 미만이면 해제 → 서버 기본값: 맨 밑 두 명)
+    state.separateWorkerGroups = selectedWorkers.length >= 2 ? [selectedWorkers] : [];
 
     closeSeparateWorkersModal();
-    updateStatusMessage('요분리근무자가 설정되었습니다.');
+    updateStatusMessage(state.separateWorkerGroups.length > 0
+        ? `요분리근무자 ${selectedWorkers.length}명이 설정되었습니다.`
+        : '요분리근무자 설정이 해제되었습니다. (기본값: 맨 밑 두 명)');
 }
 
 // 6. 근무배치 현황요약 모달
@@ -417,89 +749,66 @@ function closeScheduleSummaryModal() {
     closeModal('scheduleSummaryModal');
 }
 
-function renderScheduleSummary() {
-    const container = document.getElementById('summaryTableContainer');
-
-    // 통계 계산
-    const stats = {};
-    state.workers.forEach(worker => {
-        stats[worker] = {
-            day: 0,
-            night: 0,
-            offb: 0,  // 비번 (야간 다음날로 추정)
-            offr: 0,  // 휴일
-            total_work: 0,
-            total_rest: 0,
-            multi: 0  // 2인 이상 근무
-        };
-    });
-
-    // 근무 카운트
-    Object.keys(state.schedule).forEach(day => {
-        const { dayWorkers, nightWorkers } = state.schedule[day];
+// 마지막으로 요약표를 그린 근무표 버전 (같으면 다시 그리지 않음)
+let summaryVersion = -1;
 
-        dayWorkers.forEach(worker => {
-            if (stats[worker]) {
-                stats[worker].day++;
-                if (dayWorkers.length >= 2) stats[worker].multi++;
-            }
-        });
+function renderScheduleSummary() {
+    if (summaryVersion === state.gridVersion) return;
+    summaryVersion = state.gridVersion;
 
-        nightWorkers.forEach(worker => {
-            if (stats[worker]) {
-                stats[worker].night++;
-                if (nightWorkers.length >= 2) stats[worker].multi++;
-            }
-        });
+    const container = document.getElementById('summaryTableContainer');
+    const numDays = state.calendarData.num_days;
+
+    // 날짜별 주간/야간 인원 (2인 이상 근무 판단용) - 배열을 한 번만 훑음
+    const dayCounts = new Uint16Array(numDays);
+    const nightCounts = new Uint16Array(numDays);
+    state.grid.forEach(row => {
+        for (let d = 0; d < numDays; d++) {
+            if (row[d] === 0) dayCounts[d]++;
+            else if (row[d] === 1) nightCounts[d]++;
+        }
     });
 
-    // 총계 계산
-    Object.keys(stats).forEach(worker => {
-        const s = stats[worker];
-        s.total_work = s.day + s.night + s.offb;
-        s.total_rest = s.offr;
+    const table = document.createElement('table');
+    table.className = 'min-w-full border-collapse border border-gray-300';
+    const headerRow = table.createTHead().insertRow();
+    headerRow.className = 'bg-gray-100 dark:bg-gray-700';
+    ['근무자', '주간', '야간', '비번', '휴일', '총 근무', '총 휴일', '2인이상'].forEach(title => {
+        const th = document.createElement('th');
+        th.className = 'border border-gray-300 px-4 py-2';
+        th.textContent = title;
+        headerRow.appendChild(th);
     });
 
-    // 테이블 생성
-    let html = `
-        <table class="min-w-full border-collapse border border-gray-300">
-            <thead>
-                <tr class="bg-gray-100 dark:bg-gray-700">
-                    <th class="border border-gray-300 px-4 py-2">근무자</th>
-                    <th class="border border-gray-300 px-4 py-2">주간</th>
-                    <th class="border border-gray-300 px-4 py-2">야간</th>
-                    <th class="border border-gray-300 px-4 py-2">비번</th>
-                    <th class="border border-gray-300 px-4 py-2">휴일</th>
-                    <th class="border border-gray-300 px-4 py-2">총 근무</th>
-                    <th class="border border-gray-300 px-4 py-2">총 휴일</th>
-                    <th class="border border-gray-300 px-4 py-2">2인이상</th>
-                </tr>
-            </thead>
-            <tbody>
-    `;
-
-    Object.keys(stats).forEach(worker => {
-        const s = stats[worker];
-        html += `
-            <tr class="hover:bg-gray-50 dark:hover:bg-gray-700">
-                <td class="border border-gray-300 px-4 py-2 font-medium">${worker}</td>
-                <td class="border border-gray-300 px-4 py-2 text-center">${s.day}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center">${s.night}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center">${s.offb}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center">${s.offr}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center font-semibold">${s.total_work}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center font-semibold">${s.total_rest}일</td>
-                <td class="border border-gray-300 px-4 py-2 text-center">${s.multi}일</td>
-            </tr>
-        `;
+    const body = table.createTBody();
+    state.grid.forEach((row, i) => {
+        const counts = [0, 0, 0, 0];
+        let multi = 0;
+        for (let d = 0; d < numDays; d++) {
+            counts[row[d]]++;
+            if ((row[d] === 0 && dayCounts[d] >= 2) || (row[d] === 1 && nightCounts[d] >= 2)) multi++;
+        }
+        const [day, night, offb, offr] = counts;
+
+        const tr = body.insertRow();
+        tr.className = 'hover:bg-gray-50 dark:hover:bg-gray-700';
+        [
+            [state.workers[i], 'font-medium'],
+            [`${day}일`, 'text-center'],
+            [`${night}일`, 'text-center'],
+            [`${offb}일`, 'text-center'],
+            [`${offr}일`, 'text-center'],
+            [`${day + night + offb}일`, 'text-center font-semibold'],
+            [`${offr}일`, 'text-center font-semibold'],
+            [`${multi}일`, 'text-center']
+        ].forEach(([text, className]) => {
+            const td = tr.insertCell();
+            td.className = `border border-gray-300 px-4 py-2 ${className}`;
+            td.textContent = text;
+        });
     });
 
-    html += `
-            </tbody>
-        </table>
-    `;
-
-    container.innerHTML = html;
+    container.replaceChildren(table);
 }
 
 // ===== 자동배치 함수 =====
@@ -547,54 +856,128 @@ async function automaticAssignment() {
             });
         });
 
+        const jobId = generateId();
+        state.activeJobId = jobId;
+
+        const payload = {
+            year: state.currentYear,
+            month: state.currentMonth,
+            employees: state.workers,
+            work_days: state.workDaysPerPerson,
+            fixed_shifts: fixedShifts,
+            deadline_seconds: state.solveDeadlineSeconds,
+            compact: true,  // 칸 목록 대신 인원별 근무 기호 문자열
+            job_id: jobId,
+            session_id: state.sessionId
+        };
+
+        // 요분리근무자 (지정하지 않으면 서버 기본값: 맨 밑 두 명)
+        if (state.separateWorkerGroups.length > 0) {
+            payload.separate_groups = state.separateWorkerGroups;
+        }
+
+        // 예상 소요 시간은 기다리지 않고 도착하면 표시
+        showSolveEstimate(payload);
+
         const response = await fetch('/api/generate_schedule', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                year: state.currentYear,
-                month: state.currentMonth,
-                employees: state.workers,
-                work_days: state.workDaysPerPerson,
-                fixed_shifts: fixedShifts
-            })
+            body: JSON.stringify(payload)
         });
 
         const data = await response.json();
 
+        // 새 요청에 의해 대체된 이전 요청의 응답은 무시
+        if (jobId !== state.activeJobId) return;
+        state.activeJobId = null;
+
         closeModal('loadingSpinner');
 
+        if (data.status === 'CANCELLED') {
+            updateStatusMessage('근무표 생성이 취소되었습니다.');
+            return;
+        }
+
         if (data.success) {
-            // 결과를 state.schedule에 반영
-            applyAutoSchedule(data.result.schedule);
+            // 결과를 state.schedule / state.grid에 반영
+            applyAutoSchedule(data.result);
+            state.violationsByDay = {};
+            state.violationCells = new Set();
             renderCalendar();
+            rosterGrid.reset();
             updateStatusMessage('자동 배치가 완료되었습니다!');
         } else {
             alert(data.error);
         }
 
     } catch (error) {
+        state.activeJobId = null;
         closeModal('loadingSpinner');
         alert('자동 배치 중 오류가 발생했습니다: ' + error.message);
     }
 }
 
-function applyAutoSchedule(schedule) {
-    state.schedule = {};
+async function showSolveEstimate(payload) {
+    const label = document.getElementById('loadingEta');
+    label.textContent = '최대 2분 소요될 수 있습니다';
 
-    schedule.forEach(emp => {
-        emp.shifts.forEach(shift => {
-            const day = shift.day;
+    try {
+        const response = await fetch('/api/estimate', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        const data = await response.json();
+        if (!data.success || payload.job_id !== state.activeJobId) return;
 
-            if (!state.schedule[day]) {
-                state.schedule[day] = { dayWorkers: [], nightWorkers: [] };
-            }
+        const { eta_seconds, budget_seconds } = data.data;
+        if (eta_seconds !== null) {
+            label.textContent = `예상 소요 시간: 약 ${Math.max(1, Math.round(eta_seconds))}초 ` +
+                `(최대 ${Math.round(budget_seconds)}초)`;
+        } else {
+            label.textContent = `최대 ${Math.round(budget_seconds)}초 소요될 수 있습니다`;
+        }
+    } catch (error) {
+        // 예상 시간은 안내용이므로 실패해도 무시
+    }
+}
 
-            if (shift.type === 0) {  // DAY
-                state.schedule[day].dayWorkers.push(emp.name);
-            } else if (shift.type === 1) {  // NIGHT
-                state.schedule[day].nightWorkers.push(emp.name);
-            }
+async function cancelAutomaticAssignment() {
+    const jobId = state.activeJobId;
+    if (!jobId) return;
+
+    try {
+        await fetch('/api/cancel', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ job_id: jobId })
         });
+    } catch (error) {
+        console.error('취소 요청 실패:', error);
+    }
+}
+
+// 자동배치 결과 반영 - 압축 결과(grid)를 그대로 배열로 풀고, 날짜별 명단은 배열을 한 번 훑어 생성
+function applyAutoSchedule(result) {
+    state.grid = result.grid
+        ? decodeCompactGrid(result.grid, result.grid_symbols || SHIFT_SYMBOLS)
+        : result.schedule.map(emp => Uint8Array.from(emp.shifts, shift => shift.type));
+    state.gridVersion++;
+
+    state.schedule = {};
+    const numDays = state.grid.length > 0 ? state.grid[0].length : 0;
+    for (let day = 1; day <= numDays; day++) {
+        state.schedule[day] = { dayWorkers: [], nightWorkers: [] };
+    }
+    state.grid.forEach((row, i) => {
+        const name = result.schedule[i].name;
+        for (let d = 0; d < numDays; d++) {
+            if (row[d] === 0) {  // DAY
+                state.schedule[d + 1].dayWorkers.push(name);
+            } else if (row[d] === 1) {  // NIGHT
+                state.schedule[d + 1].nightWorkers.push(name);
+            }
+        }
     });
 }
 
@@ -0,0 +1,269 @@
+"""
+근무 교환 제안
+
+확정된 근무표에서 "14일 NIGHT를 누가 대신 설 수 있나?" 같은 요청에 솔버를 다시
+돌리지 않고 답한다. 근무표를 날짜×근무 유형으로 색인해 같은 날 다른 근무인
+인원을 후보로 고르고, 두 사람의 같은 날짜 근무를 맞바꾸는 교환을 만든다.
+
+- 1:1 교환: 요청한 날짜의 근무를 맞바꿈
+- 2:2 교환: 다른 날짜 하나를 더 맞바꿔 근무일수나 연속 근무 규칙을 맞춤
+
+NIGHT 다음 날 OFF_B는 NIGHT와 함께 움직이므로, 교환 구간은 경계에서 NIGHT→OFF_B
+쌍이 끊기지 않을 때까지 넓힌다. 같은 날짜끼리 맞바꾸므로 날짜별 DAY/NIGHT 인원은
+변하지 않고, 두 사람의 행에서 바뀐 날짜 주변만 다시 검사한다
+(NIGHT→OFF_B 이웃, 바뀐 날을 포함하는 7일 구간, 근무일수, 휴가/근무 불가,
+고정 근무, 분리 인원). 가능한 교환은 목표값 변화(작을수록 좋음) 순으로 반환한다.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from schedule_validator import (
+    DAY, NIGHT, OFF_B, OFF_R, MAX_CONSECUTIVE_WORK, SOFT_CONSECUTIVE_WORK,
+    WEIGHT_CONSECUTIVE_5, WEIGHT_OFFB_TO_OFFR, WEIGHT_IMBALANCE, WEIGHT_PREFERENCE,
+    preference_score, window_sums
+)
+
+Block = Tuple[int, int]  # 교환 구간 [시작, 끝] (양 끝 포함)
+
+
+class RosterIndex:
+    """근무표 색인 (날짜 × 근무 유형 → 인원) 과 두 사람 교환 검사"""
+
+    def __init__(self, grid: np.ndarray, config):
+        self.grid = grid
+        self.config = config
+        self.num_employees, self.num_days = grid.shape
+
+        # by_day_shift[d][s] = d일에 s 근무인 인원 번호
+        self.by_day_shift: List[List[List[int]]] = [
+            [np.nonzero(grid[:, d] == s)[0].tolist() for s in (DAY, NIGHT, OFF_B, OFF_R)]
+            for d in range(self.num_days)
+        ]
+
+        self.fixed = {(f['employee_idx'], f['day']): f['shift_type'] for f in config.fixed_shifts}
+        self.unavailable = getattr(config, 'unavailable_cells', {})
+        self.cliques_of: Dict[int, List[Tuple[int, ...]]] = {}
+        for clique in config.separation_cliques:
+            for i in clique:
+                self.cliques_of.setdefault(i, []).append(tuple(clique))
+
+        self.spread = getattr(config, 'fairness_mode', 'average') == 'spread'
+        self.weekend = np.zeros(self.num_days, dtype=bool)
+        self.weekend[list(config.weekend_days)] = True
+        self.average = self.num_days // self.num_employees if self.num_employees else 0
+        self.day_counts = (grid == DAY).sum(axis=1)
+        self.night_counts = (grid == NIGHT).sum(axis=1)
+        self.weekend_counts = ((grid == DAY) | (grid == NIGHT))[:, self.weekend].sum(axis=1)
+        self.holiday = np.zeros(self.num_days, dtype=bool)
+        if getattr(config, 'holiday_fairness', False):
+            self.holiday[list(config.holiday_days)] = True
+        self.holiday_counts = ((grid == DAY) | (grid == NIGHT))[:, self.holiday].sum(axis=1)
+
+    def block(self, a: int, b: int, day: int) -> Block:
+        """day를 포함하고 경계에서 NIGHT→OFF_B 쌍이 끊기지 않는 가장 짧은 구간"""
+        start = end = day
+        rows = self.grid[[a, b]]
+        while True:
+            if end + 1 < self.num_days and (rows[:, end] == NIGHT).any():
+                end += 1
+            elif start > 0 and (rows[:, start] == OFF_B).any():
+                start -= 1
+            else:
+                return start, end
+
+    def exchanged(self, a: int, b: int, blocks: List[Block]) -> Tuple[np.ndarray, np.ndarray]:
+        """구간들을 맞바꾼 뒤 두 사람의 행"""
+        row_a, row_b = self.grid[a].copy(), self.grid[b].copy()
+        for start, end in blocks:
+            row_a[start:end + 1] = self.grid[b, start:end + 1]
+            row_b[start:end + 1] = self.grid[a, start:end + 1]
+        return row_a, row_b
+
+    def row_violations(self, i: int, row: np.ndarray, changed: List[int]) -> List[str]:
+        """바뀐 날짜 주변의 필수 규칙 위반 (행 하나)"""
+        violations = []
+        low, high = max(0, min(changed) - 1), min(self.num_days - 1, max(changed) + 1)
+        for t in range(low, high + 1):
+            if row[t] == NIGHT and t + 1 < self.num_days and row[t + 1] != OFF_B:
+                violations.append('night_then_offb')
+            if row[t] == OFF_B and (t == 0 or row[t - 1] != NIGHT):
+                violations.append('offb_after_night' if t else 'offb_on_first_day')
+
+        # 바뀐 날을 포함하는 7일 구간만
+        window = MAX_CONSECUTIVE_WORK + 1
+        left = max(0, min(changed) - window + 1)
+        right = min(self.num_days, max(changed) + window)
+        work = (row[left:right] != OFF_R)[np.newaxis, :]
+        if (window_sums(work, window) >= window).any():
+            violations.append('max_consecutive_work')
+
+        if (row != OFF_R).sum() != (self.grid[i] != OFF_R).sum():
+            violations.append('work_days')
+
+        for d in changed:
+            if (i, d) in self.fixed and row[d] != self.fixed[(i, d)]:
+                violations.append('fixed_shift')
+            if int(row[d]) in self.unavailable.get((i, d), ()):
+                violations.append('unavailable')
+        return violations
+
+    def separation_violations(self, rows: Dict[int, np.ndarray], changed: List[int]) -> List[str]:
+        """바뀐 칸에서 같은 분리 그룹 인원과 같은 근무가 되는지"""
+        for i, row in rows.items():
+            for clique in self.cliques_of.get(i, ()):
+                for d in changed:
+                    if row[d] not in (DAY, NIGHT):
+                        continue
+                    for j in clique:
+                        other = rows[j][d] if j in rows else self.grid[j, d]
+                        if j != i and other == row[d]:
+                            return ['separation']
+        return []
+
+    def soft_scores(self, rows: Dict[int, np.ndarray]) -> Dict[str, int]:
+        """바뀐 행만 다시 계산한 목표 항목 (연속 5일, OFF_B→OFF_R, 불균형, 선호 만족도)"""
+        scores = {'consecutive_5plus': 0, 'offb_to_offr': 0}
+        for row in rows.values():
+            work = (row != OFF_R)[np.newaxis, :]
+            scores['consecutive_5plus'] += int(
+                (window_sums(work, SOFT_CONSECUTIVE_WORK) == SOFT_CONSECUTIVE_WORK).sum()
+            )
+            scores['offb_to_offr'] += int(((row[:-1] == OFF_B) & (row[1:] == OFF_R)).sum())
+
+        if self.spread:
+            day_counts, night_counts = self.day_counts.copy(), self.night_counts.copy()
+            weekend_counts = self.weekend_counts.copy()
+            holiday_counts = self.holiday_counts.copy()
+            for i, row in rows.items():
+                day_counts[i] = (row == DAY).sum()
+                night_counts[i] = (row == NIGHT).sum()
+                weekend_counts[i] = ((row == DAY) | (row == NIGHT))[self.weekend].sum()
+                holiday_counts[i] = ((row == DAY) | (row == NIGHT))[self.holiday].sum()
+            imbalance = int(np.ptp(day_counts) + np.ptp(night_counts))
+            if self.weekend.any():
+                imbalance += int(np.ptp(weekend_counts))
+            if self.holiday.any():
+                imbalance += int(np.ptp(holiday_counts))
+        else:
+            imbalance = sum(
+                abs(int((row == DAY).sum()) - self.average)
+                + abs(int((row == NIGHT).sum()) - self.average)
+                for row in rows.values()
+            )
+            if self.holiday.any():
+                imbalance += sum(
+                    abs(int(((row == DAY) | (row == NIGHT))[self.holiday].sum())
+                        - self.config.holiday_work_average)
+                    for row in rows.values()
+                )
+        scores['imbalance'] = imbalance
+        preference_weights = getattr(self.config, 'preference_weights', {})
+        scores['preference_satisfaction'] = sum(
+            preference_score(row, i, self.config) for i, row in rows.items() if i in preference_weights
+        )
+        return scores
+
+    def evaluate(self, a: int, b: int, blocks: List[Block]) -> Optional[Dict]:
+        """교환 하나 검사 - 필수 규칙을 지키면 변경 칸과 목표값 변화, 아니면 None"""
+        row_a, row_b = self.exchanged(a, b, blocks)
+        changed = [d for start, end in blocks for d in range(start, end + 1)
+                   if self.grid[a, d] != self.grid[b, d]]
+        if not changed:
+            return None
+        rows = {a: row_a, b: row_b}
+        for i, row in rows.items():
+            if self.row_violations(i, row, changed):
+                return None
+        if self.separation_violations(rows, changed):
+            return None
+
+        before = self.soft_scores({a: self.grid[a], b: self.grid[b]})
+        after = self.soft_scores(rows)
+        deltas = {name: after[name] - before[name] for name in before}
+        return {
+            'days': changed,
+            'changes': [
+                {'employee_idx': i, 'day': d, 'from': int(self.grid[i, d]), 'to': int(rows[i][d])}
+                for i in (a, b) for d in changed
+            ],
+            'score_deltas': deltas,
+            'objective_delta': (WEIGHT_CONSECUTIVE_5 * deltas['consecutive_5plus']
+                                - WEIGHT_OFFB_TO_OFFR * deltas['offb_to_offr']
+                                + WEIGHT_IMBALANCE * deltas['imbalance']
+                                - WEIGHT_PREFERENCE * deltas['preference_satisfaction'])
+        }
+
+
+def suggest_swaps(grid: np.ndarray, config, employee_idx: int, day: int,
+                  partner_idx: Optional[int] = None, limit: int = 20,
+                  two_for_two: bool = True) -> Dict:
+    """
+    employee_idx의 day일 근무를 넘겨받을 수 있는 교환 목록
+
+    Args:
+        grid: 현재 근무표 (인원 × 일수, 근무 유형 번호)
+        config: WorkScheduleConfig (규칙과 목표 계산용)
+        employee_idx, day: 근무를 넘기려는 인원과 날짜 (0-based)
+        partner_idx: 교환 상대를 한 명으로 제한 (None이면 전체)
+        limit: 반환할 최대 제안 수
+        two_for_two: 1:1 교환이 안 되는 상대와 다른 날짜를 하나 더 맞바꾸는 교환도 탐색
+
+    Returns:
+        {'shift_type', 'suggestions': [...], 'candidates_checked', 'feasible_count', 'elapsed_ms'}
+    """
+    started = time.perf_counter()
+    if not 0 <= day < config.num_days:
+        raise ValueError(f'날짜가 범위를 벗어났습니다: {day}')
+    index = RosterIndex(grid, config)
+    shift_type = int(grid[employee_idx, day])
+
+    partners = [
+        b for t in (DAY, NIGHT, OFF_B, OFF_R) if t != shift_type
+        for b in index.by_day_shift[day][t]
+        if b != employee_idx and (partner_idx is None or b == partner_idx)
+    ]
+
+    suggestions, checked = [], 0
+    for b in partners:
+        first = index.block(employee_idx, b, day)
+        checked += 1
+        single = index.evaluate(employee_idx, b, [first])
+        if single is not None:
+            suggestions.append(dict(single, type='one_for_one', partner_idx=b))
+            continue
+        if not two_for_two:
+            continue
+
+        # 구간이 겹치지 않고 붙지도 않는 다른 날짜 (붙으면 하나의 구간과 같음)
+        seen = set()
+        for other_day in range(config.num_days):
+            if first[0] - 1 <= other_day <= first[1] + 1:
+                continue
+            second = index.block(employee_idx, b, other_day)
+            if second in seen or not (second[1] < first[0] - 1 or second[0] > first[1] + 1):
+                continue
+            seen.add(second)
+            checked += 1
+            double = index.evaluate(employee_idx, b, sorted([first, second]))
+            if double is not None:
+                suggestions.append(dict(double, type='two_for_two', partner_idx=b))
+
+    suggestions.sort(key=lambda s: (s['objective_delta'], s['type'] != 'one_for_one',
+                                    len(s['changes'])))
+    employees = getattr(config, 'employees', None)
+    for suggestion in suggestions:
+        if employees is not None:
+            suggestion['partner'] = employees[suggestion['partner_idx']]
+
+    return {
+        'employee_idx': employee_idx,
+        'day': day,
+        'shift_type': shift_type,
+        'suggestions': suggestions[:limit],
+        'candidates_checked': checked,
+        'feasible_count': len(suggestions),
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
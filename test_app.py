@@ -0,0 +1,443 @@
+"""
+Flask API 테스트 스크립트
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# 실행 이력은 테스트마다 새 파일에 기록 (사용자 이력과 섞이지 않도록)
+os.environ['SCHEDULE_HISTORY_PATH'] = os.path.join(tempfile.mkdtemp(), 'history.db')
+
+import app as app_module
+import solver_service
+from shared_store import SharedStore
+from solve_history import SolveHistory, features_from_params
+
+
+def test_app_import_does_not_load_solver():
+    """app import 시 OR-Tools를 불러오지 않는지 확인 (별도 프로세스)"""
+    code = "import sys, app; assert 'ortools' not in sys.modules, 'ortools loaded eagerly'"
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_prewarm_and_metrics():
+    """예열 후 기동 지표와 요청 지연시간이 기록되는지 확인"""
+    solver_service.start_prewarm().result(timeout=60)
+
+    client = app_module.app.test_client()
+    response = client.post('/api/generate_schedule', json={
+        'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C'], 'work_days': 20
+    })
+    assert response.status_code == 422
+
+    data = client.get('/api/metrics').get_json()['data']
+    assert data['solver_loaded']
+    assert 'prewarm_done' in data['startup']['marks_ms']
+    assert 'solver_import' in data['startup']['durations_ms']
+    assert 'generate_schedule' in data['startup']['requests']
+
+
+HARD_PARAMS = {
+    'year': 2025, 'month': 1, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20
+}
+
+
+def test_deadline_is_clamped():
+    """클라이언트 마감 시간은 서버 상한을 넘지 않음"""
+    assert solver_service.clamp_deadline(None) == solver_service.MAX_SOLVE_SECONDS
+    assert solver_service.clamp_deadline(10_000) == solver_service.MAX_SOLVE_SECONDS
+    assert solver_service.clamp_deadline(0) == 1.0
+
+
+def test_cancel_endpoint_stops_solve():
+    """취소 API 호출 시 실행 중인 솔버가 즉시 중단"""
+    job = solver_service.submit_job(HARD_PARAMS, deadline_seconds=60, job_id='cancel-test')
+    time.sleep(1.0)
+
+    client = app_module.app.test_client()
+    response = client.post('/api/cancel', json={'job_id': 'cancel-test'})
+    assert response.get_json()['cancelled']
+
+    started = time.perf_counter()
+    status, result = job.future.result(timeout=10)
+    assert status == 'CANCELLED' and result is None
+    assert time.perf_counter() - started < 2
+    assert job.cancel_reason == 'cancelled'
+
+
+def test_new_request_supersedes_same_session():
+    """같은 세션의 새 요청이 들어오면 이전 요청은 자동 취소"""
+    first = solver_service.submit_job(HARD_PARAMS, deadline_seconds=60, session_id='s1')
+    time.sleep(0.5)
+    second = solver_service.submit_job(HARD_PARAMS, deadline_seconds=2, session_id='s1')
+
+    assert first.future.result(timeout=10)[0] == 'CANCELLED'
+    assert first.cancel_reason == 'superseded'
+    assert second.future.result(timeout=10)[0] in ('FEASIBLE', 'OPTIMAL')
+
+
+def test_validate_endpoint_reports_cells():
+    """검증 API - 위반 칸을 날짜와 함께 반환"""
+    client = app_module.app.test_client()
+    grid = [['R'] * 28 for _ in range(3)]
+    grid[0][0] = 'B'
+    grid[1][4] = 'N'
+
+    response = client.post('/api/validate', json={
+        'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C'], 'work_days': 20, 'grid': grid
+    })
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert not data['valid']
+
+    rules = {(v['rule'], v['employee_idx'], v['day']) for v in data['violations']}
+    assert ('offb_on_first_day', 0, 0) in rules
+    assert ('night_then_offb', 1, 5) in rules
+    assert ('day_coverage', None, 0) in rules
+    assert 'objective' in data['scores']
+
+
+def test_compact_grid_payload():
+    """압축 결과 - 인원별 근무 기호 문자열로 보내고, 그대로 검증 API에 다시 넣을 수 있음"""
+    client = app_module.app.test_client()
+    payload = {'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20,
+               'leave': [{'employee_idx': 'C', 'days': [3, 4]}], 'deadline_seconds': 5}
+    full = client.post('/api/generate_schedule', json=payload).get_json()
+    compact = client.post('/api/generate_schedule', json=dict(payload, compact=True)).get_json()
+    assert full['success'] and compact['success']
+
+    result = compact['result']
+    assert result['grid_symbols'] == 'DNBR'
+    assert all('shifts' not in emp for emp in result['schedule'])
+    assert result['schedule'][2]['leave_days'] == [3, 4]
+    assert [len(row) for row in result['grid']] == [28] * 5
+    assert solver_service.compact_result(full['result'])['grid'] == [
+        ''.join(shift['symbol'] for shift in emp['shifts']) for emp in full['result']['schedule']
+    ]
+    assert len(str(result)) < len(str(full['result'])) / 3
+
+    response = client.post('/api/validate', json=dict(payload, grid=result['grid']))
+    assert response.get_json()['data']['valid']
+
+
+def test_shared_store_across_workers():
+    """같은 저장소 파일을 쓰는 두 워커 사이에서 취소 요청과 세션 교체가 전달됨"""
+    path = os.path.join(tempfile.mkdtemp(), 'store.db')
+    worker_a, worker_b = SharedStore(path), SharedStore(path)
+
+    assert worker_a.register_job('j1', 's1', 60) is None
+    try:
+        worker_b.register_job('j1', None, 60)
+        assert False, '중복 작업 ID는 거부되어야 함'
+    except ValueError:
+        pass
+
+    # 다른 워커로 들어온 같은 세션의 새 요청 → 이전 작업에 취소 요청
+    assert worker_b.register_job('j2', 's1', 60) == 'j1'
+    assert worker_a.cancel_requests(['j1', 'j2']) == {'j1': 'superseded'}
+
+    assert worker_a.request_cancel('j2', 'cancelled')
+    assert worker_b.cancel_requests(['j2']) == {'j2': 'cancelled'}
+    worker_b.finish_job('j2')
+    assert not worker_a.request_cancel('j2', 'cancelled')
+
+    # 증명된 결과만 공유 캐시에 저장
+    worker_a.put_result('k1', 'OPTIMAL', {'schedule': []})
+    worker_a.put_result('k2', 'FEASIBLE', {'schedule': []})
+    assert worker_b.get_result('k1') == ('OPTIMAL', {'schedule': []})
+    assert worker_b.get_result('k2') is None
+
+
+def test_infeasible_result_is_cached():
+    """같은 설정의 증명된 결과는 다시 풀지 않고 공유 캐시에서 반환"""
+    params = {'year': 2025, 'month': 3, 'employees': ['A', 'B'], 'work_days': 20}
+    store = solver_service.get_store()
+    hits = store.result_hits
+
+    assert solver_service.solve_schedule(params, 10) == ('INFEASIBLE', None)
+    started = time.perf_counter()
+    assert solver_service.solve_schedule(params, 10) == ('INFEASIBLE', None)
+    assert store.result_hits == hits + 1
+    assert time.perf_counter() - started < 1
+
+
+def test_identical_requests_share_one_solve():
+    """같은 설정의 동시 요청은 솔버 하나에 합류하고 같은 결과를 받음"""
+    before = solver_service.coalescing_stats()
+    params = dict(HARD_PARAMS, fixed_shifts=[
+        {'employee_idx': 0, 'day': 0, 'shift_type': 0}, {'employee_idx': 1, 'day': 0, 'shift_type': 1}
+    ])
+    reordered = dict(params, fixed_shifts=list(reversed(params['fixed_shifts'])))
+
+    # 결과 전달은 합류한 요청 수와 관계없이 솔버 실행당 한 번
+    landings = []
+    land = solver_service._land
+    solver_service._land = lambda flight, future: (landings.append(flight), land(flight, future))
+    try:
+        first = solver_service.submit_job(params, deadline_seconds=3)
+        second = solver_service.submit_job(reordered, deadline_seconds=5)
+        third = solver_service.submit_job(params, deadline_seconds=5)
+        assert first.flight is second.flight is third.flight
+        assert solver_service.coalescing_stats()['coalesced_waiters'] >= 2
+
+        # 하나가 취소되어도 나머지는 계속 기다림
+        solver_service.cancel_job(third.job_id)
+        assert third.future.result(timeout=1) == ('CANCELLED', None)
+        assert not first.flight.cancel_event.is_set()
+
+        assert first.future.result(timeout=10) is second.future.result(timeout=10)
+        time.sleep(0.2)  # 같은 future에 등록된 나머지 콜백이 있으면 실행될 시간
+    finally:
+        solver_service._land = land
+    assert landings == [first.flight]
+    after = solver_service.coalescing_stats()
+    assert after['coalesced_total'] == before['coalesced_total'] + 2
+    assert after['flights_total'] == before['flights_total'] + 1
+
+    # 마감이 더 이른 요청은 합류하지 않음
+    late = solver_service.submit_job(HARD_PARAMS, deadline_seconds=5)
+    early = solver_service.submit_job(HARD_PARAMS, deadline_seconds=2)
+    assert late.flight is not early.flight
+    solver_service.cancel_job(late.job_id)
+    solver_service.cancel_job(early.job_id)
+    assert late.flight.cancel_event.is_set() and early.flight.cancel_event.is_set()
+
+
+def test_sweep_endpoint_finds_frontier():
+    """가능 영역 탐색 API - 단조성으로 대부분의 칸을 탐침 없이 결정"""
+    client = app_module.app.test_client()
+    response = client.post('/api/sweep', json={
+        'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20,
+        'headcount_range': [2, 8], 'work_days_range': [14, 26], 'probe_seconds': 5
+    })
+    assert response.status_code == 200
+    data = response.get_json()['data']
+
+    assert data['min_headcount'] == 5
+    assert data['max_work_days'] == 24
+    rows = {row['num_employees']: row for row in data['frontier']}
+    assert rows[3]['max_work_days'] is None
+    assert rows[4]['min_work_days'] >= rows[5]['min_work_days'] >= rows[6]['min_work_days']
+    assert data['decided_cells'] == data['cells']
+    assert data['pruned_cells'] > 0
+
+    # 분리 인원을 명시하면 인원 방향 단조성도 써서 탐침이 칸 수의 절반 미만
+    explicit = client.post('/api/sweep', json={
+        'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20,
+        'separate_pairs': [['A', 'B']],
+        'headcount_range': [2, 8], 'work_days_range': [14, 26], 'probe_seconds': 5
+    }).get_json()['data']
+    assert explicit['decided_cells'] == explicit['cells']
+    assert len(explicit['probes']) < explicit['cells'] // 2 < len(data['probes'])
+
+    # 탐색도 솔버 풀에 작업으로 등록되어 취소 API로 중단
+    job = solver_service.submit_sweep(
+        dict(HARD_PARAMS, employees=[f'인원{i}' for i in range(1, 21)]),
+        range(2, 31), range(10, 32), probe_seconds=30, parallel=2, job_id='sweep-cancel'
+    )
+    time.sleep(1.0)
+    assert client.post('/api/cancel', json={'job_id': 'sweep-cancel'}).get_json()['cancelled']
+    assert job.future.result(timeout=5) == ('CANCELLED', None)
+    assert job.cancel_reason == 'cancelled'
+
+
+def test_history_predicts_budget():
+    """실행 이력의 비슷한 문제로 시간 제한, 스레드 수, ETA 예측"""
+    history = SolveHistory(os.path.join(tempfile.mkdtemp(), 'history.db'))
+    features = features_from_params(HARD_PARAMS)
+    assert history.predict(features, 60, max_workers=8)['eta_seconds'] is None
+
+    for seconds in (0.1, 0.2, 0.3):
+        history.record(features, {'status': 'INFEASIBLE', 'build_seconds': 0.05,
+                                  'search_seconds': seconds, 'num_workers': 8}, 60)
+    estimate = history.predict(features, 60, max_workers=8)
+    assert estimate['basis'] == 'infeasible' and estimate['neighbors'] == 3
+    assert estimate['budget_seconds'] == 5.0  # 3 × 0.3 + 1 → 하한
+    assert abs(estimate['eta_seconds'] - 0.35) < 1e-6
+    assert estimate['num_workers'] == 2
+
+    # 인원이 크게 다른 문제는 이웃이 아님
+    other = dict(features, num_employees=12)
+    assert history.predict(other, 60)['basis'] == 'default'
+
+    # 시간 제한 직전까지 개선 중이던 기록이 섞이면 시간을 줄이지 않음
+    for improved in (9.5, 2.0, 3.0):
+        history.record(features, {'status': 'FEASIBLE', 'search_seconds': 10,
+                                  'last_improvement_seconds': improved}, 10)
+    assert history.predict(features, 60)['budget_seconds'] == 60
+
+
+def test_estimate_endpoint_uses_history():
+    """실제로 푼 결과가 이력에 남고, 예측 API와 생성 응답에 ETA가 포함됨"""
+    before = solver_service.get_history().stats()['records']
+    for index in range(3):
+        params = {'year': 2025, 'month': 4, 'employees': [f'E{index}a', f'E{index}b'],
+                  'work_days': 20}
+        assert solver_service.solve_schedule(params, 10)[0] == 'INFEASIBLE'
+    assert solver_service.get_history().stats()['records'] == before + 3
+
+    client = app_module.app.test_client()
+    payload = {'year': 2025, 'month': 4, 'employees': ['X', 'Y'], 'work_days': 20}
+    data = client.post('/api/estimate', json=payload).get_json()['data']
+    assert data['basis'] == 'infeasible'
+    assert data['eta_seconds'] is not None and data['budget_seconds'] < 10
+
+    response = client.post('/api/generate_schedule', json=dict(payload, deadline_seconds=60))
+    assert response.status_code == 422
+    assert response.get_json()['estimate']['budget_seconds'] == data['budget_seconds']
+
+
+def test_swap_suggestions_endpoint():
+    """근무 교환 제안 API - 이름으로 인원과 상대를 지정"""
+    client = app_module.app.test_client()
+    params = {'year': 2025, 'month': 2, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20}
+    status, result = solver_service.solve_schedule(params, 5)
+    grid = [[shift['symbol'] for shift in emp['shifts']] for emp in result['schedule']]
+
+    night_owner = next(i for i, row in enumerate(grid) if row[13] == 'N')
+    response = client.post('/api/swap_suggestions', json=dict(
+        params, grid=grid, employee=params['employees'][night_owner], day=13, limit=5
+    ))
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['shift_type'] == 1
+    assert len(data['suggestions']) <= 5
+    for suggestion in data['suggestions']:
+        assert suggestion['partner'] == params['employees'][suggestion['partner_idx']]
+
+    response = client.post('/api/swap_suggestions', json=dict(
+        params, grid=grid, employee='Z', day=13
+    ))
+    assert response.status_code == 400
+
+
+def test_calendar_info_is_cacheable():
+    """달력 API - 공휴일 포함, GET 응답은 ETag로 재검증 (304)"""
+    client = app_module.app.test_client()
+    response = client.get('/api/calendar_info?year=2025&month=10')
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert 'max-age' in response.headers['Cache-Control']
+
+    data = response.get_json()['data']
+    assert data['num_days'] == 31 and data['holidays_known']
+    assert data['days'][5]['is_holiday'] and data['days'][5]['holiday_name'] == '추석'
+    assert not data['days'][0]['is_holiday']
+
+    cached = client.get('/api/calendar_info?year=2025&month=10',
+                        headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+    # 기존 POST 방식도 같은 내용
+    posted = client.post('/api/calendar_info', json={'year': 2025, 'month': 10})
+    assert posted.get_json()['data'] == data
+    assert client.get('/api/calendar_info?year=2025&month=13').status_code == 400
+
+
+def test_isolated_solve_records_memory():
+    """격리 모드 - 자식 프로세스에서 풀고 최대 RSS와 모델 크기를 이력에 기록"""
+    import solve_isolation
+
+    settings = solver_service.ISOLATION
+    solver_service.ISOLATION = solve_isolation.IsolationSettings(rss_mb=4096)
+    try:
+        params = {'year': 2025, 'month': 4, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 21}
+        status, result = solver_service.solve_schedule(params, 3)
+        assert result is not None, status
+        assert 'degraded' not in result
+
+        proto_bytes, peak = solver_service.get_history().conn.execute(
+            'SELECT proto_bytes, peak_rss_mb FROM solves ORDER BY id DESC LIMIT 1'
+        ).fetchone()
+        assert proto_bytes > 0 and peak > 0
+        stats = solver_service.isolation_stats()
+        assert stats['enabled'] and stats['solves'] >= 1 and stats['max_peak_rss_mb'] >= peak
+
+        # RSS 상한에 맞춰 탐색 스레드 수를 줄임 (한 개는 항상 허용)
+        base = solve_isolation.current_rss_mb()
+        assert solve_isolation.memory_aware_workers(8, 1024 * 1024, base + 56) == 3
+        assert solve_isolation.memory_aware_workers(8, 1024 * 1024, base) == 1
+        assert solve_isolation.memory_aware_workers(8, 1024 * 1024, None) == 8
+    finally:
+        solver_service.ISOLATION = settings
+
+
+def test_memory_limit_degrades_without_crashing():
+    """주소 공간 제한을 넘으면 서버는 그대로 두고 단계적으로 물러선 뒤 503"""
+    import solve_isolation
+
+    settings = solver_service.ISOLATION
+    solver_service.ISOLATION = solve_isolation.IsolationSettings(address_space_mb=100)
+    try:
+        client = app_module.app.test_client()
+        response = client.post('/api/generate_schedule', json={
+            'year': 2025, 'month': 6, 'employees': ['A', 'B', 'C', 'D', 'E'], 'work_days': 20,
+            'deadline_seconds': 5
+        })
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'MEMORY_LIMIT'
+        stats = solver_service.isolation_stats()
+        assert stats['memory_failures'] + stats['crashes'] >= 2
+    finally:
+        solver_service.ISOLATION = settings
+
+
+def test_serve_cancels_on_disconnect():
+    """serve.py(gunicorn)로 띄운 서버도 클라이언트 연결이 끊기면 실행 중인 솔버를 취소"""
+    import json
+    import socket
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    store_path = os.path.join(tempfile.mkdtemp(), 'store.db')
+    server = subprocess.Popen(
+        [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '1', '--store', store_path],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        body = json.dumps(dict(HARD_PARAMS, deadline_seconds=60)).encode()
+        client = socket.create_connection(('127.0.0.1', port))
+        client.sendall(
+            b'POST /api/generate_schedule HTTP/1.1\r\nHost: localhost\r\n'
+            b'Content-Type: application/json\r\n'
+            + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+        )
+        store = SharedStore(store_path)
+        for _ in range(100):
+            if store.active_job_count() == 1:
+                break
+            time.sleep(0.1)
+        assert store.active_job_count() == 1
+        client.close()
+
+        # 연결 확인 주기(0.25초) + 자식 프로세스 정리 후 작업이 끝남 (마감 60초보다 훨씬 빨리)
+        started = time.perf_counter()
+        while store.active_job_count() and time.perf_counter() - started < 10:
+            time.sleep(0.2)
+        assert store.active_job_count() == 0
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
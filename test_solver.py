@@ -3,7 +3,19 @@
 웹 서버 없이 솔버 로직만 테스트
 """
 
-from schedule_solver import WorkScheduleConfig, WorkScheduleSolver, ShiftType
+from schedule_solver import (
+    WorkScheduleConfig, WorkScheduleSolver, ShiftType, ObjectiveMode, FairnessMode, PreferenceType
+)
+from model_cache import ModelTemplateCache
+from conflict_graph import build_edges, maximal_cliques
+from schedule_validator import grid_from_result, validate_schedule
+
+
+def assert_valid_result(config, result):
+    """검증기를 정답 기준으로 솔버 결과가 모든 필수 규칙을 만족하는지 확인"""
+    report = validate_schedule(grid_from_result(result), config)
+    assert report['valid'], report['violations'][:5]
+    return report
 
 def test_basic_schedule():
     """기본 근무표 생성 테스트"""
@@ -39,6 +51,7 @@ def test_basic_schedule():
     print(f"\n솔버 상태: {status}")
 
     if result:
+        assert_valid_result(config, result)
         print("\n✅ 근무표 생성 성공!")
         print("\n근무표 샘플:")
         print("-" * 60)
@@ -105,6 +118,7 @@ def test_with_fixed_shifts():
     print(f"\n솔버 상태: {status}")
 
     if result:
+        assert_valid_result(config, result)
         print("\n✅ 고정 근무가 포함된 근무표 생성 성공!")
 
         # 고정 근무 확인
@@ -125,6 +139,558 @@ def test_with_fixed_shifts():
     print("\n" + "="*60)
 
 
+def test_model_template_cache():
+    """모델 템플릿 캐시 테스트 - 같은 형태는 골격을 재사용하고 고정 근무만 새로 적용"""
+    cache = ModelTemplateCache()
+    employees = ["김철수", "이영희", "박민수", "정지훈", "최수진"]
+
+    first = WorkScheduleSolver(
+        WorkScheduleConfig(2025, 2, employees, work_days=20), model_cache=cache
+    )
+    status, result = first.solve(max_time_seconds=5)
+    assert result is not None, status
+    assert_valid_result(first.config, result)
+    assert not first.cache_hit
+
+    # 이름과 고정 근무만 다른 요청은 캐시 적중
+    fixed_shifts = [{'employee_idx': 2, 'day': 9, 'shift_type': ShiftType.NIGHT}]
+    second = WorkScheduleSolver(
+        WorkScheduleConfig(2025, 2, list("ABCDE"), work_days=20, fixed_shifts=fixed_shifts),
+        model_cache=cache
+    )
+    status, result = second.solve(max_time_seconds=5)
+    assert result is not None, status
+    assert_valid_result(second.config, result)
+    assert second.cache_hit
+    assert result['schedule'][2]['shifts'][9]['type'] == ShiftType.NIGHT
+    assert result['schedule'][2]['shifts'][10]['type'] == ShiftType.OFF_B
+    assert result['schedule'][0]['name'] == "A"
+
+    # 근무일수가 다르면 다른 형태
+    third = WorkScheduleSolver(
+        WorkScheduleConfig(2025, 2, employees, work_days=19), model_cache=cache
+    )
+    third.build_model()
+    assert not third.cache_hit
+
+    stats = cache.stats()
+    print(f"\n캐시 통계: {stats}")
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['size'] == 2
+
+
+def test_lexicographic_objective():
+    """단계별 최적화 테스트 - 앞 단계 최적값을 유지한 채 다음 목표 최적화"""
+    config = WorkScheduleConfig(
+        2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진"],
+        work_days=20, objective_mode=ObjectiveMode.LEXICOGRAPHIC
+    )
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=6)
+    assert result is not None, status
+    assert_valid_result(solver.config, result)
+
+    stages = result['objective_stages']
+    print(f"\n단계별 결과: {stages}")
+    assert [stage['stage'] for stage in stages] == [
+        'consecutive_5plus', 'offb_to_offr', 'imbalance'
+    ]
+    assert stages[0]['status'] == 'OPTIMAL'
+
+    # 최종 해도 1단계 최적값(5일 연속 근무 횟수)을 유지
+    streaks = 0
+    for emp in result['schedule']:
+        types = [shift['type'] for shift in emp['shifts']]
+        for d in range(len(types) - 4):
+            if all(t != ShiftType.OFF_R for t in types[d:d + 5]):
+                streaks += 1
+    assert streaks == stages[0]['value']
+
+
+def test_fairness_spread_mode():
+    """최대-최소 차이 방식 테스트 - 목표 변수 값이 실제 근무 횟수 차이와 일치"""
+    config = WorkScheduleConfig(
+        2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진"],
+        work_days=20, fairness_mode=FairnessMode.SPREAD
+    )
+    assert config.weekend_days == [0, 1, 7, 8, 14, 15, 21, 22]
+
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=5)
+    assert result is not None, status
+    assert_valid_result(solver.config, result)
+
+    stats = result['statistics']['employee_stats']
+    day_spread = max(e['day'] for e in stats) - min(e['day'] for e in stats)
+    night_spread = max(e['night'] for e in stats) - min(e['night'] for e in stats)
+    weekend_counts = [
+        sum(1 for d in config.weekend_days
+            if emp['shifts'][d]['type'] in (ShiftType.DAY, ShiftType.NIGHT))
+        for emp in result['schedule']
+    ]
+    weekend_spread = max(weekend_counts) - min(weekend_counts)
+
+    values = [solver.solver.Value(v) for v in solver.fairness_spread_vars]
+    print(f"\n차이 (DAY, NIGHT, 주말): {values}")
+    # 최대/최소 변수는 실제 횟수를 감싸는 범위이므로 차이 변수 ≥ 실제 차이
+    assert all(v >= actual for v, actual in zip(values, [day_spread, night_spread, weekend_spread]))
+    assert solver.day_imbalance_vars == [] and solver.night_imbalance_vars == []
+
+
+def test_separation_cliques():
+    """분리 쌍/그룹을 극대 클릭으로 묶어 날짜·근무별 AddAtMostOne으로 적용"""
+    employees = ["김철수", "이영희", "박민수", "정지훈", "최수진", "한가람"]
+
+    # 삼각형을 이루는 쌍은 하나의 클릭으로 합쳐짐
+    edges = build_edges(employees, pairs=[[0, 1], ["이영희", "박민수"], [0, 2], [4, 5]])
+    assert maximal_cliques(edges) == [(0, 1, 2), (4, 5)]
+    # 제너레이터로 넘겨도 간선이 빠지지 않음
+    assert build_edges(employees, (pair for pair in [[0, 1]]), (g for g in [[2, 3, 4]])) == \
+        {(0, 1), (2, 3), (2, 4), (3, 4)}
+
+    # 기본값은 맨 밑 두 명
+    assert WorkScheduleConfig(2025, 2, employees).separation_cliques == [(4, 5)]
+
+    config = WorkScheduleConfig(
+        2025, 2, employees, work_days=20,
+        separation_groups=[["김철수", "이영희", "박민수"]]
+    )
+    assert config.separation_cliques == [(0, 1, 2)]
+
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=5)
+    assert result is not None, status
+    assert_valid_result(solver.config, result)
+
+    for d in range(config.num_days):
+        for shift_type in (ShiftType.DAY, ShiftType.NIGHT):
+            together = [
+                i for i in (0, 1, 2)
+                if result['schedule'][i]['shifts'][d]['type'] == shift_type
+            ]
+            assert len(together) <= 1, (d, shift_type, together)
+
+
+def test_validator_detects_violations():
+    """검증기 테스트 - 규칙을 어긴 칸을 위치와 함께 보고"""
+    config = WorkScheduleConfig(2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진"])
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=5)
+    assert result is not None, status
+
+    grid = grid_from_result(result)
+    report = validate_schedule(grid, config)
+    assert report['valid']
+    assert report['scores']['objective'] <= solver.solver.ObjectiveValue()
+
+    # 1일 OFF_B, NIGHT 다음 날 DAY로 변경
+    broken = grid.copy()
+    broken[0, 0] = ShiftType.OFF_B
+    night_rows, night_days = (broken[:, :-1] == ShiftType.NIGHT).nonzero()
+    i, d = int(night_rows[0]), int(night_days[0])
+    broken[i, d + 1] = ShiftType.DAY
+
+    report = validate_schedule(broken, config)
+    rules = {(v['rule'], v['employee_idx'], v['day']) for v in report['violations']}
+    assert ('offb_on_first_day', 0, 0) in rules
+    assert ('night_then_offb', i, d + 1) in rules
+    assert not report['valid']
+
+
+def test_diverse_alternatives():
+    """대안 근무표 테스트 - 한 번의 요청으로 서로 다른 근무표 여러 개"""
+    config = WorkScheduleConfig(
+        2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진"],
+        work_days=20, num_alternatives=3
+    )
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=8)
+    assert result is not None, status
+    assert_valid_result(config, result)
+
+    alternatives = result['alternatives']
+    print(f"\n대안 {len(alternatives)}개: "
+          f"{[(a['objective_value'], a['hamming_distance']) for a in alternatives]}")
+    assert 1 <= len(alternatives) <= 2
+
+    grids = [grid_from_result(result)] + [grid_from_result(a) for a in alternatives]
+    for alternative in alternatives:
+        assert_valid_result(config, alternative)
+    for a in range(len(grids)):
+        for b in range(a + 1, len(grids)):
+            assert (grids[a] != grids[b]).sum() >= config.min_alternative_distance
+
+
+def test_batch_mode():
+    """배치 모드 테스트 - JSON/CSV 설정을 병렬로 풀고 결과 파일 저장"""
+    import json
+    import tempfile
+    from pathlib import Path
+    from schedule_generator import load_batch_file, run_batch
+
+    work_dir = Path(tempfile.mkdtemp())
+    (work_dir / 'configs.json').write_text(json.dumps([
+        {'name': 'feb5', 'year': 2025, 'month': 2,
+         'employees': ["김철수", "이영희", "박민수", "정지훈", "최수진"], 'time_limit': 3},
+        {'year': 2025, 'month': 2, 'employees': ["김철수", "이영희"], 'fairness_mode': 'bogus'},
+    ], ensure_ascii=False), encoding='utf-8')
+    (work_dir / 'configs.csv').write_text(
+        'name,year,month,employees,work_days\nfeb2,2025,2,김철수;이영희,20\n', encoding='utf-8'
+    )
+
+    entries = load_batch_file(work_dir / 'configs.csv')
+    assert entries == [{'name': 'feb2', 'year': 2025, 'month': 2,
+                        'employees': ["김철수", "이영희"], 'work_days': 20}]
+
+    outcomes = run_batch([str(work_dir / 'configs.json'), str(work_dir / 'configs.csv')],
+                         workers=2, output_dir=str(work_dir / 'out'), time_limit=3)
+    by_name = {o['name']: o for o in outcomes}
+    assert set(by_name) == {'feb5', 'configs_2', 'feb2'}
+    assert by_name['feb5']['result'] is not None
+    # 준비 시간은 설정 생성 + solve() 안의 모델 생성 (모델 생성만 수 ms 이상)
+    feb5 = by_name['feb5']
+    assert 0.001 < feb5['setup_seconds'] and feb5['setup_seconds'] + feb5['solve_seconds'] <= feb5['seconds']
+    assert_valid_result(WorkScheduleConfig(2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진"]),
+                        by_name['feb5']['result'])
+    assert by_name['configs_2']['status'] == 'ERROR'
+    assert by_name['feb2']['status'] == 'INFEASIBLE'
+    for name in by_name:
+        saved = json.loads((work_dir / 'out' / f'{name}.json').read_text(encoding='utf-8'))
+        assert saved['status'] == by_name[name]['status']
+
+    # 결과 파일이 --output-dir 밖으로 나가는 이름은 읽을 때 거부
+    for bad_name in ('../escape', 'a/b', '..', ''):
+        (work_dir / 'bad.json').write_text(json.dumps(
+            {'name': bad_name, 'year': 2025, 'month': 2, 'employees': ["김철수", "이영희"]}
+        ), encoding='utf-8')
+        try:
+            load_batch_file(work_dir / 'bad.json')
+        except ValueError:
+            continue
+        raise AssertionError(f'안전하지 않은 이름이 통과됨: {bad_name!r}')
+
+    # 대소문자만 다른 이름은 같은 결과 파일을 덮어쓰므로 중복으로 거부
+    (work_dir / 'case.json').write_text(json.dumps([
+        {'name': name, 'year': 2025, 'month': 2, 'employees': ["김철수", "이영희"]}
+        for name in ('Team', 'team')
+    ]), encoding='utf-8')
+    try:
+        run_batch([str(work_dir / 'case.json')], workers=1, output_dir=str(work_dir / 'out'), time_limit=1)
+    except ValueError as e:
+        assert 'Team' in str(e) and 'team' in str(e)
+    else:
+        raise AssertionError('대소문자만 다른 이름이 통과됨')
+
+
+def test_leave_and_availability():
+    """휴가/근무 불가 테스트 - 도메인 제한으로 변수를 만들지 않고 근무일 목표 조정"""
+    employees = ["김철수", "이영희", "박민수", "정지훈", "최수진"]
+    config = WorkScheduleConfig(
+        2025, 2, employees, work_days=20,
+        leave=[{'employee_idx': "김철수", 'days': [0, 1, 2, 3, 4]}],
+        unavailable=[{'employee_idx': 2, 'days': list(range(14, 21)),
+                      'shift_types': [ShiftType.NIGHT]}]
+    )
+    assert config.work_targets == [15, 20, 20, 20, 20]
+    assert config.allowed_shifts(0, 2) == (ShiftType.OFF_R,)
+    # 6일 OFF_B 불가 → 5일 NIGHT도 불가
+    assert ShiftType.OFF_B not in config.allowed_shifts(0, 5)
+    # 15~21일 NIGHT 불가 → 16~22일 OFF_B 불가
+    assert ShiftType.OFF_B not in config.allowed_shifts(2, 21)
+
+    plain = WorkScheduleSolver(WorkScheduleConfig(2025, 2, employees, work_days=20))
+    plain.build_model()
+    solver = WorkScheduleSolver(config)
+    status, result = solver.solve(max_time_seconds=10)
+    assert result is not None, status
+    assert len(solver.model.Proto().variables) < len(plain.model.Proto().variables)
+    assert_valid_result(config, result)
+
+    first = result['schedule'][0]
+    assert first['leave_count'] == 5
+    assert all(shift['symbol'] == 'R' and shift.get('leave') for shift in first['shifts'][:5])
+    assert first['day_count'] + first['night_count'] + first['offb_count'] == 15
+
+    # 검증기: 휴가일 근무는 leave 위반
+    grid = grid_from_result(result)
+    grid[0, 0] = ShiftType.DAY
+    rules = {(v['rule'], v['employee_idx'], v['day']) for v in validate_schedule(grid, config)['violations']}
+    assert ('leave', 0, 0) in rules
+
+    try:
+        WorkScheduleConfig(2025, 2, employees, leave=[{'employee_idx': 0, 'day': 3}],
+                           fixed_shifts=[{'employee_idx': 0, 'day': 3, 'shift_type': ShiftType.DAY}])
+        assert False, '휴가일 고정 근무는 거부되어야 함'
+    except ValueError:
+        pass
+
+
+def test_capture_and_replay():
+    """느리거나 실패한 실행 캡처 - 보관 개수 유지와 같은 시드 재실행"""
+    import os
+    import tempfile
+    from solve_capture import SolveCapture, list_captures, load_meta, replay
+
+    directory = tempfile.mkdtemp()
+    capture = SolveCapture(directory, slow_seconds=0, keep=2)
+
+    params = {'year': 2025, 'month': 2,
+              'employees': ["김철수", "이영희", "박민수", "정지훈", "최수진"], 'num_alternatives': 2}
+    solver = WorkScheduleSolver(WorkScheduleConfig(**params))
+    capture.prepare(solver)
+    status, result = solver.solve(max_time_seconds=3, num_workers=1)
+    assert result is not None and len(result['alternatives']) >= 1
+    # 모델 크기는 변수/제약 수로 추정 (텍스트 변환은 캡처할 때만)
+    assert abs(solver.search_stats['proto_bytes'] - len(solver.captured_model)) < \
+        0.25 * len(solver.captured_model)
+    plain = WorkScheduleSolver(WorkScheduleConfig(**params))
+    plain.solve(max_time_seconds=1, num_workers=1)
+    assert plain.captured_model is None and plain.search_stats['proto_bytes'] > 0
+    path = capture.record(params, solver, status, solver.search_stats['search_seconds'])
+
+    meta = load_meta(path)
+    assert meta['has_model'] and meta['seed'] == solver.solver.parameters.random_seed
+    assert meta['objective'] == solver.last_objective[2]
+
+    report = replay(path, num_workers=1, time_limit=3)
+    assert report['model_source'] == 'captured'
+    assert report['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert 'build_model' in report['build_profile']
+    assert report['search_log']
+    # 캡처한 모델은 대안 탐색 제약 추가 전 모델 (다시 만든 모델과 제약 수가 같음)
+    assert report['captured_constraints'] == report['constraints']
+
+    # 실패(설정 오류)도 캡처하고, 보관 개수를 넘으면 오래된 것부터 삭제
+    bad = dict(params, fairness_mode='bogus')
+    try:
+        WorkScheduleConfig(**bad)
+    except ValueError as e:
+        error_path = capture.record(bad, None, 'ERROR', 0.0, error=e)
+    assert 'ValueError' in load_meta(error_path)['error']
+    assert 'build_error' in replay(error_path)
+
+    capture.record(params, None, 'UNKNOWN', 0.0)
+    names = list_captures(directory)
+    assert len(names) == 2 and os.path.basename(path) not in names
+
+    # 조건에 맞지 않으면 저장하지 않음
+    assert SolveCapture(directory, slow_seconds=60).record(params, None, 'OPTIMAL', 1.0) is None
+
+    print("✓ 캡처/재실행 테스트 통과")
+
+
+def test_swap_suggestions():
+    """근무 교환 제안 - 제안을 적용한 근무표가 유효하고 목표값 변화가 전체 재계산과 같음"""
+    from schedule_validator import score_soft_goals
+    from swap_suggest import suggest_swaps
+
+    config = WorkScheduleConfig(
+        2025, 2, ["김철수", "이영희", "박민수", "정지훈", "최수진", "강민호"], work_days=20,
+        separation_pairs=[["김철수", "이영희"]],
+        fixed_shifts=[{'employee_idx': 2, 'day': 3, 'shift_type': ShiftType.DAY}]
+    )
+    status, result = WorkScheduleSolver(config).solve(max_time_seconds=5)
+    grid = grid_from_result(result)
+    base = score_soft_goals(grid, config)['objective']
+
+    kinds = set()
+    for employee_idx in range(config.num_employees):
+        for day in range(config.num_days):
+            report = suggest_swaps(grid, config, employee_idx, day)
+            assert report['elapsed_ms'] < 200
+            for suggestion in report['suggestions']:
+                kinds.add(suggestion['type'])
+                assert suggestion['partner_idx'] != employee_idx
+                assert day in suggestion['days']
+                swapped = grid.copy()
+                for change in suggestion['changes']:
+                    swapped[change['employee_idx'], change['day']] = change['to']
+                check = validate_schedule(swapped, config)
+                assert check['valid'], (employee_idx, day, check['violations'])
+                assert check['scores']['objective'] - base == suggestion['objective_delta']
+            deltas = [s['objective_delta'] for s in report['suggestions']]
+            assert deltas == sorted(deltas)
+
+    assert kinds == {'one_for_one', 'two_for_two'}
+
+    # 고정 근무는 넘길 수 없음
+    assert suggest_swaps(grid, config, 2, 3)['suggestions'] == []
+
+    print("✓ 근무 교환 제안 테스트 통과")
+
+
+def test_holiday_coverage_and_fairness():
+    """공휴일 - 달력 색인의 공휴일에 최소 인원을 늘리고 공휴일 근무를 균등 분배"""
+    employees = ["김철수", "이영희", "박민수", "정지훈", "최수진", "강민호"]
+    # 2025년 10월: 개천절(3일), 추석 연휴(5~8일), 한글날(9일)
+    config = WorkScheduleConfig(
+        2025, 10, employees, work_days=22, holidays=[30],
+        holiday_coverage={'day': 2}, holiday_fairness=True
+    )
+    assert config.holiday_days == [2, 4, 5, 6, 7, 8, 30]
+    assert config.holiday_names[30] == '지정 휴일'
+    assert config.min_coverage(2, ShiftType.DAY) == 2
+    assert config.min_coverage(2, ShiftType.NIGHT) == 1
+    assert config.min_coverage(1, ShiftType.DAY) == 1
+
+    for fairness_mode in (FairnessMode.AVERAGE, FairnessMode.SPREAD):
+        config = WorkScheduleConfig(
+            2025, 10, employees, work_days=22, holidays=[30],
+            holiday_coverage={'day': 2}, holiday_fairness=True, fairness_mode=fairness_mode
+        )
+        solver = WorkScheduleSolver(config)
+        status, result = solver.solve(max_time_seconds=5)
+        assert result is not None, status
+        report = assert_valid_result(config, result)
+
+        grid = grid_from_result(result)
+        assert all((grid[:, d] == ShiftType.DAY).sum() >= 2 for d in config.holiday_days)
+        counts = ((grid == ShiftType.DAY) | (grid == ShiftType.NIGHT))[:, config.holiday_days].sum(axis=1)
+        print(f"\n공휴일 근무 ({fairness_mode}): {counts.tolist()}")
+        assert counts.sum() >= 3 * len(config.holiday_days)
+        assert counts.max() - counts.min() <= 2
+        if fairness_mode == FairnessMode.AVERAGE:
+            assert len(solver.holiday_imbalance_vars) == 2 * len(employees)
+            # 차이 변수 합 ≥ 실제 평균과의 차이 합 (최적이면 같음)
+            assert report['scores']['holiday_imbalance'] <= sum(
+                solver.solver.Value(v) for v in solver.holiday_imbalance_vars
+            )
+        if status == 'OPTIMAL':
+            assert report['scores']['objective'] == solver.solver.ObjectiveValue()
+
+    # 검증기: 공휴일 DAY 1명은 day_coverage 위반
+    grid[:, 2] = ShiftType.OFF_R
+    grid[0, 2] = ShiftType.DAY
+    violations = [v for v in validate_schedule(grid, config)['violations'] if v['rule'] == 'day_coverage']
+    assert violations == [{'rule': 'day_coverage', 'employee_idx': None, 'day': 2,
+                           'actual': 1, 'expected': 2}]
+
+    print("✓ 공휴일 인원/균등 분배 테스트 통과")
+
+
+def test_employee_preferences():
+    """근무 선호 - 가중치를 근무 변수 계수로 쓰고, 만족도 상한을 넘을 수 있는 인원만 변수 하나 추가"""
+    employees = ["김철수", "이영희", "박민수", "정지훈", "최수진"]
+    preferences = [
+        # 2025년 2월 1일은 토요일 - 월요일은 3, 10, 17, 24일
+        {'employee_idx': '김철수', 'type': PreferenceType.PREFER, 'shift_types': [ShiftType.DAY],
+         'weekdays': [0], 'weight': 20},
+        {'employee_idx': 1, 'type': PreferenceType.AVOID, 'shift_types': [ShiftType.NIGHT],
+         'weekdays': [4], 'weight': 20},
+        {'employee_idx': '박민수', 'type': PreferenceType.DAY_OFF, 'days': [9, 10], 'weight': 50},
+        # 매일 선호 두 개 - 최대 만족도(560)가 상한(100)을 넘음
+        {'employee_idx': '정지훈', 'shift_types': [ShiftType.DAY]},
+        {'employee_idx': '정지훈', 'type': PreferenceType.AVOID, 'shift_types': [ShiftType.NIGHT]},
+    ]
+    config = WorkScheduleConfig(2025, 2, employees, work_days=20, preferences=preferences)
+    assert sorted(config.preference_weights[0]) == [(d, ShiftType.DAY) for d in (2, 9, 16, 23)]
+    assert config.preference_base[1] == 4 * 20 and config.preference_max[3] == 560
+    assert config.preference_weights[2] == {(9, ShiftType.OFF_R): 50, (10, ShiftType.OFF_R): 50}
+
+    # 모델 크기: 선호가 없을 때보다 변수는 상한 변수 하나만 늘어남
+    plain = WorkScheduleSolver(WorkScheduleConfig(2025, 2, employees, work_days=20))
+    plain.build_model()
+    solver = WorkScheduleSolver(config)
+    solver.build_model()
+    assert len(solver.model.Proto().variables) == len(plain.model.Proto().variables) + 1
+    assert len(solver.model.Proto().constraints) == len(plain.model.Proto().constraints) + 1
+
+    status, result = solver.solve(max_time_seconds=5)
+    assert result is not None, status
+    report = assert_valid_result(config, result)
+
+    satisfaction = {s['name']: s for s in result['statistics']['preference_satisfaction']}
+    print(f"\n선호 만족도: { {name: s['score'] for name, s in satisfaction.items()} }")
+    assert sorted(satisfaction) == ["김철수", "박민수", "이영희", "정지훈"]
+    assert satisfaction["정지훈"]['max_score'] == 560
+    assert satisfaction["정지훈"]['counted'] == min(satisfaction["정지훈"]['score'], 100)
+    assert report['scores']['preference_satisfaction'] == sum(s['counted'] for s in satisfaction.values())
+    # 상한 변수 값 ≤ 실제 반영값 (최적이면 같음)
+    assert sum(solver.solver.Value(v) for v in solver.preference_scores) <= \
+        report['scores']['preference_satisfaction']
+    if status == 'OPTIMAL':
+        assert report['scores']['objective'] == solver.solver.ObjectiveValue()
+
+    # 단계별 최적화는 선호를 마지막 단계로 최대화
+    config = WorkScheduleConfig(2025, 2, employees, work_days=20, preferences=preferences,
+                                objective_mode=ObjectiveMode.LEXICOGRAPHIC)
+    status, result = WorkScheduleSolver(config).solve(max_time_seconds=5)
+    assert result is not None, status
+    stages = [s['stage'] for s in result['objective_stages']]
+    assert stages == ['consecutive_5plus', 'offb_to_offr', 'imbalance', 'preferences'][:len(stages)]
+
+    # days와 weekdays가 겹치지 않는 선호 (2월 1일은 토요일) - 날짜가 없으므로 무시
+    empty = [{'employee_idx': 0, 'type': PreferenceType.PREFER, 'shift_types': [ShiftType.DAY],
+              'days': [0], 'weekdays': [0]},
+             {'employee_idx': 1, 'type': PreferenceType.DAY_OFF, 'days': [3]}]
+    config = WorkScheduleConfig(2025, 2, employees, work_days=20, preferences=empty)
+    assert config.preferences[0]['days'] == [] and 0 not in config.preference_weights
+    status, result = WorkScheduleSolver(config).solve(max_time_seconds=3)
+    assert result is not None, status
+    assert_valid_result(config, result)
+    assert [s['name'] for s in result['statistics']['preference_satisfaction']] == ["이영희"]
+
+    for bad in ({'employee_idx': 0, 'type': 'love', 'shift_types': [0]},
+                {'employee_idx': 0, 'shift_types': []},
+                {'employee_idx': 0, 'shift_types': [0], 'weight': 0},
+                {'employee_idx': 0, 'shift_types': [0], 'weekdays': [7]}):
+        try:
+            WorkScheduleConfig(2025, 2, employees, preferences=[bad])
+        except ValueError:
+            continue
+        raise AssertionError(f'잘못된 선호가 통과됨: {bad}')
+
+    print("✓ 근무 선호 테스트 통과")
+
+
+def test_differential_harness():
+    """차분 검사 - 무작위 설정을 모든 실행 방식/목표 구성으로 풀고 검증기와 서로의 결과로 확인
+    (기본 quick 프로필, SCHEDULE_TEST_PROFILE=nightly면 확장 프로필)"""
+    import os
+    from differential_check import (
+        FORMULATIONS, check_scenario, objective_key, run_formulation, run_profile
+    )
+
+    profile = os.environ.get('SCHEDULE_TEST_PROFILE', 'quick')
+    report = run_profile(profile)
+    print(f"\n차분 검사 ({profile}, 시드 {report['seed']}): {report['timings']}")
+    assert not report['problems'], report['problems']
+    assert all(run['status'] not in ('INVALID', 'ERROR')
+               for scenario in report['scenarios'] for run in scenario['runs'])
+    if profile == 'quick':
+        assert all(any(key in scenario['params'] for scenario in report['scenarios'])
+                   for key in ('leave', 'holidays', 'preferences'))
+
+    # 검사기 자체 확인: 필수 규칙을 깬 근무표와 더 나쁜 "최적해"를 잡아냄
+    params = {'year': 2025, 'month': 2, 'employees': ["김철수", "이영희", "박민수", "정지훈", "최수진"]}
+    runs = [run_formulation(params, f, 2) for f in FORMULATIONS if f[0] in ('weighted', 'feasibility')]
+    assert check_scenario(params, runs) == []
+    broken = dict(runs[1], grid=runs[1]['grid'].copy())
+    broken['grid'][:, 3] = ShiftType.OFF_R
+    assert any('필수 규칙 위반' in p for p in check_scenario(params, [runs[0], broken]))
+    # 일부러 나쁘게 만든 근무표(매일 주간 근무 - 5일 연속 근무가 모든 구간)를 "최적"이라 하면 잡아내야 함
+    config = WorkScheduleConfig(**params)
+    better = runs[0]
+    assert better['grid'] is not None, better['status']
+    worse_grid = better['grid'].copy()
+    worse_grid[:, :] = ShiftType.DAY
+    assert objective_key(worse_grid, config) > objective_key(better['grid'], config)
+    fake = dict(better, grid=worse_grid, status='OPTIMAL', solver_objective=None)
+    assert any('더 좋음' in p for p in check_scenario(params, [fake, better]))
+
+    # 무작위 설정은 휴가, 지정 휴일, 근무 선호(날짜와 요일이 겹치지 않는 항목 포함)도 섞음
+    import random
+    from differential_check import random_features
+    rng = random.Random(0)
+    samples = [random_features(rng, 6, 28) for _ in range(30)]
+    assert all(any(key in sample for sample in samples)
+               for key in ('leave', 'holidays', 'holiday_coverage', 'preferences'))
+    configs = [WorkScheduleConfig(2025, 2, [f'인원{i + 1}' for i in range(6)], work_days=18, **sample)
+               for sample in samples]
+    assert any(not entry['days'] for config in configs for entry in config.preferences)
+
+    print("✓ 차분 검사 테스트 통과")
+
+
 if __name__ == "__main__":
     # 기본 테스트
     test_basic_schedule()
@@ -132,4 +698,43 @@ if __name__ == "__main__":
     # 고정 근무 테스트
     test_with_fixed_shifts()
 
+    # 모델 템플릿 캐시 테스트
+    test_model_template_cache()
+
+    # 단계별 최적화 테스트
+    test_lexicographic_objective()
+
+    # 최대-최소 차이 균등 분배 테스트
+    test_fairness_spread_mode()
+
+    # 분리 인원 제약 테스트
+    test_separation_cliques()
+
+    # 검증기 테스트
+    test_validator_detects_violations()
+
+    # 대안 근무표 테스트
+    test_diverse_alternatives()
+
+    # 배치 모드 테스트
+    test_batch_mode()
+
+    # 휴가/근무 불가 테스트
+    test_leave_and_availability()
+
+    # 캡처/재실행 테스트
+    test_capture_and_replay()
+
+    # 근무 교환 제안 테스트
+    test_swap_suggestions()
+
+    # 공휴일 인원/균등 분배 테스트
+    test_holiday_coverage_and_fairness()
+
+    # 근무 선호 테스트
+    test_employee_preferences()
+
+    # 차분 검사 테스트
+    test_differential_harness()
+
     print("\n🎉 모든 테스트 완료!")
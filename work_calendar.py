@@ -0,0 +1,174 @@
+"""
+달력 색인 - 요일, 주말, 공휴일
+
+월별 일수와 날짜별 요일/주말/공휴일을 한 번만 계산해 두고 달력 API와
+WorkScheduleConfig가 함께 쓴다. 공휴일은 아래 내장 표(대한민국 관공서 공휴일,
+대체공휴일과 선거일/임시공휴일 포함)에서 가져온다. 음력 공휴일과 대체공휴일은
+해마다 달라지므로 새 연도는 표에 추가해야 하며, 표에 없는 연도는 주말만 반영한다
+(holidays_known=False).
+
+표에 있는 연도(와 앞뒤 한 해)는 import 시 미리 계산하고, 그 밖의 연도는 처음
+조회할 때 계산해 보관한다.
+"""
+
+import calendar
+import hashlib
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# 대한민국 공휴일 (날짜, 이름)
+KR_HOLIDAYS: Dict[int, List[Tuple[str, str]]] = {
+    2024: [
+        ('2024-01-01', '신정'),
+        ('2024-02-09', '설날 연휴'), ('2024-02-10', '설날'), ('2024-02-11', '설날 연휴'),
+        ('2024-02-12', '대체공휴일(설날)'),
+        ('2024-03-01', '삼일절'),
+        ('2024-04-10', '국회의원선거'),
+        ('2024-05-05', '어린이날'), ('2024-05-06', '대체공휴일(어린이날)'),
+        ('2024-05-15', '부처님오신날'),
+        ('2024-06-06', '현충일'),
+        ('2024-08-15', '광복절'),
+        ('2024-09-16', '추석 연휴'), ('2024-09-17', '추석'), ('2024-09-18', '추석 연휴'),
+        ('2024-10-01', '임시공휴일(국군의 날)'),
+        ('2024-10-03', '개천절'),
+        ('2024-10-09', '한글날'),
+        ('2024-12-25', '성탄절'),
+    ],
+    2025: [
+        ('2025-01-01', '신정'),
+        ('2025-01-27', '임시공휴일'),
+        ('2025-01-28', '설날 연휴'), ('2025-01-29', '설날'), ('2025-01-30', '설날 연휴'),
+        ('2025-03-01', '삼일절'), ('2025-03-03', '대체공휴일(삼일절)'),
+        ('2025-05-05', '어린이날 / 부처님오신날'), ('2025-05-06', '대체공휴일(부처님오신날)'),
+        ('2025-06-03', '대통령선거'),
+        ('2025-06-06', '현충일'),
+        ('2025-08-15', '광복절'),
+        ('2025-10-03', '개천절'),
+        ('2025-10-05', '추석 연휴'), ('2025-10-06', '추석'), ('2025-10-07', '추석 연휴'),
+        ('2025-10-08', '대체공휴일(추석)'),
+        ('2025-10-09', '한글날'),
+        ('2025-12-25', '성탄절'),
+    ],
+    2026: [
+        ('2026-01-01', '신정'),
+        ('2026-02-16', '설날 연휴'), ('2026-02-17', '설날'), ('2026-02-18', '설날 연휴'),
+        ('2026-03-01', '삼일절'), ('2026-03-02', '대체공휴일(삼일절)'),
+        ('2026-05-05', '어린이날'),
+        ('2026-05-24', '부처님오신날'), ('2026-05-25', '대체공휴일(부처님오신날)'),
+        ('2026-06-03', '전국동시지방선거'),
+        ('2026-06-06', '현충일'),
+        ('2026-08-15', '광복절'), ('2026-08-17', '대체공휴일(광복절)'),
+        ('2026-09-24', '추석 연휴'), ('2026-09-25', '추석'), ('2026-09-26', '추석 연휴'),
+        ('2026-10-03', '개천절'), ('2026-10-05', '대체공휴일(개천절)'),
+        ('2026-10-09', '한글날'),
+        ('2026-12-25', '성탄절'),
+    ],
+    2027: [
+        ('2027-01-01', '신정'),
+        ('2027-02-05', '설날 연휴'), ('2027-02-06', '설날'), ('2027-02-07', '설날 연휴'),
+        ('2027-02-08', '대체공휴일(설날)'),
+        ('2027-03-01', '삼일절'),
+        ('2027-05-05', '어린이날'),
+        ('2027-05-13', '부처님오신날'),
+        ('2027-06-06', '현충일'),
+        ('2027-08-15', '광복절'), ('2027-08-16', '대체공휴일(광복절)'),
+        ('2027-09-14', '추석 연휴'), ('2027-09-15', '추석'), ('2027-09-16', '추석 연휴'),
+        ('2027-10-03', '개천절'), ('2027-10-04', '대체공휴일(개천절)'),
+        ('2027-10-09', '한글날'), ('2027-10-11', '대체공휴일(한글날)'),
+        ('2027-12-25', '성탄절'), ('2027-12-27', '대체공휴일(성탄절)'),
+    ],
+}
+
+# 공휴일 표 버전 (표가 바뀌면 달력 응답의 ETag도 바뀜)
+TABLE_VERSION = hashlib.sha256(repr(sorted(KR_HOLIDAYS.items())).encode('utf-8')).hexdigest()[:12]
+
+WEEKEND_WEEKDAYS = (5, 6)  # 토요일, 일요일
+
+
+def _holidays_by_month() -> Dict[Tuple[int, int], Dict[int, str]]:
+    """{(연, 월): {일(1-based): 이름}}"""
+    table: Dict[Tuple[int, int], Dict[int, str]] = {}
+    for entries in KR_HOLIDAYS.values():
+        for text, name in entries:
+            day = date.fromisoformat(text)
+            table.setdefault((day.year, day.month), {})[day.day] = name
+    return table
+
+
+_HOLIDAYS = _holidays_by_month()
+
+
+class MonthInfo:
+    """한 달의 날짜 정보 (읽기 전용으로 공유)"""
+
+    __slots__ = ('year', 'month', 'num_days', 'first_day_weekday', 'last_day_weekday',
+                 'weekdays', 'weekend_days', 'holidays', 'holiday_days', 'holidays_known',
+                 '_payload')
+
+    def __init__(self, year: int, month: int):
+        self.year = year
+        self.month = month
+        self.first_day_weekday, self.num_days = calendar.monthrange(year, month)
+        # 날짜별 요일 (0-based 날짜, 0=월요일)
+        self.weekdays = tuple((self.first_day_weekday + d) % 7 for d in range(self.num_days))
+        self.last_day_weekday = self.weekdays[-1]
+        self.weekend_days = tuple(
+            d for d, weekday in enumerate(self.weekdays) if weekday in WEEKEND_WEEKDAYS
+        )
+        # 공휴일 {0-based 날짜: 이름}
+        self.holidays = {day - 1: name for day, name in _HOLIDAYS.get((year, month), {}).items()}
+        self.holiday_days = tuple(sorted(self.holidays))
+        self.holidays_known = year in KR_HOLIDAYS
+        self._payload = None
+
+    def etag(self) -> str:
+        return f'cal-{self.year}-{self.month:02d}-{TABLE_VERSION}'
+
+    def to_dict(self) -> Dict:
+        """달력 API 응답 형식 (처음 만든 것을 재사용하므로 수정하지 말 것)"""
+        if self._payload is None:
+            self._payload = self._build_payload()
+        return self._payload
+
+    def _build_payload(self) -> Dict:
+        return {
+            'year': self.year,
+            'month': self.month,
+            'num_days': self.num_days,
+            'first_day_weekday': self.first_day_weekday,
+            'first_day_name': calendar.day_name[self.first_day_weekday],
+            'last_day_weekday': self.last_day_weekday,
+            'last_day_name': calendar.day_name[self.last_day_weekday],
+            'holidays_known': self.holidays_known,
+            'holidays': [{'day': d + 1, 'name': name} for d, name in sorted(self.holidays.items())],
+            'days': [
+                {
+                    'day': d + 1,
+                    'weekday': weekday,
+                    'weekday_name': calendar.day_abbr[weekday],
+                    'is_weekend': weekday in WEEKEND_WEEKDAYS,
+                    'is_holiday': d in self.holidays,
+                    'holiday_name': self.holidays.get(d)
+                }
+                for d, weekday in enumerate(self.weekdays)
+            ]
+        }
+
+
+@lru_cache(maxsize=1024)
+def month_info(year: int, month: int) -> MonthInfo:
+    """연월의 날짜 정보 (한 번 계산한 달은 보관)"""
+    if not 1 <= month <= 12:
+        raise ValueError(f'월은 1~12 사이여야 합니다: {month}')
+    return MonthInfo(year, month)
+
+
+def precompute(first_year: int, last_year: int):
+    """연도 범위의 모든 달을 미리 계산"""
+    for year in range(first_year, last_year + 1):
+        for month in range(1, 13):
+            month_info(year, month)
+
+
+precompute(min(KR_HOLIDAYS) - 1, max(KR_HOLIDAYS) + 1)